@@ -1,16 +1,48 @@
 # -*- coding: utf-8 -*-
 import sys
+import argparse
+import base64
+import copy
+import hashlib
+import json
+import math
+import io
+import multiprocessing
+import os
+import re
+import threading
 import requests
 import time
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 import numpy as np
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from statistics import NormalDist
+
+try:
+    import websocket  # websocket-client: opcional, solo para el feed de bloques en vivo
+except ImportError:
+    websocket = None
+
+try:
+    import pyarrow as pa  # opcional, solo para exportar/leer Arrow y Parquet
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_csv = pq = None
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QFormLayout, QMessageBox,
-    QComboBox, QHBoxLayout, QFrame, QCheckBox, QScrollArea, QVBoxLayout
+    QComboBox, QHBoxLayout, QFrame, QCheckBox, QScrollArea, QVBoxLayout, QFileDialog,
+    QTableWidget, QTableWidgetItem, QProgressBar
 )
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThread, QThreadPool, QTimer, QUrl, pyqtSignal
+from PyQt5.QtGui import QFont, QGuiApplication, QImage, QPageSize, QPdfWriter, QTextDocument
 
 # Constantes
 CASCADA_OFFSET_X = 30
@@ -18,54 +50,626 @@ CASCADA_OFFSET_Y = 30
 SATOSHIS_POR_BTC = 100_000_000
 BLOQUES_POR_DIA = 144
 FACTOR_RENDIMIENTO_SOLAR = 0.8
-
+SEGUNDOS_POR_DIA = 86_400
+HORAS_POR_ANIO = 8_760
+SEGUNDOS_POR_BLOQUE = 600
+VENTANAS_BLOQUES = {"1h": 3_600, "24h": 86_400, "7d": 7 * 86_400, "30d": 30 * 86_400}
+URL_API_MEMPOOL = "https://mempool.space/api"
+URL_WS_MEMPOOL = "wss://mempool.space/api/v1/ws"
+SEGUNDOS_POR_ANIO = 365.25 * 86_400
+ALTURA_HALVING_REFERENCIA = 840_000  # Cuarto halving, 20/04/2024
+TS_HALVING_REFERENCIA = 1_713_571_767
+BLOQUES_ENTRE_HALVINGS = 210_000
+CRECIMIENTO_HASHRATE_ANUAL = 0.3  # Si no hay modelo de crecimiento ajustado
+INTERVALO_MODELO_HASHRATE_MS = 3_600_000  # Cada hora se mira si la caché del historial ha caducado
+PERIODOS_HISTORIAL_HASHRATE = (("1m", 30), ("3m", 90), ("6m", 180), ("1y", 365), ("2y", 730), ("3y", 1095))  # (periodo, días)
+RUTA_CACHE_HASHRATE = os.path.join(os.path.expanduser("~"), ".cache", "calculadora_mineria_solar", "hashrate.json")
+
+# reventa: fracción del precio que conserva el equipo por cada año de uso
+# fallo: probabilidad anual de avería irreparable
 MINEROS = {
-    "S19":      {"ths": 95, "consumo": 3.250, "precio": 550},
-    "S19K Pro": {"ths": 120, "consumo": 2.760, "precio": 770},
-    "S21":      {"ths": 200, "consumo": 3.500, "precio": 2211},
-    "S21 XP": {"ths": 270, "consumo": 3.645, "precio": 4850.62},
-    "S23 Hyd":  {"ths": 580, "consumo": 5.510, "precio": 11311},
-    "Fluminer T3": {"ths": 115, "consumo": 1.700, "precio": 1900},
-    "Avalon Q": {"ths": 90, "consumo": 1.674, "precio": 1500},
-    "Avalon Nano 3S": {"ths": 6, "consumo": 0.140, "precio": 290},
-    "NerdMiner NerdQaxe++": {"ths": 4.8, "consumo": 0.072, "precio": 350},
-    "NerdMiner NerdQaxe+ Hyd": {"ths": 2.5, "consumo": 0.060, "precio": 429},
-    "Bitaxe Touch": {"ths": 1.6, "consumo": 0.022, "precio": 275},
-    "Bitaxe Gamma 601": {"ths": 1.2, "consumo": 0.017, "precio": 58},
-    "Bitaxe Gamma Turbo": {"ths": 2.5, "consumo": 0.036, "precio": 347},
-    "Bitaxe Supra Hex 701": {"ths": 4.2, "consumo": 0.090, "precio": 235},
+    "S19":      {"ths": 95, "consumo": 3.250, "precio": 550, "reventa": 0.50, "fallo": 0.08},
+    "S19K Pro": {"ths": 120, "consumo": 2.760, "precio": 770, "reventa": 0.55, "fallo": 0.07},
+    "S21":      {"ths": 200, "consumo": 3.500, "precio": 2211, "reventa": 0.60, "fallo": 0.05},
+    "S21 XP": {"ths": 270, "consumo": 3.645, "precio": 4850.62, "reventa": 0.65, "fallo": 0.05},
+    "S23 Hyd":  {"ths": 580, "consumo": 5.510, "precio": 11311, "reventa": 0.65, "fallo": 0.04},
+    "Fluminer T3": {"ths": 115, "consumo": 1.700, "precio": 1900, "reventa": 0.60, "fallo": 0.05},
+    "Avalon Q": {"ths": 90, "consumo": 1.674, "precio": 1500, "reventa": 0.60, "fallo": 0.05},
+    "Avalon Nano 3S": {"ths": 6, "consumo": 0.140, "precio": 290, "reventa": 0.50, "fallo": 0.08},
+    "NerdMiner NerdQaxe++": {"ths": 4.8, "consumo": 0.072, "precio": 350, "reventa": 0.50, "fallo": 0.10},
+    "NerdMiner NerdQaxe+ Hyd": {"ths": 2.5, "consumo": 0.060, "precio": 429, "reventa": 0.50, "fallo": 0.10},
+    "Bitaxe Touch": {"ths": 1.6, "consumo": 0.022, "precio": 275, "reventa": 0.50, "fallo": 0.10},
+    "Bitaxe Gamma 601": {"ths": 1.2, "consumo": 0.017, "precio": 58, "reventa": 0.50, "fallo": 0.10},
+    "Bitaxe Gamma Turbo": {"ths": 2.5, "consumo": 0.036, "precio": 347, "reventa": 0.50, "fallo": 0.10},
+    "Bitaxe Supra Hex 701": {"ths": 4.2, "consumo": 0.090, "precio": 235, "reventa": 0.50, "fallo": 0.10},
 
 }
 
-def obtener_cambio_usd_eur():
-    """Obtiene el tipo de cambio USD/EUR desde la API de Frankfurter"""
-    try:
-        url = "https://api.frankfurter.app/latest?from=USD&to=EUR"
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()  # Lanza excepción si hay error HTTP
-        data = resp.json()
-        return round(data["rates"]["EUR"], 4)
-    except requests.RequestException as e:
-        print(f"Error obteniendo cambio USD/EUR: {e}")
-        return None
-    except (KeyError, ValueError) as e:
-        print(f"Error procesando datos de cambio: {e}")
-        return None
+def catalogo_mineros(mineros=MINEROS):
+    """Devuelve el catálogo como arrays paralelos (nombres, ths, consumo kW, precio €)"""
+    nombres = list(mineros)
+    ths = np.array([mineros[n]["ths"] for n in nombres], dtype=float)
+    consumo = np.array([mineros[n]["consumo"] for n in nombres], dtype=float)
+    precio = np.array([mineros[n]["precio"] for n in nombres], dtype=float)
+    return nombres, ths, consumo, precio
 
-def obtener_precio_btc():
-    """Obtiene el precio actual de Bitcoin desde CoinGecko"""
-    try:
-        url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        return float(data["bitcoin"]["usd"])
-    except requests.RequestException as e:
-        print(f"Error obteniendo precio BTC: {e}")
-        return None
-    except (KeyError, ValueError) as e:
-        print(f"Error procesando precio BTC: {e}")
-        return None
+def cargar_serie_horaria(ruta):
+    """
+    Lee una serie horaria (p. ej. 8760 precios en €/kWh) desde un CSV.
+    Usa la última columna de cada línea y descarta cabeceras o líneas no numéricas.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        lineas = [linea.strip() for linea in f if linea.strip()]
+    if not lineas:
+        return np.empty(0)
+    separador = ";" if ";" in lineas[0] else ("\t" if "\t" in lineas[0] else ",")
+    valores = []
+    for linea in lineas:
+        campo = linea.split(separador)[-1].strip().strip('"')
+        if separador != ",":
+            campo = campo.replace(",", ".")  # Coma decimal habitual en CSV con ';'
+        try:
+            valores.append(float(campo))
+        except ValueError:
+            continue
+    return np.asarray(valores, dtype=float)
+
+def precio_equilibrio_eur_kwh(hashprice_eur_th_dia, ths, consumo_kw, comision):
+    """€/kWh a partir del cual minar deja de compensar: ingreso neto por kWh consumido"""
+    ths = np.asarray(ths, dtype=float)
+    consumo_kw = np.asarray(consumo_kw, dtype=float)
+    ingreso_neto_hora = hashprice_eur_th_dia / 24 * ths * (1 - comision)
+    return np.divide(ingreso_neto_hora, consumo_kw, out=np.zeros(np.broadcast(ingreso_neto_hora, consumo_kw).shape), where=consumo_kw > 0)
+
+def optimizar_curtailment(precios_hora, hashprice_eur_th_dia, ths, consumo_kw, comision, devolver_mascara=False):
+    """
+    Curtailment horario: por cada modelo se mina solo en las horas cuyo precio
+    está por debajo de su precio de equilibrio.
+    precios_hora: array (H,) en €/kWh. ths y consumo_kw: escalares o arrays (M,).
+    Retorna un dict de arrays (M,): equilibrio, horas, energia_kwh, coste,
+    precio_medio, ingreso_bruto, ingreso_neto y beneficio. Con devolver_mascara=True
+    incluye también la matriz booleana (M, H) de horas minadas.
+    Las magnitudes se anualizan a HORAS_POR_ANIO sea cual sea la longitud de la
+    serie (un mes se extrapola, un año bisiesto se normaliza a 8760 h).
+    """
+    precios = np.asarray(precios_hora, dtype=float)
+    ths = np.atleast_1d(np.asarray(ths, dtype=float))
+    consumo_kw = np.atleast_1d(np.asarray(consumo_kw, dtype=float))
+    equilibrio = np.atleast_1d(precio_equilibrio_eur_kwh(hashprice_eur_th_dia, ths, consumo_kw, comision))
+
+    # Ordenar los precios una sola vez: las horas minadas de cada modelo son un
+    # prefijo de la serie ordenada, así que basta una búsqueda binaria por modelo
+    precios_ordenados = np.sort(precios)
+    suma_acumulada = np.concatenate(([0.0], np.cumsum(precios_ordenados)))
+    horas_serie = np.searchsorted(precios_ordenados, equilibrio, side="left")
+    precio_medio = np.divide(suma_acumulada[horas_serie], horas_serie, out=np.zeros(horas_serie.shape), where=horas_serie > 0)
+    escala = HORAS_POR_ANIO / max(precios.size, 1)
+    horas = horas_serie * escala
+    suma_precios = suma_acumulada[horas_serie] * escala
+
+    energia_kwh = consumo_kw * horas
+    coste = consumo_kw * suma_precios
+    ingreso_bruto = hashprice_eur_th_dia / 24 * ths * horas
+    ingreso_neto = ingreso_bruto * (1 - comision)
+
+    resultado = {
+        "equilibrio": equilibrio,
+        "horas": horas,
+        "energia_kwh": energia_kwh,
+        "coste": coste,
+        "precio_medio": precio_medio,
+        "ingreso_bruto": ingreso_bruto,
+        "ingreso_neto": ingreso_neto,
+        "beneficio": ingreso_neto - coste,
+    }
+    if devolver_mascara:
+        resultado["mascara"] = precios[np.newaxis, :] < equilibrio[:, np.newaxis]
+    return resultado
+
+def dimensionar_fotovoltaica(irradiancia, hashprice_eur_th_dia, comision, precio_exportacion, capex_kwp,
+                             kwp=None, maquinas=None, modelos=None, mineros=MINEROS, presupuesto=None):
+    """
+    Dimensionado conjunto de la instalación FV y la flota: evalúa de una vez la
+    malla kWp × número de máquinas × modelo y elige la mayor rentabilidad anual
+    sobre la inversión total (equipos + kWp * capex_kwp).
+    irradiancia: serie horaria en W/m² (p. ej. un año de PVGIS); la producción por
+    kWp es irradiancia / 1000 * FACTOR_RENDIMIENTO_SOLAR. Las máquinas solo minan
+    con FV (la flota se modula de forma continua) y el excedente se exporta a
+    precio_exportacion.
+    Poda los modelos cuyo ingreso neto por kWh no supera el de exportar y los
+    dominados (otro modelo ingresa más por kWh con menos inversión por kW); estos
+    últimos solo si no hay presupuesto.
+    Retorna un dict con la mejor configuración por modelo (arrays) e índice 'mejor'.
+    """
+    produccion = np.asarray(irradiancia, dtype=float).clip(min=0) / 1000 * FACTOR_RENDIMIENTO_SOLAR  # kWh/kWp por hora
+    if produccion.size == 0 or produccion.max() <= 0:
+        raise ValueError("El perfil de irradiancia no tiene producción")
+    escala = 365.25 * 24 / produccion.size  # Anualizar perfiles de otra duración
+
+    nombres, ths, consumo, precio = catalogo_mineros(mineros)
+    if modelos is not None:
+        seleccion = [nombres.index(m) for m in modelos]
+        nombres, ths, consumo, precio = [nombres[i] for i in seleccion], ths[seleccion], consumo[seleccion], precio[seleccion]
+    ingreso_kwh = precio_equilibrio_eur_kwh(hashprice_eur_th_dia, ths, consumo, comision)
+    capex_kw = precio / consumo
+    utiles = ingreso_kwh > precio_exportacion
+    # Con presupuesto la dominancia no vale: el modelo dominante puede no caber y el dominado sí
+    dominados = np.array([
+        presupuesto is None
+        and np.any((ingreso_kwh >= ingreso_kwh[i]) & (capex_kw <= capex_kw[i]) & ((ingreso_kwh > ingreso_kwh[i]) | (capex_kw < capex_kw[i])))
+        for i in range(len(nombres))
+    ], dtype=bool)
+    conservar = np.flatnonzero(utiles & ~dominados)
+    podados = [nombres[i] for i in np.flatnonzero(~(utiles & ~dominados))]
+    if conservar.size == 0:
+        raise ValueError("Ningún modelo ingresa por kWh más que exportar la energía")
+    ingreso_kwh, consumo, precio = ingreso_kwh[conservar], consumo[conservar], precio[conservar]
+
+    maquinas = np.arange(1, 21) if maquinas is None else np.asarray(maquinas, dtype=float)
+    if kwp is None:
+        carga_max = maquinas.max() * consumo.max()
+        kwp = np.linspace(0, 2 * carga_max / produccion.max(), 201)[1:]
+    kwp = np.asarray(kwp, dtype=float)
+
+    # Energía aprovechada por la flota: sum_h min(kwp * p_h, carga) = kwp * F(carga / kwp),
+    # con F(x) = sum_h min(p_h, x) evaluada por búsqueda binaria sobre la serie ordenada
+    ordenada = np.sort(produccion)
+    acumulada = np.concatenate(([0.0], np.cumsum(ordenada)))
+    carga = maquinas[:, np.newaxis] * consumo[np.newaxis, :]  # (N, M)
+    umbral = carga[np.newaxis] / kwp[:, np.newaxis, np.newaxis]  # (K, N, M)
+    debajo = np.searchsorted(ordenada, umbral, side="right")
+    energia_minada = kwp[:, np.newaxis, np.newaxis] * (acumulada[debajo] + umbral * (ordenada.size - debajo)) * escala
+    energia_fv = (kwp * acumulada[-1] * escala)[:, np.newaxis, np.newaxis]
+
+    beneficio = energia_minada * ingreso_kwh + (energia_fv - energia_minada) * precio_exportacion
+    inversion = kwp[:, np.newaxis, np.newaxis] * capex_kwp + maquinas[np.newaxis, :, np.newaxis] * precio
+    rentabilidad = beneficio / inversion
+    if presupuesto is not None:
+        rentabilidad = np.where(inversion <= presupuesto, rentabilidad, -np.inf)
+
+    # Mejor (kWp, máquinas) de cada modelo
+    plano = rentabilidad.reshape(-1, len(conservar))
+    mejor_plano = plano.argmax(axis=0)
+    ik, im = np.unravel_index(mejor_plano, rentabilidad.shape[:2])
+    columnas = np.arange(len(conservar))
+    beneficio_mejor = beneficio[ik, im, columnas]
+    inversion_mejor = inversion[ik, im, columnas]
+    viable = np.isfinite(plano[mejor_plano, columnas])
+    return {
+        "modelos": [nombres[i] for i in conservar],
+        "kwp": kwp[ik],
+        "num_maquinas": maquinas[im],
+        "inversion": inversion_mejor,
+        "beneficio_anual": beneficio_mejor,
+        "rentabilidad": np.where(viable, plano[mejor_plano, columnas], np.nan),
+        "amortizacion": _dividir(inversion_mejor, beneficio_mejor, np.inf),
+        "beneficio_10_anios": beneficio_mejor * 10 - inversion_mejor,
+        "energia_minada_kwh": energia_minada[ik, im, columnas],
+        "energia_exportada_kwh": energia_fv[ik, 0, 0] - energia_minada[ik, im, columnas],
+        "ingreso_kwh": ingreso_kwh,
+        "mejor": int(np.nanargmax(np.where(viable, plano[mejor_plano, columnas], -np.inf))) if viable.any() else None,
+        "evaluados": int(rentabilidad.size),
+        "podados": podados,
+    }
+
+def calcular_hashprice_usd_ph_dia(precio_btc, recompensa_btc, fees_btc_bloque, hashrate_eh, bloques_dia=BLOQUES_POR_DIA):
+    """Hashprice en USD/PH/día: ingresos por bloque * bloques/día / hashrate de la red en PH/s"""
+    ingreso_usd_por_bloque = (recompensa_btc + fees_btc_bloque) * precio_btc
+    hashrate_ph = hashrate_eh * 1_000  # 1 EH = 1,000 PH
+    return ingreso_usd_por_bloque * bloques_dia / hashrate_ph
+
+def _dividir(numerador, denominador, si_no=0.0):
+    """División elemento a elemento que devuelve si_no donde el denominador no es positivo"""
+    numerador, denominador = np.broadcast_arrays(np.asarray(numerador, dtype=float), np.asarray(denominador, dtype=float))
+    return np.divide(numerador, denominador, out=np.full(numerador.shape, si_no), where=denominador > 0)
+
+# Entradas de un escenario (mismo significado que los campos de la interfaz;
+# horas anuales = horas/día * días/año, 0 si la fuente está desactivada)
+ENTRADAS_ESCENARIO = (
+    "precio_btc", "cambio_usd_eur", "hashrate_eh", "fees_btc", "recompensa_btc", "bloques_dia", "comision",
+    "ths_unidad", "consumo_unidad", "precio_unidad", "num_maquinas",
+    "horas_solares_anuales", "precio_venta_solar", "horas_red_anuales", "precio_red",
+)
+
+# Columnas derivadas en orden topológico: (nombre, entradas, función vectorizada).
+# Reproducen las fórmulas de CalculadoraMineria.calcular para N escenarios a la vez.
+COLUMNAS_DERIVADAS = (
+    ("hashprice_usd_ph_dia", ("precio_btc", "recompensa_btc", "fees_btc", "hashrate_eh", "bloques_dia"), calcular_hashprice_usd_ph_dia),
+    ("hashprice_eur_th_dia", ("hashprice_usd_ph_dia", "cambio_usd_eur"), lambda hp, cambio: hp / 1000 * cambio),
+    ("ths", ("ths_unidad", "num_maquinas"), np.multiply),
+    ("consumo_kw", ("consumo_unidad", "num_maquinas"), np.multiply),
+    ("inversion", ("precio_unidad", "num_maquinas"), np.multiply),
+    ("ingreso_bruto_solar", ("hashprice_eur_th_dia", "ths", "horas_solares_anuales"), lambda hp, ths, horas: hp * ths * horas / 24),
+    ("energia_solar_kwh", ("consumo_kw", "horas_solares_anuales"), np.multiply),
+    ("beneficio_solar", ("ingreso_bruto_solar", "comision", "energia_solar_kwh", "precio_venta_solar"),
+     lambda ingreso, comision, energia, precio: ingreso * (1 - comision) - energia * precio),
+    ("ingreso_bruto_red", ("hashprice_eur_th_dia", "ths", "horas_red_anuales"), lambda hp, ths, horas: hp * ths * horas / 24),
+    ("energia_red_kwh", ("consumo_kw", "horas_red_anuales"), np.multiply),
+    ("beneficio_red", ("ingreso_bruto_red", "comision", "energia_red_kwh", "precio_red"),
+     lambda ingreso, comision, energia, precio: ingreso * (1 - comision) - energia * precio),
+    ("beneficio_anual", ("beneficio_solar", "beneficio_red"), np.add),
+    ("amortizacion", ("inversion", "beneficio_anual"), lambda inversion, beneficio: _dividir(inversion, beneficio, np.inf)),
+    ("beneficio_10_anios", ("beneficio_anual", "inversion"), lambda beneficio, inversion: beneficio * 10 - inversion),
+    ("euros_kwh_neto", ("beneficio_anual", "energia_solar_kwh", "energia_red_kwh"),
+     lambda beneficio, solar, red: _dividir(beneficio, solar + red)),
+)
+
+def evaluar_escenarios(entradas):
+    """Evalúa de una vez todas las columnas derivadas para los escenarios dados (dict de arrays)"""
+    columnas = {nombre: np.asarray(entradas[nombre], dtype=float) for nombre in ENTRADAS_ESCENARIO}
+    for nombre, dependencias, funcion in COLUMNAS_DERIVADAS:
+        columnas[nombre] = np.asarray(funcion(*(columnas[d] for d in dependencias)), dtype=float)
+    return columnas
+
+def crear_escenarios(base, modelos=None, mineros=MINEROS, **ejes):
+    """
+    Producto cartesiano de escenarios a partir de unas entradas base (escalares).
+    modelos: nombres del catálogo (rellenan ths/consumo/precio por unidad).
+    ejes: listas de valores para cualquier entrada, p. ej. precio_red=[0.05, 0.08].
+    Retorna (etiquetas, dict de arrays con todas las ENTRADAS_ESCENARIO).
+    """
+    ejes = dict(ejes)
+    if modelos is not None:
+        ejes["modelo"] = list(modelos)
+    tamanos = [len(valores) for valores in ejes.values()]
+    indices = np.indices(tamanos).reshape(len(tamanos), -1) if tamanos else np.zeros((0, 1), dtype=int)
+    entradas = _entradas_por_indices(base, ejes, indices, mineros)
+
+    etiquetas = [[] for _ in range(indices.shape[1])]
+    for (eje, valores), idx in zip(ejes.items(), indices):
+        for fila, i in enumerate(idx):
+            etiquetas[fila].append(str(valores[i]) if eje == "modelo" else f"{eje}={valores[i]}")
+    return [" · ".join(partes) or "Escenario" for partes in etiquetas], entradas
+
+def _entradas_por_indices(base, ejes, indices, mineros=MINEROS):
+    """Entradas de los escenarios dados por sus índices en cada eje (array ejes × N)"""
+    n = indices.shape[1]
+    entradas = {nombre: np.full(n, float(base[nombre])) for nombre in ENTRADAS_ESCENARIO}
+    for (eje, valores), idx in zip(ejes.items(), indices):
+        if eje == "modelo":
+            for entrada, clave in (("ths_unidad", "ths"), ("consumo_unidad", "consumo"), ("precio_unidad", "precio")):
+                entradas[entrada] = np.array([mineros[m][clave] for m in valores], dtype=float)[idx]
+        else:
+            entradas[eje] = np.asarray(valores, dtype=float)[idx]
+    return entradas
+
+def resolver_entrada(entradas, incognita, objetivo, valor_objetivo, inferior=0.0, superior=None,
+                     iteraciones=100, tolerancia=1e-9, expansiones=64):
+    """
+    Búsqueda de objetivo vectorizada: para cada escenario, el valor de la entrada
+    'incognita' con el que la columna 'objetivo' vale valor_objetivo (p. ej. el precio
+    de BTC que amortiza en 3 años). Bisección simultánea sobre todos los escenarios
+    con evaluar_escenarios; si no se da 'superior' el intervalo se dobla hasta
+    encerrar la raíz. Retorna un array con NaN donde no hay solución en [inferior, ∞).
+    """
+    if incognita not in ENTRADAS_ESCENARIO:
+        raise KeyError(f"'{incognita}' no es una entrada del escenario")
+    if objetivo not in {nombre for nombre, _, _ in COLUMNAS_DERIVADAS}:
+        raise KeyError(f"'{objetivo}' no es una columna calculada")
+    entradas = {nombre: np.asarray(entradas[nombre], dtype=float) for nombre in ENTRADAS_ESCENARIO}
+    n = len(entradas[incognita])
+    valor_objetivo = np.broadcast_to(np.asarray(valor_objetivo, dtype=float), (n,))
+
+    def diferencia(x):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return evaluar_escenarios({**entradas, incognita: x})[objetivo] - valor_objetivo
+
+    bajo = np.full(n, float(inferior))
+    alto = np.full(n, float(superior)) if superior is not None else np.maximum(2 * np.abs(entradas[incognita]), 1.0)
+    d_bajo, d_alto = diferencia(bajo), diferencia(alto)
+    # En el extremo inferior la incógnita puede anular un denominador (hashrate 0 -> hashprice
+    # infinito, y con una fuente apagada inf * 0 = NaN): se parte de un punto apenas interior.
+    # Donde el infinito es legítimo (p. ej. amortización sin beneficio) el valor no cambia
+    sin_valor = ~np.isfinite(d_bajo)
+    if sin_valor.any():
+        bajo = np.where(sin_valor, bajo + (alto - bajo) * 1e-12, bajo)
+        d_bajo = np.where(sin_valor, diferencia(bajo), d_bajo)
+    if superior is None:
+        for _ in range(expansiones):
+            sin_cambio = np.sign(d_bajo) * np.sign(d_alto) > 0
+            if not sin_cambio.any():
+                break
+            alto = np.where(sin_cambio, alto * 2, alto)
+            d_alto = np.where(sin_cambio, diferencia(alto), d_alto)
+    valida = (np.sign(d_bajo) * np.sign(d_alto) <= 0) & ~np.isnan(d_bajo) & ~np.isnan(d_alto)
+
+    for _ in range(iteraciones):
+        if np.all(alto - bajo <= tolerancia * np.maximum(1.0, np.abs(alto))):
+            break
+        medio = (bajo + alto) / 2
+        d_medio = diferencia(medio)
+        mismo_lado = np.sign(d_medio) == np.sign(d_bajo)
+        bajo, d_bajo = np.where(mismo_lado, medio, bajo), np.where(mismo_lado, d_medio, d_bajo)
+        alto = np.where(mismo_lado, alto, medio)
+    return np.where(valida, (bajo + alto) / 2, np.nan)
+
+FORMATOS_EXPORTACION = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+def _formato_exportacion(ruta, formato):
+    if formato:
+        return formato
+    # Sin extensión conocida: carpeta con un .npy por columna (no requiere pyarrow)
+    return FORMATOS_EXPORTACION.get(os.path.splitext(ruta)[1].lower(), "npy")
+
+def exportar_columnas(columnas, ruta, formato=None, filas_por_bloque=1_000_000):
+    """
+    Escribe columnas (dict nombre -> array 1D, también np.memmap) sin crear objetos por fila.
+    Formatos: 'parquet' y 'arrow' (requieren pyarrow), 'csv' (streaming por bloques)
+    y 'npy' (carpeta con un .npy por columna, legible con memoria mapeada).
+    Se escribe por bloques de filas para acotar la memoria con resultados muy grandes.
+    """
+    formato = _formato_exportacion(ruta, formato)
+    columnas = {nombre: np.asarray(valores) for nombre, valores in columnas.items()}
+    n = len(next(iter(columnas.values()))) if columnas else 0
+    bloques = [slice(i, min(i + filas_por_bloque, n)) for i in range(0, n, filas_por_bloque)] or [slice(0, 0)]
+
+    if formato == "npy":
+        os.makedirs(ruta, exist_ok=True)
+        for nombre, valores in columnas.items():
+            destino = np.lib.format.open_memmap(os.path.join(ruta, f"{nombre}.npy"), mode="w+", dtype=valores.dtype, shape=(n,))
+            for bloque in bloques:
+                destino[bloque] = valores[bloque]
+            destino.flush()
+            del destino
+        return ruta
+
+    if formato in ("parquet", "arrow") or (formato == "csv" and pa is not None):
+        if pa is None:
+            raise RuntimeError(f"El formato {formato} necesita el paquete pyarrow")
+        nombres = list(columnas)
+        lotes = (pa.record_batch([pa.array(columnas[nombre][bloque]) for nombre in nombres], names=nombres) for bloque in bloques)
+        primero = next(lotes)
+        if formato == "parquet":
+            escritor = pq.ParquetWriter(ruta, primero.schema)
+        elif formato == "arrow":
+            escritor = pa.ipc.new_file(ruta, primero.schema)
+        else:
+            escritor = pa_csv.CSVWriter(ruta, primero.schema)
+        with escritor:
+            escritor.write_batch(primero)
+            for lote in lotes:
+                escritor.write_batch(lote)
+        return ruta
+
+    if formato == "csv":
+        # Alternativa sin pyarrow: volcado por bloques con np.savetxt
+        nombres = list(columnas)
+        formatos = ["%s" if columnas[nombre].dtype.kind in "OUS" else "%.10g" for nombre in nombres]
+        with open(ruta, "w", encoding="utf-8", newline="") as f:
+            f.write(",".join(nombres) + "\n")
+            for bloque in bloques:
+                filas = np.rec.fromarrays([columnas[nombre][bloque] for nombre in nombres], names=nombres)
+                np.savetxt(f, filas, fmt=formatos, delimiter=",")
+        return ruta
+
+    raise ValueError(f"Formato de exportación desconocido: {formato}")
+
+def leer_columnas(ruta, formato=None):
+    """
+    Lee columnas exportadas con exportar_columnas como dict nombre -> array.
+    'npy' y 'arrow' se leen con memoria mapeada (sin copiar las columnas numéricas
+    de un solo bloque); 'parquet' y 'csv' se decodifican en memoria.
+    """
+    formato = _formato_exportacion(ruta, formato)
+    if formato == "npy":
+        return {os.path.splitext(nombre)[0]: np.load(os.path.join(ruta, nombre), mmap_mode="r")
+                for nombre in sorted(os.listdir(ruta)) if nombre.endswith(".npy")}
+    if formato == "csv" and pa is None:
+        datos = np.genfromtxt(ruta, delimiter=",", names=True, dtype=None, encoding="utf-8")
+        return {nombre: datos[nombre] for nombre in datos.dtype.names}
+    if pa is None:
+        raise RuntimeError(f"El formato {formato} necesita el paquete pyarrow")
+    if formato == "arrow":
+        tabla = pa.ipc.open_file(pa.memory_map(ruta, "r")).read_all()
+    elif formato == "parquet":
+        tabla = pq.read_table(ruta, memory_map=True)
+    elif formato == "csv":
+        tabla = pa_csv.read_csv(ruta)
+    else:
+        raise ValueError(f"Formato de lectura desconocido: {formato}")
+    return {nombre: tabla.column(nombre).to_numpy() for nombre in tabla.column_names}
+
+class AlmacenEscenarios:
+    """
+    Barrido cartesiano de escenarios guardado en disco. Los escenarios no se
+    materializan: la fila i corresponde a np.unravel_index(i, tamaños de los ejes)
+    y sus entradas se generan por bloques. Los resultados van a un .npy con dtype
+    estructurado (índice compacto por eje + columnas float32) abierto con memoria
+    mapeada, y el avance se guarda tras cada bloque para poder reanudar.
+    """
+
+    COLUMNAS = ("beneficio_anual", "amortizacion", "beneficio_10_anios", "euros_kwh_neto")
+    FICHERO_META = "barrido.json"
+    FICHERO_RESULTADOS = "resultados.npy"
+
+    def __init__(self, ruta, meta):
+        self.ruta = ruta
+        self.meta = meta
+        self.ejes = {eje: valores for eje, valores in meta["ejes"]}
+        self.tamanos = tuple(len(valores) for valores in self.ejes.values())
+        self.dtype = np.dtype(
+            [(eje, np.min_scalar_type(max(len(valores) - 1, 0))) for eje, valores in self.ejes.items()]
+            + [(columna, np.float32) for columna in meta["columnas"]]
+        )
+
+    def __len__(self):
+        return self.meta["total"]
+
+    @classmethod
+    def crear(cls, ruta, base, modelos=None, columnas=COLUMNAS, mineros=MINEROS, **ejes):
+        """Define un barrido nuevo (mismos argumentos que crear_escenarios) y reserva el fichero de resultados"""
+        if os.path.exists(os.path.join(ruta, cls.FICHERO_META)):
+            raise FileExistsError(f"Ya existe un barrido en {ruta}; usa AlmacenEscenarios.abrir")
+        ejes = {eje: [float(v) for v in valores] for eje, valores in ejes.items()}
+        if modelos is not None:
+            ejes["modelo"] = list(modelos)
+        meta = {
+            "base": {nombre: float(base[nombre]) for nombre in ENTRADAS_ESCENARIO},
+            "ejes": [[eje, valores] for eje, valores in ejes.items()],
+            "mineros": {m: mineros[m] for m in ejes.get("modelo", [])},
+            "columnas": list(columnas),
+            "total": int(np.prod([len(valores) for valores in ejes.values()], dtype=np.int64)),
+            "hechas": 0,
+        }
+        os.makedirs(ruta, exist_ok=True)
+        almacen = cls(ruta, meta)
+        np.lib.format.open_memmap(almacen._ruta_resultados, mode="w+", dtype=almacen.dtype, shape=(meta["total"],)).flush()
+        almacen._guardar_meta()
+        return almacen
+
+    @classmethod
+    def abrir(cls, ruta):
+        with open(os.path.join(ruta, cls.FICHERO_META), encoding="utf-8") as f:
+            return cls(ruta, json.load(f))
+
+    @property
+    def _ruta_resultados(self):
+        return os.path.join(self.ruta, self.FICHERO_RESULTADOS)
+
+    @property
+    def completo(self):
+        return self.meta["hechas"] >= self.meta["total"]
+
+    def _guardar_meta(self):
+        # Escritura atómica: un corte a mitad no deja el avance corrupto
+        temporal = os.path.join(self.ruta, self.FICHERO_META + ".tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(temporal, os.path.join(self.ruta, self.FICHERO_META))
+
+    def indices(self, inicio, fin):
+        """Índices por eje (array ejes × filas) de las filas [inicio, fin)"""
+        if not self.tamanos:
+            return np.zeros((0, fin - inicio), dtype=np.int64)  # Sin ejes: un único escenario
+        return np.array(np.unravel_index(np.arange(inicio, fin, dtype=np.int64), self.tamanos)).reshape(len(self.tamanos), -1)
+
+    def entradas(self, inicio, fin):
+        """Entradas de escenario de las filas [inicio, fin), generadas bajo demanda"""
+        return _entradas_por_indices(self.meta["base"], self.ejes, self.indices(inicio, fin), self.meta["mineros"])
+
+    def etiqueta(self, fila):
+        idx = self.indices(fila, fila + 1)[:, 0]
+        return " · ".join(str(valores[i]) if eje == "modelo" else f"{eje}={valores[i]:g}"
+                          for (eje, valores), i in zip(self.ejes.items(), idx)) or "Escenario"
+
+    def procesar(self, tamano_bloque=1_000_000, progreso=None):
+        """
+        Evalúa las filas pendientes por bloques y guarda el avance tras cada uno.
+        progreso(hechas, total) se llama tras cada bloque; si lanza una excepción el
+        barrido se detiene y se puede reanudar después con otro procesar().
+        """
+        total = self.meta["total"]
+        cabecera = self.resultados().offset
+        # Escritura con seek en lugar de memoria mapeada: las páginas escritas no se
+        # acumulan en la memoria residente del proceso
+        with open(self._ruta_resultados, "r+b") as f:
+            for inicio in range(self.meta["hechas"], total, tamano_bloque):
+                fin = min(inicio + tamano_bloque, total)
+                idx = self.indices(inicio, fin)
+                columnas = evaluar_escenarios(_entradas_por_indices(self.meta["base"], self.ejes, idx, self.meta["mineros"]))
+                bloque = np.empty(fin - inicio, dtype=self.dtype)
+                for eje, valores in zip(self.ejes, idx):
+                    bloque[eje] = valores
+                for columna in self.meta["columnas"]:
+                    bloque[columna] = columnas[columna]
+                f.seek(cabecera + inicio * self.dtype.itemsize)
+                bloque.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+                self.meta["hechas"] = fin
+                self._guardar_meta()
+                if progreso:
+                    progreso(fin, total)
+        return self
+
+    def resultados(self):
+        """Resultados como array estructurado de solo lectura con memoria mapeada"""
+        return np.load(self._ruta_resultados, mmap_mode="r")
+
+    def columnas(self):
+        """Resultados como dict campo -> vista (p. ej. para exportar_columnas)"""
+        resultados = self.resultados()
+        return {campo: resultados[campo] for campo in self.dtype.names}
+
+    def mejores(self, columna, n=10, mayor=True, tamano_bloque=10_000_000):
+        """Índices de las n mejores filas procesadas según 'columna', recorriendo por bloques"""
+        resultados = self.resultados()
+        signo = -1 if mayor else 1
+        candidatos = np.empty(0, dtype=np.int64)
+        valores_candidatos = np.empty(0)
+        # Lectura por bloques en lugar de la memoria mapeada, como en procesar: las
+        # páginas leídas no se quedan en la memoria residente del proceso
+        with open(self._ruta_resultados, "rb") as f:
+            f.seek(resultados.offset)
+            for inicio in range(0, self.meta["hechas"], tamano_bloque):
+                fin = min(inicio + tamano_bloque, self.meta["hechas"])
+                valores = signo * np.fromfile(f, dtype=self.dtype, count=fin - inicio)[columna].astype(float)
+                k = min(n, len(valores))
+                mejores = np.argpartition(valores, k - 1)[:k]
+                candidatos = np.concatenate((candidatos, mejores + inicio))
+                valores_candidatos = np.concatenate((valores_candidatos, valores[mejores]))
+                if len(candidatos) > n:
+                    conservar = np.argpartition(valores_candidatos, n - 1)[:n]
+                    candidatos, valores_candidatos = candidatos[conservar], valores_candidatos[conservar]
+        orden = np.argsort(valores_candidatos, kind="stable")
+        return candidatos[orden]
+
+def simular_mineria_solo(ths, hashrate_eh, recompensa_btc, fees_btc, precio_btc_eur, coste_energia_anual=0.0,
+                         inversion=0.0, anios=1.0, fraccion_tiempo=1.0, bloques_dia=BLOQUES_POR_DIA,
+                         pool_eh=None, comision_pool=0.0, simulaciones=1_000_000, tamano_lote=1_000_000, semilla=None,
+                         progreso=None):
+    """
+    Minería en solitario como proceso de Poisson: el equipo encuentra bloques a un
+    ritmo ths / hashrate de la red * bloques/día. Simula 'simulaciones' periodos de
+    'anios' por lotes vectorizados.
+    Con pool_eh (EH/s del pool) modela en su lugar un pool PPLNS: el pool encuentra
+    bloques de Poisson y el equipo cobra su parte de cada uno menos la comisión.
+    Como el beneficio solo depende del número de bloques, se acumula un histograma
+    de conteos y la memoria no crece con el número de simulaciones.
+    progreso(hechas, total) se llama tras cada lote.
+    """
+    rng = np.random.default_rng(semilla)
+    dias = anios * 365.25 * fraccion_tiempo
+    hashrate_ths = hashrate_eh * 1e6  # 1 EH = 1,000,000 TH
+    lambda_solo = ths / hashrate_ths * bloques_dia * dias
+    recompensa_eur = (recompensa_btc + fees_btc) * precio_btc_eur
+    if pool_eh:
+        lambda_simulada = pool_eh / hashrate_eh * bloques_dia * dias
+        ingreso_por_bloque = recompensa_eur * ths / (pool_eh * 1e6) * (1 - comision_pool)
+    else:
+        lambda_simulada = lambda_solo
+        ingreso_por_bloque = recompensa_eur
+
+    conteos = np.zeros(1, dtype=np.int64)
+    restantes = simulaciones
+    while restantes > 0:
+        lote = min(tamano_lote, restantes)
+        bloques = rng.poisson(lambda_simulada, size=lote)
+        nuevos = np.bincount(bloques)
+        if len(nuevos) > len(conteos):
+            conteos = np.pad(conteos, (0, len(nuevos) - len(conteos)))
+        conteos[:len(nuevos)] += nuevos
+        restantes -= lote
+        if progreso:
+            progreso(simulaciones - restantes, simulaciones)
+
+    coste = coste_energia_anual * anios
+    beneficios = np.arange(len(conteos)) * ingreso_por_bloque - coste
+    probabilidades = conteos / simulaciones
+    acumulada = np.cumsum(probabilidades)
+    percentiles = {q: float(beneficios[min(np.searchsorted(acumulada, q / 100), len(beneficios) - 1)]) for q in (5, 50, 95)}
+    return {
+        "lambda": lambda_solo,
+        "prob_bloque": float(1 - probabilidades[0]) if not pool_eh else None,
+        "prob_bloque_teorica": -math.expm1(-lambda_solo),
+        "anios_primer_bloque": anios / lambda_solo if lambda_solo > 0 else math.inf,
+        "beneficio_medio": float(probabilidades @ beneficios),
+        "beneficio_esperado_teorico": lambda_solo * recompensa_eur * ((1 - comision_pool) if pool_eh else 1) - coste,
+        "percentiles": percentiles,
+        "prob_beneficio": float(probabilidades[beneficios > 0].sum()),
+        "prob_amortizar": float(probabilidades[beneficios >= inversion].sum()),
+        "desviacion": float(np.sqrt(probabilidades @ (beneficios - probabilidades @ beneficios) ** 2)),
+    }
 
 def obtener_hashprice_directo():
     """Función simplificada - siempre retorna None para usar el cálculo manual"""
@@ -75,23 +679,6 @@ def obtener_hashprice_mempool_simple():
     """Función simplificada - siempre retorna None para usar el cálculo manual"""
     return None
 
-def obtener_hashrate_eh():
-    """Obtiene el hashrate actual de la red Bitcoin"""
-    try:
-        url = "https://mempool.space/api/v1/mining/hashrate/3d"
-        resp = requests.get(url, timeout=5)
-        resp.raise_for_status()
-        data = resp.json()
-        hs = data["currentHashrate"]
-        ehs = hs / 1e18
-        return round(ehs, 2)
-    except requests.RequestException as e:
-        print(f"Error obteniendo hashrate: {e}")
-        return None
-    except (KeyError, ValueError) as e:
-        print(f"Error procesando hashrate: {e}")
-        return None
-
 def estimar_fees_mempool(block_height, subsidio_btc=3.125):
     try:
         hash_url = f"https://mempool.space/api/block-height/{block_height}"
@@ -171,6 +758,1332 @@ def obtener_fees_btc_bloque_tradicional(block_count=20, subsidio_btc=3.125):
     except Exception as e:
         return None
 
+class Proveedor:
+    """
+    Una fuente para un dato de mercado: obtener() devuelve el valor o lanza una
+    excepción. Guarda sus últimas latencias (para decidir cuándo lanzar una
+    petición de respaldo) y un disyuntor: tras 'fallos_apertura' fallos seguidos
+    deja de usarse durante 'enfriamiento_s' y después se reintenta una vez.
+    """
+
+    def __init__(self, nombre, obtener, latencia_inicial_s=1.0, muestras=50, fallos_apertura=3, enfriamiento_s=60.0):
+        self.nombre = nombre
+        self.obtener = obtener
+        self.latencia_inicial_s = latencia_inicial_s
+        self.fallos_apertura = fallos_apertura
+        self.enfriamiento_s = enfriamiento_s
+        self.latencias = deque(maxlen=muestras)
+        self.fallos_seguidos = 0
+        self.abierto_hasta = 0.0
+        self._lock = threading.Lock()
+
+    def disponible(self):
+        with self._lock:
+            return self.fallos_seguidos < self.fallos_apertura or time.monotonic() >= self.abierto_hasta
+
+    def latencia(self, percentil=0.5):
+        """Latencia (s) en el percentil dado; latencia_inicial_s hasta tener 5 muestras"""
+        with self._lock:
+            if len(self.latencias) < 5:
+                return self.latencia_inicial_s
+            return float(np.quantile(self.latencias, percentil))
+
+    def consultar(self):
+        inicio = time.monotonic()
+        try:
+            valor = self.obtener()
+            if valor is None:
+                raise ValueError(f"{self.nombre}: respuesta vacía")
+        except Exception:
+            with self._lock:
+                self.fallos_seguidos += 1
+                if self.fallos_seguidos >= self.fallos_apertura:
+                    self.abierto_hasta = time.monotonic() + self.enfriamiento_s
+            raise
+        with self._lock:
+            self.latencias.append(time.monotonic() - inicio)
+            self.fallos_seguidos = 0
+        return valor
+
+class FuentesDatos:
+    """
+    Varios proveedores por dato con peticiones cubiertas: se consulta el proveedor
+    más rápido y, si no ha respondido al llegar a su percentil de latencia (o falla),
+    se lanza el siguiente sin cancelar el anterior. Con cuorum > 1 se esperan varias
+    respuestas y se concilian con la mediana, descartando las que se alejan más de
+    'tolerancia' (relativa).
+    """
+
+    def __init__(self, proveedores, percentil=0.9, cuorum=1, tolerancia=0.02, espera_maxima_s=10.0, hilos=8):
+        self.proveedores = proveedores  # dict campo -> [Proveedor]
+        self.percentil = percentil
+        self.cuorum = cuorum
+        self.tolerancia = tolerancia
+        self.espera_maxima_s = espera_maxima_s
+        self.pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="fuentes")
+        self.en_curso = set()  # Consultas lanzadas y aún sin terminar (para cancelarlas al cerrar)
+        self.ultimas_fuentes = {}  # campo -> nombres de los proveedores usados en la última consulta
+
+    def conciliar(self, valores):
+        mediana = float(np.median(valores))
+        cercanos = [v for v in valores if abs(v - mediana) <= self.tolerancia * abs(mediana)]
+        return float(np.median(cercanos)) if cercanos else mediana
+
+    def obtener(self, campo):
+        """Valor conciliado del dato o None si ningún proveedor responde a tiempo"""
+        proveedores = [p for p in self.proveedores[campo] if p.disponible()] or list(self.proveedores[campo])
+        proveedores.sort(key=lambda p: p.latencia())
+        cuorum = min(self.cuorum, len(proveedores))
+        limite = time.monotonic() + self.espera_maxima_s
+        pendientes, resultados = {}, []
+        siguiente = 0
+        while True:
+            if siguiente < len(proveedores):
+                proveedor = proveedores[siguiente]
+                futuro = self.pool.submit(proveedor.consultar)
+                self.en_curso.add(futuro)
+                futuro.add_done_callback(self.en_curso.discard)
+                pendientes[futuro] = proveedor
+                siguiente += 1
+            restante = limite - time.monotonic()
+            if not pendientes or restante <= 0:
+                break
+            # Respaldo: esperar como mucho el percentil de latencia del último proveedor lanzado
+            espera = restante if siguiente >= len(proveedores) else min(restante, proveedor.latencia(self.percentil))
+            hechos, _ = wait(pendientes, timeout=espera, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                proveedor_hecho = pendientes.pop(futuro)
+                if futuro.exception() is None:
+                    resultados.append((proveedor_hecho.nombre, futuro.result()))
+            if len(resultados) >= cuorum:
+                break
+            if siguiente >= len(proveedores) and not pendientes:
+                break
+        self.ultimas_fuentes[campo] = [nombre for nombre, _ in resultados]
+        if not resultados:
+            return None
+        return self.conciliar([valor for _, valor in resultados])
+
+    def cerrar(self):
+        # shutdown(cancel_futures=True) no existe en Python 3.8: cancelar a mano las que no han empezado
+        for futuro in list(self.en_curso):
+            futuro.cancel()
+        self.pool.shutdown(wait=False)
+
+def _obtener_json(url, timeout=5):
+    resp = requests.get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+def crear_fuentes_mercado(url_api=URL_API_MEMPOOL):
+    """Proveedores de precio BTC (USD), cambio USD/EUR y hashrate (EH/s)"""
+    return {
+        "precio_btc": [
+            Proveedor("CoinGecko", lambda: float(_obtener_json("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd")["bitcoin"]["usd"])),
+            Proveedor("Coinbase", lambda: float(_obtener_json("https://api.coinbase.com/v2/prices/BTC-USD/spot")["data"]["amount"])),
+            Proveedor("Kraken", lambda: float(next(iter(_obtener_json("https://api.kraken.com/0/public/Ticker?pair=XBTUSD")["result"].values()))["c"][0])),
+            Proveedor("mempool.space", lambda: float(_obtener_json(f"{url_api}/v1/prices")["USD"])),
+        ],
+        "cambio_usd_eur": [
+            Proveedor("Frankfurter", lambda: round(_obtener_json("https://api.frankfurter.app/latest?from=USD&to=EUR")["rates"]["EUR"], 4)),
+            Proveedor("open.er-api", lambda: round(_obtener_json("https://open.er-api.com/v6/latest/USD")["rates"]["EUR"], 4)),
+            Proveedor("mempool.space", lambda: (lambda precios: round(precios["EUR"] / precios["USD"], 4))(_obtener_json(f"{url_api}/v1/prices"))),
+        ],
+        "hashrate_eh": [
+            Proveedor("mempool.space", lambda: round(_obtener_json(f"{url_api}/v1/mining/hashrate/3d")["currentHashrate"] / 1e18, 2)),
+            Proveedor("blockchain.info", lambda: round(float(requests.get("https://blockchain.info/q/hashrate", timeout=5).text) / 1e9, 2)),  # GH/s
+        ],
+    }
+
+def obtener_historial_hashrate(periodo="all", url_api=URL_API_MEMPOOL):
+    """Historial de hashrate de la red (timestamps en s, EH/s) desde mempool.space"""
+    resp = requests.get(f"{url_api}/v1/mining/hashrate/{periodo}", timeout=20)
+    resp.raise_for_status()
+    puntos = resp.json()["hashrates"]
+    timestamps = np.array([p["timestamp"] for p in puntos], dtype=np.int64)
+    ehs = np.array([p["avgHashrate"] for p in puntos], dtype=float) / 1e18
+    return timestamps, ehs
+
+def cargar_historial_hashrate(ruta=RUTA_CACHE_HASHRATE, max_antiguedad_s=SEGUNDOS_POR_DIA, url_api=URL_API_MEMPOOL):
+    """
+    Historial de hashrate con caché local en JSON. La primera vez descarga toda la
+    historia; después, si la caché es antigua, solo el periodo más corto que cubre
+    desde el último punto guardado y lo fusiona.
+    Sin conexión se usa la caché aunque esté caducada. Retorna (timestamps, ehs).
+    """
+    timestamps, ehs, actualizado = np.empty(0, dtype=np.int64), np.empty(0), 0
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            cache = json.load(f)
+        timestamps = np.array(cache["timestamps"], dtype=np.int64)
+        ehs = np.array(cache["ehs"], dtype=float)
+        actualizado = cache["actualizado"]
+    except (OSError, KeyError, ValueError):
+        pass
+    if timestamps.size and time.time() - actualizado < max_antiguedad_s:
+        return timestamps, ehs
+    periodo = "all"
+    if timestamps.size:
+        dias_sin_datos = (time.time() - timestamps.max()) / SEGUNDOS_POR_DIA
+        periodo = next((p for p, dias in PERIODOS_HISTORIAL_HASHRATE if dias_sin_datos < dias - 1), "all")
+    try:
+        nuevos_t, nuevos_ehs = obtener_historial_hashrate(periodo, url_api)
+    except (requests.RequestException, KeyError, ValueError) as e:
+        if timestamps.size:
+            print(f"Error actualizando historial de hashrate, se usa la caché: {e}")
+            return timestamps, ehs
+        raise
+    conservar = timestamps < (nuevos_t.min() if nuevos_t.size else np.inf)
+    timestamps = np.concatenate((timestamps[conservar], nuevos_t))
+    ehs = np.concatenate((ehs[conservar], nuevos_ehs))
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"actualizado": time.time(), "timestamps": timestamps.tolist(), "ehs": ehs.tolist()}, f)
+    return timestamps, ehs
+
+class ModeloCrecimientoHashrate:
+    """
+    Tendencia log-lineal del hashrate con estacionalidad anual (2 armónicos):
+    log(EH/s) = a + b·t + Σ (c·sen + d·cos)(2πkt), con t en años.
+    Se ajusta por ecuaciones normales acumuladas sobre una ventana móvil, de modo
+    que añadir puntos nuevos actualiza el ajuste sin recalcular desde cero.
+    Las bandas combinan la varianza residual y la de los parámetros, corregidas
+    por la autocorrelación de los residuos (muestra efectiva menor).
+    """
+    ARMONICOS = 2
+
+    def __init__(self, anios_ventana=4.0):
+        self.ventana_s = anios_ventana * SEGUNDOS_POR_ANIO
+        self.t0 = None
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.log_ehs = np.empty(0)
+        k = 2 + 2 * self.ARMONICOS
+        self._xtx = np.zeros((k, k))
+        self._xty = np.zeros(k)
+        self.coeficientes = None
+        self._cov_unitaria = None
+        self.sigma2 = None
+        self._inflado = 1.0
+
+    def _disenio(self, timestamps):
+        t = (np.asarray(timestamps, dtype=float) - self.t0) / SEGUNDOS_POR_ANIO
+        columnas = [np.ones_like(t), t]
+        for k in range(1, self.ARMONICOS + 1):
+            columnas += [np.sin(2 * np.pi * k * t), np.cos(2 * np.pi * k * t)]
+        return np.column_stack(columnas)
+
+    def _acumular(self, timestamps, log_ehs, signo):
+        x = self._disenio(timestamps)
+        self._xtx += signo * (x.T @ x)
+        self._xty += signo * (x.T @ log_ehs)
+
+    def ajustar(self, timestamps, ehs):
+        """Ajuste inicial con todo el historial disponible (se usa la ventana más reciente)"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.t0 = int(timestamps.max())
+        self.timestamps = np.empty(0, dtype=np.int64)
+        self.log_ehs = np.empty(0)
+        self._xtx[:] = 0
+        self._xty[:] = 0
+        return self.actualizar(timestamps, ehs)
+
+    def actualizar(self, timestamps, ehs):
+        """Añade puntos nuevos (y descarta los que salen de la ventana) y re-resuelve"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        ehs = np.asarray(ehs, dtype=float)
+        if self.t0 is None:
+            return self.ajustar(timestamps, ehs)
+        ultimo = self.timestamps.max() if self.timestamps.size else np.iinfo(np.int64).min
+        nuevos = (timestamps > ultimo) & (ehs > 0)
+        if nuevos.any():
+            log_nuevos = np.log(ehs[nuevos])
+            self._acumular(timestamps[nuevos], log_nuevos, +1)
+            self.timestamps = np.concatenate((self.timestamps, timestamps[nuevos]))
+            self.log_ehs = np.concatenate((self.log_ehs, log_nuevos))
+        fuera = self.timestamps < self.timestamps.max() - self.ventana_s
+        if fuera.any():
+            self._acumular(self.timestamps[fuera], self.log_ehs[fuera], -1)
+            self.timestamps = self.timestamps[~fuera]
+            self.log_ehs = self.log_ehs[~fuera]
+        self._resolver()
+        return self
+
+    def _resolver(self):
+        n, k = len(self.log_ehs), len(self._xty)
+        if n <= k:
+            raise ValueError("Historial de hashrate insuficiente para ajustar el modelo")
+        self._cov_unitaria = np.linalg.pinv(self._xtx)
+        self.coeficientes = self._cov_unitaria @ self._xty
+        residuos = self.log_ehs - self._disenio(self.timestamps) @ self.coeficientes
+        self.sigma2 = float(residuos @ residuos) / (n - k)
+        rho = float(np.clip(np.corrcoef(residuos[:-1], residuos[1:])[0, 1], 0.0, 0.99)) if n > k + 2 else 0.0
+        self._inflado = (1 + rho) / (1 - rho)  # n / n_efectiva con residuos AR(1)
+
+    @property
+    def crecimiento_anual(self):
+        """Crecimiento anual de la tendencia (0.3 = +30%/año)"""
+        return float(np.expm1(self.coeficientes[1]))
+
+    def pronosticar(self, timestamps, nivel=0.9):
+        """Pronóstico en EH/s: dict con media (mediana log-normal), inferior y superior"""
+        if self.coeficientes is None:
+            raise ValueError("El modelo de hashrate no está ajustado")
+        x = self._disenio(timestamps)
+        media_log = x @ self.coeficientes
+        var_parametros = np.einsum("ij,jk,ik->i", x, self._cov_unitaria, x) * self.sigma2 * self._inflado
+        desviacion = np.sqrt(self.sigma2 + var_parametros)
+        z = NormalDist().inv_cdf((1 + nivel) / 2)
+        return {
+            "timestamps": np.asarray(timestamps),
+            "media": np.exp(media_log),
+            "inferior": np.exp(media_log - z * desviacion),
+            "superior": np.exp(media_log + z * desviacion),
+        }
+
+    def factores_ingreso_anuales(self, hashrate_actual_eh, anios=10, desde=None, nivel=0.9):
+        """
+        Factor de ingresos de cada año frente al hashrate actual (media de H0/H(t)
+        por días). Retorna dict de arrays (anios,): media, pesimista y optimista.
+        """
+        desde = time.time() if desde is None else desde
+        dias = desde + np.arange(anios * 365) * SEGUNDOS_POR_DIA
+        pronostico = self.pronosticar(dias, nivel)
+        factores = {}
+        for clave, serie in (("media", "media"), ("pesimista", "superior"), ("optimista", "inferior")):
+            factores[clave] = (hashrate_actual_eh / pronostico[serie]).reshape(anios, 365).mean(axis=1)
+        return factores
+
+def beneficio_acumulado_proyectado(ingreso_neto_anual, costes_anuales, inversion, factores):
+    """Beneficio acumulado neto de inversión (años 0..N) con ingresos escalados por año"""
+    beneficio_anual = ingreso_neto_anual * np.asarray(factores) - costes_anuales
+    return np.concatenate(([0.0], np.cumsum(beneficio_anual))) - inversion
+
+def factores_hashprice_anuales(anios=10, recompensa_btc=3.125, fees_btc=0.0, factores_hashrate=None,
+                               crecimiento_hashrate=CRECIMIENTO_HASHRATE_ANUAL, altura_actual=None, ahora=None):
+    """
+    Hashprice de cada año (a mitad de año) relativo al actual, con precio de BTC y
+    fees constantes: halvings de la subvención según la altura (estimada por tiempo
+    si no se da) y hashrate creciente (factores del modelo o crecimiento fijo).
+    """
+    ahora = time.time() if ahora is None else ahora
+    if altura_actual is None:
+        altura_actual = ALTURA_HALVING_REFERENCIA + (ahora - TS_HALVING_REFERENCIA) / SEGUNDOS_POR_BLOQUE
+    bloques_anio = SEGUNDOS_POR_ANIO / SEGUNDOS_POR_BLOQUE
+    altura_medio = altura_actual + (np.arange(anios) + 0.5) * bloques_anio
+    halvings = (altura_medio - ALTURA_HALVING_REFERENCIA) // BLOQUES_ENTRE_HALVINGS - (altura_actual - ALTURA_HALVING_REFERENCIA) // BLOQUES_ENTRE_HALVINGS
+    recompensa = recompensa_btc * 0.5 ** halvings + fees_btc
+    if factores_hashrate is None:
+        factores_hashrate = (1 + crecimiento_hashrate) ** -(np.arange(anios) + 0.5)
+    return recompensa / (recompensa_btc + fees_btc) * np.asarray(factores_hashrate, dtype=float)[:anios]
+
+def optimizar_ciclo_vida(base, factores, mineros=MINEROS, tasa_descuento=0.0, precios_horarios=None):
+    """
+    Momento óptimo de sustituir cada equipo por programación dinámica sobre
+    años × (modelo, antigüedad) + hueco vacío. Cada máquina ocupa un hueco de la
+    flota (las máquinas son independientes, así que basta resolver uno).
+    Cada año se decide mantener, o vender (precio * reventa^antigüedad) y comprar
+    cualquier modelo del catálogo o esperar. El equipo mantenido gana su beneficio
+    anual escalado por factores[año] (se apaga si pierde dinero) y se avería con
+    probabilidad 'fallo'. Al final del horizonte se vende lo que quede.
+    base: entradas de escenario (ENTRADAS_ESCENARIO) del hueco; factores: hashprice
+    relativo de cada año (factores_hashprice_anuales).
+    precios_horarios: serie horaria de red (€/kWh); si se da, cada año cada modelo mina
+    solo sus horas rentables con el hashprice de ese año (optimizar_curtailment), como
+    en el cálculo principal.
+    Retorna por modelo inicial: valor esperado con la política óptima y sin sustituir
+    (neto de la compra), año de la primera sustitución, plan año a año y la política
+    (conservar[t][modelo, antigüedad] y compra[t], modelo a comprar o None).
+    """
+    factores = np.asarray(factores, dtype=float)
+    anios = len(factores)
+    nombres = list(mineros)
+    _, entradas = crear_escenarios({**base, "num_maquinas": 1}, modelos=nombres, mineros=mineros)
+    hashprice_eur_th_dia = evaluar_escenarios(entradas)["hashprice_eur_th_dia"][0]
+    beneficio_anual = []
+    for factor in factores:
+        entradas_anio = entradas
+        if precios_horarios is not None:
+            curtailment = optimizar_curtailment(precios_horarios, hashprice_eur_th_dia * factor, entradas["ths_unidad"],
+                                                entradas["consumo_unidad"], entradas["comision"][0])
+            entradas_anio = {**entradas, "horas_red_anuales": curtailment["horas"], "precio_red": curtailment["precio_medio"]}
+        c = evaluar_escenarios(entradas_anio)
+        ingreso = (c["ingreso_bruto_solar"] + c["ingreso_bruto_red"]) * (1 - c["comision"])
+        coste = c["energia_solar_kwh"] * c["precio_venta_solar"] + c["energia_red_kwh"] * c["precio_red"]
+        beneficio_anual.append(factor * ingreso - coste)
+    precio = entradas["precio_unidad"]
+    reventa = np.array([mineros[m].get("reventa", 0.5) for m in nombres])
+    fallo = np.array([mineros[m].get("fallo", 0.05) for m in nombres])
+    descuento = 1 / (1 + tasa_descuento)
+
+    edades = np.arange(anios + 1)
+    valor_reventa = precio[:, np.newaxis] * reventa[:, np.newaxis] ** edades  # (M, A)
+    # Beneficio del año t (la avería llega de media a mitad de año)
+    beneficio = np.maximum(np.array(beneficio_anual).reshape(anios, len(nombres)), 0) * (1 - fallo / 2)  # (T, M)
+
+    # Hacia atrás: V[t] valor al inicio del año t; el hueco vacío tiene su propio valor
+    valor = valor_reventa.copy()
+    valor_vacio = 0.0
+    decisiones = []
+    for t in range(anios - 1, -1, -1):
+        siguiente = np.concatenate((valor[:, 1:], valor[:, -1:]), axis=1)
+        mantener = beneficio[t][:, np.newaxis] + descuento * ((1 - fallo[:, np.newaxis]) * siguiente + fallo[:, np.newaxis] * valor_vacio)
+        compra = mantener[:, 0] - precio
+        mejor_compra = int(np.argmax(compra))
+        esperar = descuento * valor_vacio
+        valor_vacio = max(compra[mejor_compra], esperar)
+        vender = valor_reventa + valor_vacio
+        decisiones.append((mantener >= vender, mejor_compra if compra[mejor_compra] > esperar else None, mantener[:, 0]))
+        valor = np.maximum(mantener, vender)
+    decisiones.reverse()
+
+    # Sin sustituir: mantener hasta el final (o la avería) y vender al acabar
+    sin_sustituir = valor_reventa[:, anios]
+    for t in range(anios - 1, -1, -1):
+        sin_sustituir = beneficio[t] + descuento * (1 - fallo) * sin_sustituir
+
+    # Plan más probable (el equipo no se avería) desde cada modelo recién comprado
+    planes, anio_sustitucion = [], np.full(len(nombres), np.nan)
+    for m0 in range(len(nombres)):
+        modelo, edad, plan = m0, 0, []
+        for t in range(anios):
+            conservar, compra_optima, _ = decisiones[t]
+            if modelo is not None and t > 0 and not conservar[modelo, edad]:
+                if np.isnan(anio_sustitucion[m0]):
+                    anio_sustitucion[m0] = t
+                modelo = compra_optima
+                edad = 0
+                plan.append((t, f"vender y {'comprar ' + nombres[modelo] if modelo is not None else 'esperar'}"))
+            elif modelo is None and compra_optima is not None:
+                modelo, edad = compra_optima, 0
+                plan.append((t, f"comprar {nombres[modelo]}"))
+            if modelo is not None:
+                edad += 1
+        planes.append(plan)
+    return {
+        "modelos": nombres,
+        "valor": decisiones[0][2] - precio,
+        "valor_sin_sustituir": sin_sustituir - precio,
+        "anio_sustitucion": anio_sustitucion,
+        "planes": planes,
+        "conservar": [conservar for conservar, _, _ in decisiones],
+        "compra": [compra_optima for _, compra_optima, _ in decisiones],
+    }
+
+def normalizar_bloque_mempool(bloque):
+    """Reduce un bloque de la API/websocket de mempool.space a altura, timestamp y fees (BTC)"""
+    extras = bloque.get("extras") or {}
+    return {
+        "height": int(bloque["height"]),
+        "timestamp": int(bloque["timestamp"]),
+        "fees_btc": extras.get("totalFees", 0) / SATOSHIS_POR_BTC,
+    }
+
+def obtener_bloques_mempool(desde_altura=None, max_bloques=BLOQUES_POR_DIA, url_api=URL_API_MEMPOOL):
+    """
+    Descarga bloques recientes (de 15 en 15) hasta cubrir desde_altura o max_bloques.
+    Retorna la lista normalizada en orden ascendente de altura.
+    """
+    bloques = {}
+    url = f"{url_api}/v1/blocks"
+    while len(bloques) < max_bloques:
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        pagina = [normalizar_bloque_mempool(b) for b in resp.json()]
+        if not pagina:
+            break
+        for bloque in pagina:
+            bloques[bloque["height"]] = bloque
+        minima = min(b["height"] for b in pagina)
+        if desde_altura is not None and minima <= desde_altura:
+            break
+        url = f"{url_api}/v1/blocks/{minima - 1}"
+    ordenados = sorted(bloques.values(), key=lambda b: b["height"])
+    if desde_altura is not None:
+        ordenados = [b for b in ordenados if b["height"] >= desde_altura]
+    return ordenados[-max_bloques:]
+
+class FeedBloques(QObject):
+    """
+    Suscripción a bloques nuevos por websocket (mempool.space o el servidor de replay).
+    Al (re)conectar recupera por REST los bloques perdidos desde la última altura vista.
+    """
+    nuevo_bloque = pyqtSignal(dict)
+    estado_cambiado = pyqtSignal(str)
+
+    def __init__(self, url_ws=URL_WS_MEMPOOL, url_api=URL_API_MEMPOOL, espera_maxima=60):
+        super().__init__()
+        self.url_ws = url_ws
+        self.url_api = url_api
+        self.espera_maxima = espera_maxima
+        self.ultima_altura = None
+        # Cada ejecución tiene su propio evento y conexión: un hilo anterior que aún
+        # está saliendo no puede detener ni pisar la conexión del siguiente
+        self._detener = threading.Event()
+        self._detener.set()
+        self._conexion = {"ws": None}
+        self._hilo = None
+
+    def iniciar(self):
+        if websocket is None:
+            raise RuntimeError("El feed en vivo necesita el paquete websocket-client")
+        if self._hilo and self._hilo.is_alive() and not self._detener.is_set():
+            return
+        self._detener = threading.Event()
+        self._conexion = {"ws": None}
+        self._hilo = threading.Thread(target=self._bucle, args=(self._detener, self._conexion), daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        ws = self._conexion["ws"]
+        if ws is not None:
+            ws.abort()  # Desbloquea recv() sin el cierre ordenado, que leería del socket desde otro hilo
+
+    def _procesar(self, bloque):
+        try:
+            if "fees_btc" not in bloque:
+                bloque = normalizar_bloque_mempool(bloque)
+        except (KeyError, TypeError, ValueError):
+            return
+        if self.ultima_altura is not None and bloque["height"] <= self.ultima_altura:
+            return  # Ya visto (duplicado entre backfill y websocket)
+        self.ultima_altura = bloque["height"]
+        self.nuevo_bloque.emit(bloque)
+
+    def _backfill(self):
+        """Recupera por REST los bloques que no llegaron por el websocket"""
+        desde = self.ultima_altura + 1 if self.ultima_altura is not None else None
+        try:
+            for bloque in obtener_bloques_mempool(desde, url_api=self.url_api):
+                self._procesar(bloque)
+        except (requests.RequestException, KeyError, ValueError) as e:
+            print(f"Error recuperando bloques perdidos: {e}")
+
+    def _bucle(self, detener, conexion):
+        espera = 1
+        while not detener.is_set():
+            self._backfill()
+            try:
+                ws = conexion["ws"] = websocket.create_connection(self.url_ws, timeout=30)
+                ws.send(json.dumps({"action": "want", "data": ["blocks"]}))
+                self.estado_cambiado.emit("conectado")
+                espera = 1
+                while not detener.is_set():
+                    try:
+                        mensaje = ws.recv()
+                    except websocket.WebSocketTimeoutException:
+                        ws.send(json.dumps({"action": "ping"}))  # Mantener viva la conexión
+                        continue
+                    if not mensaje:
+                        raise websocket.WebSocketConnectionClosedException("Conexión cerrada por el servidor")
+                    datos = json.loads(mensaje)
+                    bloques = datos.get("blocks") or []
+                    if "block" in datos:
+                        bloques.append(datos["block"])
+                    for bloque in sorted(bloques, key=lambda b: b.get("height", 0)):
+                        self._procesar(bloque)
+            except (websocket.WebSocketException, OSError, ValueError) as e:
+                if detener.is_set():
+                    break
+                print(f"Feed de bloques desconectado: {e}")
+                self.estado_cambiado.emit("desconectado")
+                detener.wait(espera)
+                espera = min(espera * 2, self.espera_maxima)
+            finally:
+                if conexion["ws"] is not None:
+                    try:
+                        conexion["ws"].close()
+                    except Exception:
+                        pass
+                    conexion["ws"] = None
+
+class ServidorReplayBloques:
+    """
+    Servidor local que reproduce bloques guardados (JSON de la API de mempool.space)
+    para desarrollar y probar el feed sin conexión. Publica un bloque cada
+    intervalo segundos por websocket en /api/v1/ws y sirve /api/v1/blocks[/altura]
+    por HTTP para el backfill.
+    """
+    GUID_WEBSOCKET = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, bloques, host="127.0.0.1", puerto=8999, intervalo=2.0, bloques_iniciales=BLOQUES_POR_DIA):
+        self.bloques = sorted(bloques, key=lambda b: b["height"])
+        self.intervalo = intervalo
+        self.bloques_iniciales = min(bloques_iniciales, len(self.bloques))
+        self._inicio = time.monotonic()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, formato, *args):
+                pass
+
+            def do_GET(self):
+                if self.headers.get("Upgrade", "").lower() == "websocket":
+                    servidor._atender_websocket(self)
+                else:
+                    servidor._atender_rest(self)
+
+        self.httpd = ThreadingHTTPServer((host, puerto), Manejador)
+        self.httpd.daemon_threads = True
+        self.url_api = f"http://{host}:{self.httpd.server_address[1]}/api"
+        self.url_ws = f"ws://{host}:{self.httpd.server_address[1]}/api/v1/ws"
+        self._hilo = None
+
+    @classmethod
+    def desde_fichero(cls, ruta, **kwargs):
+        with open(ruta, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def publicados(self):
+        """Número de bloques ya publicados según el reloj del replay"""
+        transcurridos = int((time.monotonic() - self._inicio) / self.intervalo)
+        return min(len(self.bloques), self.bloques_iniciales + transcurridos)
+
+    def _atender_rest(self, manejador):
+        partes = manejador.path.rstrip("/").split("/")
+        if partes[1:4] != ["api", "v1", "blocks"]:
+            manejador.send_error(404)
+            return
+        visibles = self.bloques[:self.publicados()]
+        if len(partes) > 4:
+            try:
+                altura = int(partes[4])
+            except ValueError:
+                manejador.send_error(400)
+                return
+            visibles = [b for b in visibles if b["height"] <= altura]
+        cuerpo = json.dumps(visibles[-15:][::-1]).encode("utf-8")
+        manejador.send_response(200)
+        manejador.send_header("Content-Type", "application/json")
+        manejador.send_header("Content-Length", str(len(cuerpo)))
+        manejador.end_headers()
+        manejador.wfile.write(cuerpo)
+
+    def _atender_websocket(self, manejador):
+        clave = manejador.headers.get("Sec-WebSocket-Key", "")
+        aceptar = base64.b64encode(hashlib.sha1((clave + self.GUID_WEBSOCKET).encode()).digest()).decode()
+        manejador.send_response(101, "Switching Protocols")
+        manejador.send_header("Upgrade", "websocket")
+        manejador.send_header("Connection", "Upgrade")
+        manejador.send_header("Sec-WebSocket-Accept", aceptar)
+        manejador.end_headers()
+        manejador.wfile.flush()
+        enviados = self.publicados()
+        try:
+            self._enviar_texto(manejador.wfile, json.dumps({"blocks": self.bloques[max(0, enviados - 8):enviados]}))
+            while enviados < len(self.bloques):
+                time.sleep(min(self.intervalo, 0.5))
+                publicados = self.publicados()
+                for bloque in self.bloques[enviados:publicados]:
+                    self._enviar_texto(manejador.wfile, json.dumps({"block": bloque}))
+                enviados = publicados
+        except OSError:
+            pass  # El cliente se desconectó
+
+    @staticmethod
+    def _enviar_texto(salida, texto):
+        datos = texto.encode("utf-8")
+        if len(datos) < 126:
+            cabecera = bytes([0x81, len(datos)])
+        elif len(datos) < 65536:
+            cabecera = bytes([0x81, 126]) + len(datos).to_bytes(2, "big")
+        else:
+            cabecera = bytes([0x81, 127]) + len(datos).to_bytes(8, "big")
+        salida.write(cabecera + datos)
+        salida.flush()
+
+class SketchPercentiles:
+    """
+    Histograma de cubos logarítmicos para percentiles aproximados.
+    Altas y bajas en O(1); la consulta recorre un número fijo de cubos.
+    Error relativo por cubo ~ (maximo/minimo) ** (1/cubos) - 1 (≈2% por defecto).
+    """
+
+    def __init__(self, minimo=1e-4, maximo=10.0, cubos=512):
+        self.minimo = minimo
+        self.cubos = cubos
+        self._escala = cubos / math.log(maximo / minimo)
+        self.bordes = np.geomspace(minimo, maximo, cubos + 1)
+        self.conteos = np.zeros(cubos + 2, dtype=np.int64)  # + cubos de desbordamiento inferior/superior
+        self.total = 0
+
+    def _cubo(self, valor):
+        if valor < self.minimo:
+            return 0
+        return min(int(math.log(valor / self.minimo) * self._escala) + 1, self.cubos + 1)
+
+    def agregar(self, valor):
+        self.conteos[self._cubo(valor)] += 1
+        self.total += 1
+
+    def quitar(self, valor):
+        self.conteos[self._cubo(valor)] -= 1
+        self.total -= 1
+
+    def percentil(self, q):
+        if self.total == 0:
+            return None
+        cubo = int(np.searchsorted(np.cumsum(self.conteos), q / 100 * self.total, side="left"))
+        if cubo == 0:
+            return self.bordes[0]
+        if cubo > self.cubos:
+            return self.bordes[-1]
+        return math.sqrt(self.bordes[cubo - 1] * self.bordes[cubo])  # Centro geométrico del cubo
+
+class VentanaBloques:
+    """
+    Buffer circular de (timestamp, fees) de los bloques dentro de una ventana temporal.
+    Los timestamps de Bitcoin no son monótonos (solo deben superar la mediana de los
+    11 anteriores), así que la ventana se mide desde el más reciente visto; los
+    bloques salen en orden de llegada, lo que deja un margen de unas horas en el borde.
+    """
+
+    def __init__(self, duracion_s):
+        self.duracion_s = duracion_s
+        bloques_esperados = duracion_s // SEGUNDOS_POR_BLOQUE
+        self.capacidad = max(16, 2 * bloques_esperados)  # Margen para rachas de bloques rápidos
+        self.timestamps = np.zeros(self.capacidad, dtype=np.int64)
+        self.fees = np.zeros(self.capacidad, dtype=float)
+        self.inicio = 0
+        self.n = 0
+        self.suma = 0.0
+        self.alfa = 2 / (bloques_esperados + 1) if bloques_esperados else 1.0
+        self.ema = None
+        self.sketch = SketchPercentiles()
+        self.maximo_timestamp = None
+
+    def _quitar_mas_antiguo(self):
+        fees = self.fees[self.inicio]
+        self.suma -= fees
+        self.sketch.quitar(fees)
+        self.inicio = (self.inicio + 1) % self.capacidad
+        self.n -= 1
+
+    def agregar(self, timestamp, fees):
+        """Añade un bloque y expulsa los que salen de la ventana (O(1) amortizado)"""
+        if self.maximo_timestamp is not None and self.maximo_timestamp - timestamp >= self.duracion_s:
+            return  # Llega tarde y ya queda fuera de la ventana
+        self.maximo_timestamp = timestamp if self.maximo_timestamp is None else max(self.maximo_timestamp, timestamp)
+        while self.n and (self.maximo_timestamp - self.timestamps[self.inicio] >= self.duracion_s or self.n == self.capacidad):
+            self._quitar_mas_antiguo()
+        fin = (self.inicio + self.n) % self.capacidad
+        self.timestamps[fin] = timestamp
+        self.fees[fin] = fees
+        self.n += 1
+        self.suma += fees
+        self.sketch.agregar(fees)
+        self.ema = fees if self.ema is None else self.ema + self.alfa * (fees - self.ema)
+
+    def media(self):
+        return self.suma / self.n if self.n else None
+
+    def primer_timestamp(self):
+        """Timestamp más antiguo de la ventana (no tiene por qué ser el del primer bloque llegado)"""
+        if not self.n:
+            return None
+        return int(self.timestamps[(self.inicio + np.arange(self.n)) % self.capacidad].min())
+
+    def ultimo_timestamp(self):
+        """Timestamp más reciente visto, desde el que se mide la ventana"""
+        return int(self.maximo_timestamp) if self.n else None
+
+class EstadisticasBloques:
+    """
+    Estadísticas continuas del flujo de bloques sobre varias ventanas (1h, 24h, 7d, 30d):
+    media, EMA y percentiles de fees por bloque y ritmo observado de bloques/día.
+    """
+
+    def __init__(self, ventanas=VENTANAS_BLOQUES):
+        self.ventanas = {nombre: VentanaBloques(duracion) for nombre, duracion in ventanas.items()}
+        self.primer_timestamp = None
+
+    def agregar(self, bloque):
+        if self.primer_timestamp is None or bloque["timestamp"] < self.primer_timestamp:
+            self.primer_timestamp = bloque["timestamp"]
+        for ventana in self.ventanas.values():
+            ventana.agregar(bloque["timestamp"], bloque["fees_btc"])
+
+    def media(self, ventana):
+        return self.ventanas[ventana].media()
+
+    def ema(self, ventana):
+        return self.ventanas[ventana].ema
+
+    def percentil(self, ventana, q):
+        return self.ventanas[ventana].sketch.percentil(q)
+
+    def bloques_dia(self, ventana):
+        """
+        Ritmo observado de bloques/día. Si todavía no hay historia para cubrir la
+        ventana entera se extrapola desde el intervalo observado; None si no hay datos.
+        """
+        v = self.ventanas[ventana]
+        if v.n == 0:
+            return None
+        ultimo = v.ultimo_timestamp()
+        if ultimo - self.primer_timestamp >= v.duracion_s:
+            return v.n * SEGUNDOS_POR_DIA / v.duracion_s
+        intervalo = ultimo - v.primer_timestamp()
+        if v.n < 2 or intervalo <= 0:
+            return None
+        return (v.n - 1) * SEGUNDOS_POR_DIA / intervalo
+
+    def cobertura(self, ventana):
+        """
+        Fracción (0-1) de la ventana cubierta por la historia recibida. El backfill
+        solo trae un día de bloques, así que 7d y 30d tardan en llenarse.
+        """
+        v = self.ventanas[ventana]
+        if v.n == 0:
+            return 0.0
+        return min(1.0, (v.ultimo_timestamp() - self.primer_timestamp + SEGUNDOS_POR_BLOQUE) / v.duracion_s)
+
+    def etiqueta(self, ventana):
+        """Nombre de la ventana con los bloques que contiene y aviso si aún está incompleta"""
+        v = self.ventanas[ventana]
+        if v.n == 0:
+            return f"{ventana} (sin datos)"
+        cobertura = self.cobertura(ventana)
+        return f"{ventana} ({v.n} bloques{'' if cobertura >= 1 else f', ⚠️ {cobertura * 100:.0f}% cubierta'})"
+
+    def resumen(self):
+        """Texto con las estadísticas de todas las ventanas (para tooltips)"""
+        lineas = []
+        for nombre, v in self.ventanas.items():
+            if v.n == 0:
+                continue
+            bloques_dia = self.bloques_dia(nombre)
+            cobertura = self.cobertura(nombre)
+            lineas.append(
+                f"{nombre}: {v.n} bloques, media {v.media():.3f} BTC, EMA {v.ema:.3f} BTC, "
+                f"p50 {self.percentil(nombre, 50):.3f}, p90 {self.percentil(nombre, 90):.3f}, "
+                f"{'-' if bloques_dia is None else f'{bloques_dia:.1f}'} bloques/día"
+                f"{'' if cobertura >= 1 else f' (incompleta: {cobertura * 100:.0f}% de la ventana)'}"
+            )
+        return "\n".join(lineas)
+
+class EspacioComparacion:
+    """
+    Escenarios lado a lado guardados como columnas. Cada columna derivada se
+    memoiza y, al editar una entrada, solo se recalculan las columnas que dependen
+    de ella (p. ej. cambiar la tarifa no recalcula el hashprice EUR/TH/día).
+    """
+
+    def __init__(self, etiquetas, entradas):
+        self.etiquetas = list(etiquetas)
+        self._columnas = {nombre: np.array(entradas[nombre], dtype=float) for nombre in ENTRADAS_ESCENARIO}
+        self._dependientes = {nombre: set() for nombre in ENTRADAS_ESCENARIO}
+        for nombre, dependencias, _ in COLUMNAS_DERIVADAS:
+            self._dependientes[nombre] = set()
+            for dependencia in dependencias:
+                self._dependientes[dependencia].add(nombre)
+        self._sucias = {nombre for nombre, _, _ in COLUMNAS_DERIVADAS}
+        self.recalculadas = []  # Columnas recalculadas en la última evaluación
+
+    def __len__(self):
+        return len(self.etiquetas)
+
+    def _marcar_sucias(self, nombre):
+        for dependiente in self._dependientes[nombre]:
+            if dependiente not in self._sucias:
+                self._sucias.add(dependiente)
+                self._marcar_sucias(dependiente)
+
+    def editar(self, campo, valor, indices=None):
+        """Cambia una entrada (en todos los escenarios o solo en los índices dados)"""
+        if campo not in ENTRADAS_ESCENARIO:
+            raise KeyError(f"'{campo}' no es una entrada editable")
+        if indices is None:
+            self._columnas[campo][:] = valor
+        else:
+            self._columnas[campo][indices] = valor
+        self._marcar_sucias(campo)
+
+    def columnas(self):
+        """Todas las columnas, recalculando solo las derivadas marcadas como sucias"""
+        self.recalculadas = []
+        for nombre, dependencias, funcion in COLUMNAS_DERIVADAS:
+            if nombre in self._sucias:
+                self._columnas[nombre] = np.asarray(funcion(*(self._columnas[d] for d in dependencias)), dtype=float)
+                self.recalculadas.append(nombre)
+        self._sucias.clear()
+        return self._columnas
+
+    def columna(self, nombre):
+        return self.columnas()[nombre]
+
+def generar_html_resultados(
+    *, nombre_minero, num_minero, ths, consumo_kw, eficiencia_w_th,
+    precio_equipo, comision, solar_activado, red_activada, amortizacion,
+    amortizacion_red, amortizacion_total, produccion_total, beneficio_10_anios, produccion_tabla_solar,
+    coste_tabla_solar, fees_tabla_solar, beneficio_tabla_solar, potencia_fotovoltaica_kwp, energia_consumida_kwh,
+    euros_por_kwh_bruto, euros_por_kwh, produccion_tabla_red, coste_tabla_red, fees_tabla_red,
+    beneficio_tabla_red, horas_red_anuales, consumo_red_anual, euros_por_kwh_red_bruto, euros_por_kwh_red,
+    rentabilidad_bruta_combinada, rentabilidad_neta_combinada,
+    secciones_extra="",
+):
+    """HTML de la ventana de resultados de un escenario (valores anuales ya calculados)"""
+    return (
+        f"<br>"
+        # DATOS DEL MINERO
+        f"<div style='text-align:center;'><b>🔨 DATOS DEL MINERO</b></div><br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr><td>💻 <b>Modelo</b></td><td><b>{nombre_minero}</b></td></tr>"
+        f"<tr><td>📟 <b>Máquinas</b></td><td>{num_minero}</td></tr>"
+        f"<tr><td>🚀 <b>Hashrate</b></td><td>{ths:.1f} TH/s</td></tr>"
+        f"<tr><td>🪫 <b>Potencia</b></td><td>{consumo_kw:.3f} kW</td></tr>"
+        f"<tr><td>✨ <b>Eficiencia energética</b></td><td>{eficiencia_w_th:.2f} W/TH</td></tr>"
+        f"<tr><td>💎 <b>Coste por terahash</b></td><td>{precio_equipo/ths:.2f} €/TH</td></tr>"
+        f"<tr><td>💶 <b>Inversión en equipos</b></td><td>{precio_equipo:.2f} €</td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<hr>"
+        f"<br>"
+        # AMORTIZACIÓN
+        f"<div style='text-align:center;'><b>💰 BENEFICIOS</b></div><br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr><td style='background:white;'>🌞 <b>Amortización solar</b></td><td style='background:{'white' if not solar_activado else ('#ffcccc' if amortizacion <= 0 else '#e8f5e8')};'>{'-' if solar_activado and amortizacion == 0 else ''}{amortizacion:.2f} años</td></tr>"
+        f"<tr><td style='background:white;'>🏭 <b>Amortización red</b></td><td style='background:{'white' if not red_activada else ('#ffcccc' if amortizacion_red <= 0 else '#e8f5e8')};'>{'-' if red_activada and amortizacion_red == 0 else ''}{amortizacion_red:.2f} años</td></tr>"
+        f"<tr><td style='background:white;'>🔄 <b>Amortización combinada</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('#ffcccc' if amortizacion_total <= 0 else '#e8f5e8')};'>{'-' if (solar_activado or red_activada) and amortizacion_total == 0 else ''}{amortizacion_total:.2f} años</td></tr>"
+        f"<tr><td style='background:white;'>🖐 <b>Beneficio neto en 5 años</b></td><td style='background:{'white' if (produccion_total * 5 - precio_equipo) == 0 else ('#ffcccc' if (produccion_total * 5 - precio_equipo) < 0 else '#e8f5e8')};'>{(produccion_total * 5 - precio_equipo):.2f} €</td></tr>"
+        f"<tr><td style='background:white;'>🙌 <b>Beneficio neto en 10 años</b></td><td style='background:{'white' if beneficio_10_anios == 0 else ('#ffcccc' if beneficio_10_anios < 0 else '#e8f5e8')};'>{beneficio_10_anios:.2f} €</td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<hr>"
+        f"<br>"
+        # SOLAR
+        f"<div style='text-align:center;'><b>🌞 PRODUCCIÓN SOLAR</b></div><br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
+        f"<tr><td><b>💶 Producción</b></td>"
+        f"<td>{produccion_tabla_solar/365:.2f} €</td>"
+        f"<td>{produccion_tabla_solar/12:.2f} €</td>"
+        f"<td>{produccion_tabla_solar:.2f} €</td></tr>"
+        f"<tr><td><b>💸 Excedente no vendido</b></td>"
+        f"<td>{coste_tabla_solar/365:.2f} €</td>"
+        f"<td>{coste_tabla_solar/12:.2f} €</td>"
+        f"<td>{coste_tabla_solar:.2f} €</td></tr>"
+        f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
+        f"<td>-{fees_tabla_solar/365:.3f} €</td>"
+        f"<td>-{fees_tabla_solar/12:.3f} €</td>"
+        f"<td>-{fees_tabla_solar:.3f} €</td></tr>"
+        f"<tr><td style='background:white;'><b>{'❌' if beneficio_tabla_solar < 0 else '✅'} Beneficio neto</b></td>"
+        f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar/365:.2f} €</b></td>"
+        f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar/12:.2f} €</b></td>"
+        f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar:.2f} €</b></td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr><td>🔆 <b>Potencia fotovoltaica</b></td><td>{potencia_fotovoltaica_kwp:.2f} kWp</td></tr>"
+        f"<tr><td>🪫 <b>Consumo anual</b></td><td>{energia_consumida_kwh:.1f} kWh</td></tr>"
+        f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not solar_activado else ('white' if euros_por_kwh_bruto == 0 else ('#ffcccc' if euros_por_kwh_bruto < 0 else '#e8f5e8'))};'>{euros_por_kwh_bruto:.3f} €/kWh</td></tr>"
+        f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not solar_activado else ('white' if euros_por_kwh == 0 else ('#ffcccc' if euros_por_kwh < 0 else '#e8f5e8'))};'>{euros_por_kwh:.3f} €/kWh</td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<hr>"
+        f"<br>"
+        # ELÉCTRICA
+        f"<div style='text-align:center;'><b>🏭 PRODUCCIÓN ELÉCTRICA</b></div><br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
+        f"<tr><td><b>💶 Producción</b></td>"
+        f"<td>{produccion_tabla_red/365:.2f} €</td>"
+        f"<td>{produccion_tabla_red/12:.2f} €</td>"
+        f"<td>{produccion_tabla_red:.2f} €</td></tr>"
+        f"<tr><td><b>💡 Electricidad</b></td>"
+        f"<td>{coste_tabla_red/365:.2f} €</td>"
+        f"<td>{coste_tabla_red/12:.2f} €</td>"
+        f"<td>{coste_tabla_red:.2f} €</td></tr>"
+        f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
+        f"<td>-{fees_tabla_red/365:.3f} €</td>"
+        f"<td>-{fees_tabla_red/12:.3f} €</td>"
+        f"<td>-{fees_tabla_red:.3f} €</td></tr>"
+        f"<tr><td style='background:white;'><b>{'❌' if beneficio_tabla_red < 0 else '✅'} Beneficio neto</b></td>"
+        f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red/365:.2f} €</b></td>"
+        f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red/12:.2f} €</b></td>"
+        f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red:.2f} €</b></td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr><td>⏱️ <b>Horas de uso/año</b></td><td>{horas_red_anuales:.0f} h</td></tr>"
+        f"<tr><td>🪫 <b>Consumo anual</b></td><td>{consumo_red_anual:.1f} kWh</td></tr>"
+        f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not red_activada else ('white' if euros_por_kwh_red_bruto == 0 else ('#ffcccc' if euros_por_kwh_red_bruto < 0 else '#e8f5e8'))};'>{euros_por_kwh_red_bruto:.3f} €/kWh</td></tr>"
+        f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not red_activada else ('white' if euros_por_kwh_red == 0 else ('#ffcccc' if euros_por_kwh_red < 0 else '#e8f5e8'))};'>{euros_por_kwh_red:.3f} €/kWh</td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<hr>"
+        f"<br>"
+        f"{secciones_extra}"
+        # SOLAR Y RED
+        f"<div style='text-align:center;'><b>🌞 + 🏭 PRODUCCIÓN COMBINADA</b></div><br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
+        f"<tr><td><b>💶 Producción</b></td>"
+        f"<td>{(produccion_tabla_solar + produccion_tabla_red)/365:.2f} €</td>"
+        f"<td>{(produccion_tabla_solar + produccion_tabla_red)/12:.2f} €</td>"
+        f"<td>{(produccion_tabla_solar + produccion_tabla_red):.2f} €</td></tr>"
+        f"<tr><td><b>💡 + 💸 Gastos</b></td>"
+        f"<td>{(coste_tabla_solar + coste_tabla_red)/365:.2f} €</td>"
+        f"<td>{(coste_tabla_solar + coste_tabla_red)/12:.2f} €</td>"
+        f"<td>{(coste_tabla_solar + coste_tabla_red):.2f} €</td></tr>"
+        f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
+        f"<td>-{(fees_tabla_solar + fees_tabla_red)/365:.3f} €</td>"
+        f"<td>-{(fees_tabla_solar + fees_tabla_red)/12:.3f} €</td>"
+        f"<td>-{(fees_tabla_solar + fees_tabla_red):.3f} €</td></tr>"
+        f"<tr><td style='background:white;'><b>{'❌' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '✅'} Beneficio neto</b></td>"
+        f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red)/365:.2f} €</b></td>"
+        f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red)/12:.2f} €</b></td>"
+        f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red):.2f} €</b></td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<br>"
+        f"<div style='text-align:center;'>"
+        f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+        f"<tr><td>🪫 <b>Consumo anual total</b></td><td>{(energia_consumida_kwh + consumo_red_anual):.1f} kWh</td></tr>"
+        f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('white' if rentabilidad_bruta_combinada == 0 else ('#ffcccc' if rentabilidad_bruta_combinada < 0 else '#e8f5e8'))};'>{rentabilidad_bruta_combinada:.3f} €/kWh</td></tr>"
+        f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('white' if rentabilidad_neta_combinada == 0 else ('#ffcccc' if rentabilidad_neta_combinada < 0 else '#e8f5e8'))};'>{rentabilidad_neta_combinada:.3f} €/kWh</td></tr>"
+        f"</table>"
+        f"</div>"
+        f"<br>"
+        f"<br>"
+    )
+
+
+def valores_informe_escenario(columnas, i, nombre_minero):
+    """Argumentos de generar_html_resultados para la fila i de unas columnas de escenarios"""
+    c = {nombre: float(valores[i]) for nombre, valores in columnas.items()}
+    solar_activado = c["horas_solares_anuales"] > 0
+    red_activada = c["horas_red_anuales"] > 0
+    coste_solar = c["energia_solar_kwh"] * c["precio_venta_solar"]
+    coste_red = c["energia_red_kwh"] * c["precio_red"]
+    energia_total = c["energia_solar_kwh"] + c["energia_red_kwh"]
+    return {
+        "nombre_minero": nombre_minero,
+        "num_minero": int(c["num_maquinas"]),
+        "ths": c["ths"],
+        "consumo_kw": c["consumo_kw"],
+        "eficiencia_w_th": c["consumo_kw"] * 1000 / c["ths"] if c["ths"] > 0 else 0,
+        "precio_equipo": c["inversion"],
+        "comision": c["comision"],
+        "solar_activado": solar_activado,
+        "red_activada": red_activada,
+        "amortizacion": c["inversion"] / c["beneficio_solar"] if c["beneficio_solar"] > 0 else 0,
+        "amortizacion_red": c["inversion"] / c["beneficio_red"] if red_activada and c["beneficio_red"] > 0 else 0,
+        "amortizacion_total": c["inversion"] / c["beneficio_anual"] if c["beneficio_anual"] > 0 else 0,
+        "produccion_total": c["beneficio_anual"],
+        "beneficio_10_anios": c["beneficio_10_anios"],
+        "produccion_tabla_solar": c["ingreso_bruto_solar"],
+        "coste_tabla_solar": -coste_solar,
+        "fees_tabla_solar": c["ingreso_bruto_solar"] * c["comision"],
+        "beneficio_tabla_solar": c["beneficio_solar"],
+        "potencia_fotovoltaica_kwp": c["consumo_kw"] / FACTOR_RENDIMIENTO_SOLAR if solar_activado else 0,
+        "energia_consumida_kwh": c["energia_solar_kwh"],
+        "euros_por_kwh_bruto": c["ingreso_bruto_solar"] / c["energia_solar_kwh"] if c["energia_solar_kwh"] else 0,
+        "euros_por_kwh": c["beneficio_solar"] / c["energia_solar_kwh"] if c["energia_solar_kwh"] else 0,
+        "produccion_tabla_red": c["ingreso_bruto_red"],
+        "coste_tabla_red": -coste_red,
+        "fees_tabla_red": c["ingreso_bruto_red"] * c["comision"],
+        "beneficio_tabla_red": c["beneficio_red"],
+        "horas_red_anuales": c["horas_red_anuales"],
+        "consumo_red_anual": c["energia_red_kwh"],
+        "euros_por_kwh_red_bruto": c["ingreso_bruto_red"] / c["energia_red_kwh"] if c["energia_red_kwh"] else 0,
+        "euros_por_kwh_red": c["beneficio_red"] / c["energia_red_kwh"] if c["energia_red_kwh"] else 0,
+        "rentabilidad_bruta_combinada": (c["ingreso_bruto_solar"] + c["ingreso_bruto_red"]) / energia_total if energia_total > 0 else 0,
+        "rentabilidad_neta_combinada": c["beneficio_anual"] / energia_total if energia_total > 0 else 0,
+    }
+
+class RenderizadorAmortizacion:
+    """
+    Gráfica de amortización offscreen (Agg, sin pyplot ni ventanas) para lotes de
+    escenarios: la figura y sus artistas se crean una vez y se reutilizan.
+    """
+
+    def __init__(self):
+        self.anios = np.arange(0, 11)  # De 0 a 10 años
+        self.figura = Figure(figsize=(8, 5))
+        self.canvas = FigureCanvasAgg(self.figura)
+        self.ejes = self.figura.add_subplot(111)
+        self.linea_beneficio, = self.ejes.plot(self.anios, np.zeros(len(self.anios)), label="Beneficio acumulado", marker='o')
+        self.linea_inversion = self.ejes.axhline(0, color='red', linestyle='--', label="Inversión inicial")
+        self.linea_amortizacion = self.ejes.axvline(0, color='green', linestyle=':', label="Amortización")
+        self.ejes.set_xlabel("Años")
+        self.ejes.set_ylabel("€")
+        self.ejes.set_title("Punto de amortización")
+        self.ejes.grid(True)
+        self.figura.tight_layout()  # Una sola vez: el título se sustituye por otro de la misma altura
+
+    def dibujar(self, beneficio_anual, inversion, nombre_minero):
+        self.linea_beneficio.set_ydata(beneficio_anual * self.anios)
+        self.linea_inversion.set_ydata([inversion, inversion])
+        x_amort = inversion / beneficio_anual if beneficio_anual > 0 else None
+        visible = x_amort is not None and x_amort <= self.anios[-1]
+        self.linea_amortizacion.set_visible(visible)
+        if visible:
+            self.linea_amortizacion.set_xdata([x_amort, x_amort])
+            self.linea_amortizacion.set_label(f"Amortización: {x_amort:.2f} años")
+        self.ejes.legend(handles=[self.linea_beneficio, self.linea_inversion] + ([self.linea_amortizacion] if visible else []))
+        self.ejes.set_title(f"Punto de amortización - {nombre_minero}")
+        self.ejes.relim()
+        self.ejes.autoscale_view()
+
+    def guardar(self, destino, formato):
+        if formato == "png":
+            # Un único renderizado Agg y codificación directa del buffer (savefig dibuja dos veces)
+            self.canvas.draw()
+            mpimg.imsave(destino, np.asarray(self.canvas.buffer_rgba()), format="png")
+        else:
+            self.figura.savefig(destino, format=formato)
+
+def _nombre_fichero_informe(indice, etiqueta):
+    return f"{indice:05d}_{re.sub(r'[^A-Za-z0-9._+-]+', '_', etiqueta).strip('_')}"
+
+_renderizador_proceso = None
+_aplicacion_informes = None
+
+def _aplicacion_qt_offscreen():
+    """QGuiApplication sin pantalla para maquetar los PDF si el proceso no tiene ya una"""
+    global _aplicacion_informes
+    if QGuiApplication.instance() is None:
+        os.environ["QT_QPA_PLATFORM"] = "offscreen"
+        _aplicacion_informes = QGuiApplication([])
+
+def _inicializar_proceso_informes():
+    global _renderizador_proceso
+    _renderizador_proceso = RenderizadorAmortizacion()
+    _aplicacion_qt_offscreen()
+
+def html_informe(valores, imagen_src):
+    """Documento HTML completo del informe de un escenario: tablas de resultados y gráfica"""
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>📊 Resultados - {valores['nombre_minero']}</title></head>"
+        f"<body style='font-family: system-ui, sans-serif; font-size: 13px;'>"
+        f"{generar_html_resultados(**valores)}"
+        f"<div style='text-align:center;'><img src='{imagen_src}' width='640'></div>"
+        f"</body></html>"
+    )
+
+def guardar_pdf_informe(ruta, valores, png):
+    """PDF A4 con el mismo informe que el HTML (tablas + gráfica), maquetado con QTextDocument"""
+    _aplicacion_qt_offscreen()
+    documento = QTextDocument()
+    documento.addResource(QTextDocument.ImageResource, QUrl("grafica.png"), QImage.fromData(png))
+    documento.setHtml(html_informe(valores, "grafica.png"))
+    pdf = QPdfWriter(ruta)
+    pdf.setPageSize(QPageSize(QPageSize.A4))
+    pdf.setResolution(96)  # La misma escala que en pantalla: a 1200 ppp (por defecto) el texto sale diminuto
+    pdf.setTitle(f"Resultados - {valores['nombre_minero']}")
+    documento.print_(pdf)
+
+def _generar_bloque_informes(tareas, carpeta, formatos):
+    """Genera en un proceso del pool los informes de un bloque de escenarios"""
+    renderizador = _renderizador_proceso or RenderizadorAmortizacion()
+    for indice, valores in tareas:
+        base = os.path.join(carpeta, _nombre_fichero_informe(indice, valores["nombre_minero"]))
+        renderizador.dibujar(valores["produccion_total"], valores["precio_equipo"], valores["nombre_minero"])
+        png = io.BytesIO()
+        renderizador.guardar(png, "png")
+        if "png" in formatos:
+            with open(base + ".png", "wb") as f:
+                f.write(png.getvalue())
+        if "pdf" in formatos:
+            guardar_pdf_informe(base + ".pdf", valores, png.getvalue())
+        if "html" in formatos:
+            imagen = base64.b64encode(png.getvalue()).decode("ascii")
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(html_informe(valores, f"data:image/png;base64,{imagen}"))
+    return len(tareas)
+
+def generar_informes_lote(columnas, etiquetas, carpeta, formatos=("html", "png", "pdf"), procesos=None, tamano_bloque=32, progreso=None):
+    """
+    Genera un informe por escenario (HTML y PDF con las tablas y la gráfica, PNG de la gráfica)
+    repartiendo bloques de escenarios en un pool de procesos con renderizado offscreen.
+    progreso(hechos, total) se llama al terminar cada bloque; si lanza una excepción
+    (p. ej. TrabajoCancelado) se descartan los bloques pendientes.
+    Retorna dict con informes, segundos e informes_por_segundo.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    tareas = [(i, valores_informe_escenario(columnas, i, etiqueta)) for i, etiqueta in enumerate(etiquetas)]
+    bloques = [tareas[i:i + tamano_bloque] for i in range(0, len(tareas), tamano_bloque)]
+    inicio = time.perf_counter()
+    hechos = 0
+    # 'spawn' evita heredar el estado de Qt de la aplicación en los procesos hijos
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_inicializar_proceso_informes) as pool:
+        futuros = [pool.submit(_generar_bloque_informes, bloque, carpeta, tuple(formatos)) for bloque in bloques]
+        try:
+            for futuro in as_completed(futuros):
+                hechos += futuro.result()
+                if progreso:
+                    progreso(hechos, len(tareas))
+        except BaseException:
+            # Cancelación o error: descartar los bloques que aún no han empezado
+            # (a mano: shutdown(cancel_futures=True) no existe en Python 3.8)
+            for futuro in futuros:
+                futuro.cancel()
+            raise
+    segundos = time.perf_counter() - inicio
+    return {"informes": hechos, "segundos": segundos, "informes_por_segundo": hechos / segundos if segundos > 0 else 0}
+
+class TrabajoCancelado(Exception):
+    """Se lanza dentro de un trabajo cuando se ha pedido su cancelación"""
+
+class SenalesTrabajo(QObject):
+    progreso = pyqtSignal(int)  # 0-100
+    parcial = pyqtSignal(object)
+    terminado = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelado = pyqtSignal()
+
+class ControlTrabajo:
+    """
+    Lo que recibe la función de un trabajo para informar de su avance y
+    comprobar si se ha cancelado. Los avances se limitan a uno cada
+    intervalo_s para no saturar el bucle de eventos de la interfaz.
+    """
+
+    def __init__(self, senales, intervalo_s=0.05):
+        self.senales = senales
+        self.intervalo_s = intervalo_s
+        self._cancelado = threading.Event()
+        self._ultimo_aviso = 0.0
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def comprobar(self):
+        if self._cancelado.is_set():
+            raise TrabajoCancelado()
+
+    def progreso(self, fraccion, parcial=None):
+        """Informa del avance (0-1) y, opcionalmente, de un resultado parcial"""
+        self.comprobar()
+        if parcial is not None:
+            self.senales.parcial.emit(parcial)
+        ahora = time.monotonic()
+        if fraccion >= 1 or ahora - self._ultimo_aviso >= self.intervalo_s:
+            self._ultimo_aviso = ahora
+            self.senales.progreso.emit(int(fraccion * 100))
+
+class Trabajo(QRunnable):
+    """Ejecuta funcion(control, *args, **kwargs) en un hilo del pool"""
+
+    def __init__(self, funcion, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)  # La referencia la mantiene GestorTrabajos
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = SenalesTrabajo()
+        self.control = ControlTrabajo(self.senales)
+
+    def cancelar(self):
+        self.control.cancelar()
+
+    def run(self):
+        try:
+            resultado = self.funcion(self.control, *self.args, **self.kwargs)
+        except TrabajoCancelado:
+            self.senales.cancelado.emit()
+        except Exception as e:
+            self.senales.error.emit(str(e))
+        else:
+            self.senales.terminado.emit(resultado)
+
+class GestorTrabajos(QObject):
+    """
+    Cola de análisis pesados sobre QThreadPool con concurrencia limitada.
+    Por defecto deja un núcleo libre para la interfaz.
+    """
+    activos_cambiados = pyqtSignal(int)
+
+    def __init__(self, max_hilos=None):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_hilos or max(1, QThread.idealThreadCount() - 1))
+        self.activos = set()
+
+    def enviar(self, funcion, *args, al_terminar=None, al_progreso=None, al_parcial=None, al_error=None, al_cancelar=None, **kwargs):
+        trabajo = Trabajo(funcion, *args, **kwargs)
+        senales = trabajo.senales
+        for senal, manejador in ((senales.terminado, al_terminar), (senales.progreso, al_progreso),
+                                 (senales.parcial, al_parcial), (senales.error, al_error), (senales.cancelado, al_cancelar)):
+            if manejador:
+                senal.connect(manejador)
+        for senal in (senales.terminado, senales.error, senales.cancelado):
+            senal.connect(lambda *_, t=trabajo: self._finalizar(t))
+        self.activos.add(trabajo)
+        self.activos_cambiados.emit(len(self.activos))
+        self.pool.start(trabajo)
+        return trabajo
+
+    def _finalizar(self, trabajo):
+        self.activos.discard(trabajo)
+        self.activos_cambiados.emit(len(self.activos))
+
+    def cancelar_todos(self):
+        for trabajo in list(self.activos):
+            trabajo.cancelar()
+
+def refrescar_datos_red(control, fuentes):
+    """
+    Trabajo: descarga los datos de red en paralelo (precio, cambio y hashrate a través
+    de FuentesDatos; fees de mempool.space) y emite cada uno como resultado parcial
+    (campo, valor) según va llegando.
+    """
+    # Pool propio: las consultas de FuentesDatos usan el suyo para las peticiones cubiertas
+    pool = ThreadPoolExecutor(max_workers=4)
+    futuros = {pool.submit(fuentes.obtener, campo): campo for campo in ("cambio_usd_eur", "precio_btc", "hashrate_eh")}
+    futuros[pool.submit(obtener_fees_btc_bloque_mempool)] = "fees_btc_bloque"
+    try:
+        for i, futuro in enumerate(as_completed(futuros)):
+            control.progreso((i + 1) / len(futuros), (futuros[futuro], futuro.result()))
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+        pool.shutdown(wait=False)
+
+def ajustar_modelo_hashrate(control, modelo=None, **kwargs):
+    """
+    Trabajo: carga el historial de hashrate (caché o red) y ajusta el modelo de
+    crecimiento. Con un modelo ya ajustado se actualiza de forma incremental una
+    copia (solo con los puntos nuevos), sin tocar el que está usando la interfaz.
+    """
+    timestamps, ehs = cargar_historial_hashrate(**kwargs)
+    control.progreso(0.5)
+    if modelo is None:
+        return ModeloCrecimientoHashrate().ajustar(timestamps, ehs)
+    return copy.deepcopy(modelo).actualizar(timestamps, ehs)
+
 class VentanaResultados(QWidget):
     def __init__(self, resultado_html, nombre_minero, ventana_principal=None, offset_cascada=0):
         super().__init__()
@@ -252,6 +2165,303 @@ class VentanaResultados(QWidget):
         layout.addWidget(scroll_area)
         self.setLayout(layout)
 
+class ItemNumerico(QTableWidgetItem):
+    """Celda de tabla que ordena por su valor numérico y no por el texto"""
+
+    def __init__(self, valor, formato):
+        super().__init__()
+        self.formato = formato
+        self.fijar(valor)
+
+    def fijar(self, valor):
+        self.valor = float(valor)
+        self.setText(self.formato.format(self.valor) if np.isfinite(self.valor) else "-")
+
+    def __lt__(self, otro):
+        return self.valor < getattr(otro, "valor", 0)
+
+class VentanaComparacion(QWidget):
+    """Tabla ordenable y curvas de amortización superpuestas para N escenarios"""
+
+    # (columna, cabecera, formato, editable)
+    COLUMNAS_TABLA = (
+        ("num_maquinas", "📟 Máquinas", "{:.0f}", True),
+        ("precio_unidad", "💶 Precio equipo (€)", "{:.2f}", True),
+        ("precio_red", "💡 Electricidad (€/kWh)", "{:.3f}", True),
+        ("ths", "🚀 TH/s", "{:.1f}", False),
+        ("consumo_kw", "🔋 kW", "{:.3f}", False),
+        ("inversion", "💶 Inversión (€)", "{:.2f}", False),
+        ("beneficio_anual", "💰 Beneficio/año (€)", "{:.2f}", False),
+        ("amortizacion", "🔄 Amortización (años)", "{:.2f}", False),
+        ("beneficio_10_anios", "🙌 Beneficio 10 años (€)", "{:.2f}", False),
+        ("euros_kwh_neto", "📉 Neto (€/kWh)", "{:.3f}", False),
+    )
+
+    # Búsqueda de objetivo: entradas que se pueden despejar y columnas objetivo
+    INCOGNITAS = (
+        ("precio_btc", "💰 Precio BTC (USD)", "{:.0f}"),
+        ("precio_red", "💡 Electricidad (€/kWh)", "{:.4f}"),
+        ("precio_venta_solar", "☀️ Venta solar (€/kWh)", "{:.4f}"),
+        ("hashrate_eh", "⛓️ Hashrate (EH/s)", "{:.1f}"),
+        ("fees_btc", "💸 Fees (BTC/bloque)", "{:.4f}"),
+        ("precio_unidad", "💶 Precio equipo (€)", "{:.2f}"),
+    )
+    OBJETIVOS = (
+        ("amortizacion", "🔄 Amortización (años)"),
+        ("beneficio_10_anios", "🙌 Beneficio 10 años (€)"),
+        ("beneficio_anual", "💰 Beneficio/año (€)"),
+        ("euros_kwh_neto", "📉 Neto (€/kWh)"),
+    )
+
+    # Barrido en disco: (entrada, valores absolutos); los ejes de red se omiten con la red apagada
+    PUNTOS_BARRIDO = 41
+    EJES_BARRIDO = (
+        ("precio_btc", np.linspace(50_000, 250_000, PUNTOS_BARRIDO)),
+        ("hashrate_eh", np.linspace(500, 2_000, PUNTOS_BARRIDO)),
+        ("precio_red", np.linspace(0.0, 0.3, PUNTOS_BARRIDO)),
+    )
+    EJES_BARRIDO_RED = {"precio_red"}
+
+    def __init__(self, espacio, ventana_principal=None):
+        super().__init__()
+        self.espacio = espacio
+        self.gestor_trabajos = getattr(ventana_principal, "gestor_trabajos", None) or GestorTrabajos()
+        self.setWindowTitle(f"📋 Comparación - {len(espacio)} escenarios")
+        if ventana_principal:
+            geo_principal = ventana_principal.geometry()
+            self.setGeometry(geo_principal.x() + geo_principal.width() + 20, geo_principal.y(), 1100, 800)
+        else:
+            self.setGeometry(100, 100, 1100, 800)
+        self.lineas = []
+        self.objetivo = None  # (incógnita, columna objetivo, valor) de la última búsqueda
+        self.init_ui()
+        self.actualizar()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.boton_exportar = QPushButton("💾 Exportar")
+        self.boton_exportar.setToolTip("Guarda todas las columnas en Parquet, Arrow, CSV o una carpeta .npy")
+        self.boton_exportar.clicked.connect(self.exportar)
+        self.boton_informes = QPushButton("🖨️ Informes")
+        self.boton_informes.setToolTip("Genera un informe HTML/PNG/PDF por escenario en una carpeta")
+        self.boton_informes.clicked.connect(self.generar_informes)
+        self.boton_barrido = QPushButton("🧮 Barrido")
+        self.boton_barrido.setToolTip("Barrido en disco de modelos × precio BTC × electricidad × hashrate; "
+                                      "si la carpeta ya tiene uno a medias, lo reanuda")
+        self.boton_barrido.clicked.connect(self.barrido)
+        self.combo_incognita = QComboBox()
+        for nombre, etiqueta, _ in self.INCOGNITAS:
+            self.combo_incognita.addItem(etiqueta, nombre)
+        self.combo_objetivo = QComboBox()
+        for nombre, etiqueta in self.OBJETIVOS:
+            self.combo_objetivo.addItem(etiqueta, nombre)
+        self.valor_objetivo = QLineEdit("3")
+        self.valor_objetivo.setMaximumWidth(80)
+        self.boton_resolver = QPushButton("🎯 Resolver")
+        self.boton_resolver.setToolTip("Calcula, para cada escenario, el valor de la entrada con el que se alcanza el objetivo")
+        self.boton_resolver.clicked.connect(self.resolver_objetivo)
+        hbox_botones = QHBoxLayout()
+        hbox_botones.addWidget(QLabel("🎯"))
+        hbox_botones.addWidget(self.combo_incognita)
+        hbox_botones.addWidget(QLabel("para"))
+        hbox_botones.addWidget(self.combo_objetivo)
+        hbox_botones.addWidget(QLabel("="))
+        hbox_botones.addWidget(self.valor_objetivo)
+        hbox_botones.addWidget(self.boton_resolver)
+        hbox_botones.addStretch(1)
+        hbox_botones.addWidget(self.boton_exportar)
+        hbox_botones.addWidget(self.boton_informes)
+        hbox_botones.addWidget(self.boton_barrido)
+        layout.addLayout(hbox_botones)
+
+        # Última columna: resultado de la búsqueda de objetivo (oculta hasta resolver)
+        self.tabla = QTableWidget(len(self.espacio), len(self.COLUMNAS_TABLA) + 2)
+        self.tabla.setHorizontalHeaderLabels(["Escenario"] + [cabecera for _, cabecera, _, _ in self.COLUMNAS_TABLA] + ["🎯"])
+        columnas = self.espacio.columnas()
+        for fila, etiqueta in enumerate(self.espacio.etiquetas):
+            item = QTableWidgetItem(etiqueta)
+            item.setData(Qt.UserRole, fila)  # Índice del escenario, estable al ordenar
+            item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+            self.tabla.setItem(fila, 0, item)
+            for col, (nombre, _, formato, editable) in enumerate(self.COLUMNAS_TABLA, start=1):
+                celda = ItemNumerico(columnas[nombre][fila], formato)
+                if not editable:
+                    celda.setFlags(celda.flags() & ~Qt.ItemIsEditable)
+                self.tabla.setItem(fila, col, celda)
+            celda = ItemNumerico(np.nan, "{:.2f}")
+            celda.setFlags(celda.flags() & ~Qt.ItemIsEditable)
+            self.tabla.setItem(fila, len(self.COLUMNAS_TABLA) + 1, celda)
+        self.tabla.setColumnHidden(len(self.COLUMNAS_TABLA) + 1, True)
+        self.tabla.setSortingEnabled(True)
+        self.tabla.resizeColumnsToContents()
+        self.tabla.itemChanged.connect(self.editar_celda)
+        layout.addWidget(self.tabla, 1)
+
+        self.figura = Figure(figsize=(8, 4))
+        self.canvas = FigureCanvasQTAgg(self.figura)
+        self.ejes = self.figura.add_subplot(111)
+        layout.addWidget(self.canvas, 1)
+        self.setLayout(layout)
+
+    def editar_celda(self, item):
+        if not isinstance(item, ItemNumerico) or item.column() > len(self.COLUMNAS_TABLA):
+            return
+        nombre = self.COLUMNAS_TABLA[item.column() - 1][0]
+        indice = self.tabla.item(item.row(), 0).data(Qt.UserRole)
+        try:
+            valor = float(item.text().replace(",", "."))
+        except ValueError:
+            valor = item.valor  # Texto no numérico: restaurar el valor anterior
+        self.espacio.editar(nombre, valor, [indice])
+        self.actualizar()
+
+    def actualizar(self):
+        """Vuelca las columnas (solo se recalculan las afectadas) en la tabla y la gráfica"""
+        columnas = self.espacio.columnas()
+        self.tabla.blockSignals(True)
+        self.tabla.setSortingEnabled(False)
+        solucion = self.solucion_objetivo(columnas)
+        for fila in range(self.tabla.rowCount()):
+            indice = self.tabla.item(fila, 0).data(Qt.UserRole)
+            for col, (nombre, _, _, _) in enumerate(self.COLUMNAS_TABLA, start=1):
+                self.tabla.item(fila, col).fijar(columnas[nombre][indice])
+            if solucion is not None:
+                self.tabla.item(fila, len(self.COLUMNAS_TABLA) + 1).fijar(solucion[indice])
+        self.tabla.setSortingEnabled(True)
+        self.tabla.blockSignals(False)
+        self.dibujar_amortizacion(columnas)
+
+    def resolver_objetivo(self):
+        try:
+            valor = float(self.valor_objetivo.text().replace(",", "."))
+        except ValueError:
+            QMessageBox.warning(self, "Error", "El valor objetivo debe ser un número.")
+            return
+        incognita = self.combo_incognita.currentData()
+        objetivo = self.combo_objetivo.currentData()
+        self.objetivo = (incognita, objetivo, valor)
+        etiqueta_incognita = next(etiqueta for nombre, etiqueta, _ in self.INCOGNITAS if nombre == incognita)
+        self.tabla.horizontalHeaderItem(len(self.COLUMNAS_TABLA) + 1).setText(
+            f"🎯 {etiqueta_incognita} para {self.combo_objetivo.currentText()} = {valor:g}")
+        self.tabla.setColumnHidden(len(self.COLUMNAS_TABLA) + 1, False)
+        self.actualizar()
+        self.tabla.resizeColumnToContents(len(self.COLUMNAS_TABLA) + 1)
+
+    def solucion_objetivo(self, columnas):
+        """Resuelve la última búsqueda de objetivo para todos los escenarios (None si no hay)"""
+        if self.objetivo is None:
+            return None
+        incognita, objetivo, valor = self.objetivo
+        formato = next(formato for nombre, _, formato in self.INCOGNITAS if nombre == incognita)
+        for fila in range(self.tabla.rowCount()):
+            self.tabla.item(fila, len(self.COLUMNAS_TABLA) + 1).formato = formato
+        return resolver_entrada(columnas, incognita, objetivo, valor)
+
+    def exportar(self):
+        ruta, filtro = QFileDialog.getSaveFileName(
+            self, "Exportar escenarios", "escenarios.parquet",
+            "Parquet (*.parquet);;Arrow (*.arrow);;CSV (*.csv);;Carpeta NumPy (*)"
+        )
+        if not ruta:
+            return
+        columnas = {"escenario": np.array(self.espacio.etiquetas), **self.espacio.columnas()}
+        try:
+            exportar_columnas(columnas, ruta)
+        except (OSError, RuntimeError, ValueError) as e:
+            QMessageBox.warning(self, "Error", f"No se pudo exportar: {e}")
+
+    def generar_informes(self):
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta para los informes")
+        if not carpeta:
+            return
+        self.boton_informes.setEnabled(False)
+        columnas, etiquetas = self.espacio.columnas(), list(self.espacio.etiquetas)
+        self.gestor_trabajos.enviar(
+            lambda control: generar_informes_lote(columnas, etiquetas, carpeta, progreso=lambda hechos, total: control.progreso(hechos / total)),
+            al_progreso=lambda valor: self.boton_informes.setText(f"🖨️ {valor}%"),
+            al_terminar=self.informes_terminados,
+            al_error=lambda mensaje: self.informes_terminados(None, mensaje),
+            al_cancelar=lambda: self.informes_terminados(None),
+        )
+
+    def informes_terminados(self, resumen, mensaje=None):
+        self.boton_informes.setEnabled(True)
+        self.boton_informes.setText("🖨️ Informes")
+        if mensaje:
+            QMessageBox.warning(self, "Error", f"No se pudieron generar los informes: {mensaje}")
+        elif resumen:
+            QMessageBox.information(
+                self, "Informes",
+                f"{resumen['informes']} informes en {resumen['segundos']:.1f} s ({resumen['informes_por_segundo']:.1f} informes/s)"
+            )
+
+    def crear_barrido(self, carpeta):
+        """Abre el barrido de la carpeta o define uno nuevo con las entradas del primer escenario"""
+        if os.path.exists(os.path.join(carpeta, AlmacenEscenarios.FICHERO_META)):
+            return AlmacenEscenarios.abrir(carpeta)
+        columnas = self.espacio.columnas()
+        base = {nombre: columnas[nombre][0] for nombre in ENTRADAS_ESCENARIO}
+        red_activada = base["horas_red_anuales"] > 0
+        ejes = {eje: valores for eje, valores in self.EJES_BARRIDO if red_activada or eje not in self.EJES_BARRIDO_RED}
+        return AlmacenEscenarios.crear(carpeta, base, modelos=list(MINEROS), **ejes)
+
+    def barrido(self):
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta del barrido (nueva o a medias)")
+        if not carpeta:
+            return
+        try:
+            almacen = self.crear_barrido(carpeta)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "Error", f"No se pudo preparar el barrido: {e}")
+            return
+        self.boton_barrido.setEnabled(False)
+        self.gestor_trabajos.enviar(
+            lambda control: almacen.procesar(tamano_bloque=100_000, progreso=lambda hechas, total: control.progreso(hechas / total)),
+            al_progreso=lambda valor: self.boton_barrido.setText(f"🧮 {valor}%"),
+            al_terminar=self.barrido_terminado,
+            al_error=lambda mensaje: self.barrido_terminado(None, mensaje),
+            al_cancelar=lambda: self.barrido_terminado(almacen),
+        )
+
+    def barrido_terminado(self, almacen, mensaje=None):
+        self.boton_barrido.setEnabled(True)
+        self.boton_barrido.setText("🧮 Barrido")
+        if mensaje:
+            QMessageBox.warning(self, "Error", f"No se pudo completar el barrido: {mensaje}")
+            return
+        if almacen is None:
+            return
+        hechas, total = almacen.meta["hechas"], len(almacen)
+        resultados = almacen.resultados()
+        lineas = [f"{almacen.etiqueta(fila)}: {resultados['amortizacion'][fila]:.2f} años"
+                  for fila in almacen.mejores("amortizacion", n=10, mayor=False)]
+        estado = "completo" if almacen.completo else f"detenido en {hechas:,}/{total:,} (vuelve a elegir la carpeta para reanudar)"
+        QMessageBox.information(
+            self, "Barrido",
+            f"Barrido {estado} en {almacen.ruta}\n\n🔄 Menor amortización:\n" + "\n".join(lineas)
+        )
+
+    def dibujar_amortizacion(self, columnas):
+        anios = np.arange(0, 11)
+        acumulado = columnas["beneficio_anual"][:, np.newaxis] * anios - columnas["inversion"][:, np.newaxis]
+        if len(self.lineas) != len(acumulado):
+            self.ejes.clear()
+            self.lineas = [self.ejes.plot(anios, curva, marker='o', markersize=3, label=etiqueta)[0]
+                           for curva, etiqueta in zip(acumulado, self.espacio.etiquetas)]
+            self.ejes.axhline(0, color='red', linestyle='--', linewidth=1)
+            self.ejes.set_xlabel("Años")
+            self.ejes.set_ylabel("€")
+            self.ejes.set_title("Beneficio acumulado neto de inversión")
+            self.ejes.grid(True)
+            self.ejes.legend(fontsize=7, ncol=2)
+        else:
+            for linea, curva in zip(self.lineas, acumulado):
+                linea.set_ydata(curva)
+            self.ejes.relim()
+            self.ejes.autoscale_view()
+        self.canvas.draw_idle()
+
 class CalculadoraMineria(QWidget):
 
     def _crear_campo_con_boton(self, widget, boton):
@@ -264,7 +2474,7 @@ class CalculadoraMineria(QWidget):
         return layout
 
 
-    def mostrar_grafica_amortizacion(self, beneficio_anual, inversion, nombre_minero, ventana_resultados=None, offset_cascada=0):
+    def mostrar_grafica_amortizacion(self, beneficio_anual, inversion, nombre_minero, ventana_resultados=None, offset_cascada=0, proyeccion=None):
         anios = np.arange(0, 11)  # De 0 a 10 años
         beneficio_acumulado = beneficio_anual * anios
 
@@ -272,6 +2482,10 @@ class CalculadoraMineria(QWidget):
         fig.canvas.manager.set_window_title(f"📈 Amortización - {nombre_minero}")
         
         plt.plot(anios, beneficio_acumulado, label="Beneficio acumulado", marker='o')
+        if proyeccion is not None:
+            # Beneficio acumulado con el crecimiento previsto del hashrate y su banda
+            plt.plot(anios, proyeccion["media"], color='orange', marker='.', label="Con crecimiento del hashrate")
+            plt.fill_between(anios, proyeccion["pesimista"], proyeccion["optimista"], color='orange', alpha=0.2)
         plt.axhline(inversion, color='red', linestyle='--', label="Inversión inicial")
         plt.xlabel("Años")
         plt.ylabel("€")
@@ -336,10 +2550,15 @@ class CalculadoraMineria(QWidget):
         self.boton_actualizar_todo = QPushButton("🔄 Datos")
         self.boton_actualizar_todo.clicked.connect(self.actualizar_todos_los_campos)
         
+        self.chk_en_vivo = QCheckBox("📡 En vivo")
+        self.chk_en_vivo.setToolTip("Actualiza fees, bloques y hashprice con cada bloque nuevo")
+        self.chk_en_vivo.stateChanged.connect(self.toggle_feed_bloques)
+
         hbox_red_titulo = QHBoxLayout()
         hbox_red_titulo.addStretch(1)
         hbox_red_titulo.addWidget(titulo_red)
         hbox_red_titulo.addWidget(self.boton_actualizar_todo)
+        hbox_red_titulo.addWidget(self.chk_en_vivo)
         hbox_red_titulo.addStretch(1)
         contenedor_red_titulo = QWidget()
         contenedor_red_titulo.setLayout(hbox_red_titulo)
@@ -369,6 +2588,16 @@ class CalculadoraMineria(QWidget):
         layout.addRow(label_fees, self.fees_btc_bloque)
         self.fees_btc_bloque.textChanged.connect(self.actualizar_hashprice_spot)
 
+        label_ventana_bloques = QLabel("🪟 Ventana fees/bloques:")
+        label_ventana_bloques.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.ventana_bloques = QComboBox()
+        self.ventana_bloques.addItem(f"Teórica ({BLOQUES_POR_DIA} bloques/día)")
+        for nombre in VENTANAS_BLOQUES:
+            self.ventana_bloques.addItem(f"{nombre} (sin datos)", nombre)
+        self.ventana_bloques.setToolTip("Ventana de las fees medias y del ritmo real de bloques usado en el hashprice")
+        self.ventana_bloques.currentIndexChanged.connect(self.aplicar_ventana_bloques)
+        layout.addRow(label_ventana_bloques, self.ventana_bloques)
+
         label_hashprice = QLabel("💹 Hashprice (spot) (USD/PH/día):")
         label_hashprice.setTextInteractionFlags(Qt.TextSelectableByMouse)
         self.hashprice_spot = QLineEdit()
@@ -381,6 +2610,13 @@ class CalculadoraMineria(QWidget):
         # Actualizar hashprice y resultados al cambiar la recompensa
         self.recompensa_btc.textChanged.connect(self.actualizar_hashprice_spot)
 
+        label_crecimiento = QLabel("📈 Crecimiento hashrate:")
+        label_crecimiento.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.chk_crecimiento_hashrate = QCheckBox("Proyectar")
+        self.chk_crecimiento_hashrate.setToolTip("Ajusta la tendencia del hashrate con su historial (en caché local) y la aplica a la amortización")
+        self.chk_crecimiento_hashrate.stateChanged.connect(self.toggle_crecimiento_hashrate)
+        layout.addRow(label_crecimiento, self.chk_crecimiento_hashrate)
+
         label_comision = QLabel("🏦 Fees pool (2%):")
         label_comision.setTextInteractionFlags(Qt.TextSelectableByMouse)
         self.comision = QLineEdit("0.02")
@@ -439,6 +2675,18 @@ class CalculadoraMineria(QWidget):
         layout.addRow(label_precio_equipo, self.precio_equipo)
 
 
+        label_solo = QLabel("🎲 Minería solo / pool (EH/s):")
+        label_solo.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.chk_solo = QCheckBox()
+        self.chk_solo.setToolTip("Simula la suerte de encontrar bloques (Poisson) en lugar del hashprice medio")
+        self.pool_eh = QLineEdit()
+        self.pool_eh.setPlaceholderText("Vacío: solo; EH/s del pool: PPLNS")
+        hbox_solo = QHBoxLayout()
+        hbox_solo.addWidget(self.chk_solo)
+        hbox_solo.addWidget(self.pool_eh)
+        hbox_solo.setContentsMargins(0, 0, 0, 0)
+        layout.addRow(label_solo, hbox_solo)
+
         separador2 = QFrame()
         separador2.setFrameShape(QFrame.HLine)
         separador2.setFrameShadow(QFrame.Sunken)
@@ -478,7 +2726,22 @@ class CalculadoraMineria(QWidget):
         layout.addRow(label_dias_uso, self.dias_uso)
 
 
-        self.solar_widgets = [self.precio_venta_solar, self.horas_solares_dia, self.dias_uso]
+        label_capex_fv = QLabel("🔆 Coste FV (€/kWp):")
+        label_capex_fv.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.capex_fv = QLineEdit("900")
+        layout.addRow(label_capex_fv, self.capex_fv)
+
+        label_irradiancia = QLabel("☀️ Irradiancia horaria (CSV):")
+        label_irradiancia.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.irradiancia_ruta = QLineEdit()
+        self.irradiancia_ruta.setReadOnly(True)
+        self.irradiancia_ruta.setPlaceholderText("Sin perfil")
+        self.boton_irradiancia = QPushButton("📂")
+        self.boton_irradiancia.setToolTip("Cargar un año de irradiancia horaria (W/m², p. ej. exportada de PVGIS) para dimensionar la FV")
+        self.boton_irradiancia.clicked.connect(self.cargar_irradiancia)
+        layout.addRow(label_irradiancia, self._crear_campo_con_boton(self.irradiancia_ruta, self.boton_irradiancia))
+
+        self.solar_widgets = [self.precio_venta_solar, self.horas_solares_dia, self.dias_uso, self.capex_fv, self.boton_irradiancia]
 
         separador2 = QFrame()
         separador2.setFrameShape(QFrame.HLine)
@@ -519,7 +2782,22 @@ class CalculadoraMineria(QWidget):
         layout.addRow(label_dias_red, self.dias_red)
 
 
-        self.red_widgets = [self.precio_red, self.horas_red_dia, self.dias_red]
+        label_precios_horarios = QLabel("📈 Precios horarios (CSV):")
+        label_precios_horarios.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.precios_horarios_ruta = QLineEdit()
+        self.precios_horarios_ruta.setReadOnly(True)
+        self.precios_horarios_ruta.setPlaceholderText("Tarifa plana")
+        self.boton_precios_horarios = QPushButton("📂")
+        self.boton_precios_horarios.setToolTip("Cargar un año de precios horarios (€/kWh) para minar solo en las horas rentables")
+        self.boton_precios_horarios.clicked.connect(self.cargar_precios_horarios)
+        self.boton_quitar_precios = QPushButton("✖")
+        self.boton_quitar_precios.setToolTip("Descartar los precios horarios y volver a la tarifa plana")
+        self.boton_quitar_precios.clicked.connect(self.quitar_precios_horarios)
+        campo_precios = self._crear_campo_con_boton(self.precios_horarios_ruta, self.boton_precios_horarios)
+        campo_precios.addWidget(self.boton_quitar_precios)
+        layout.addRow(label_precios_horarios, campo_precios)
+
+        self.red_widgets = [self.precio_red, self.horas_red_dia, self.dias_red, self.boton_precios_horarios, self.boton_quitar_precios]
 
         layout.addRow(QLabel(""))
 
@@ -527,6 +2805,18 @@ class CalculadoraMineria(QWidget):
         self.boton.setDefault(True)
         self.boton.clicked.connect(self.calcular)
 
+        self.boton_comparar = QPushButton("📋 Comparar")
+        self.boton_comparar.setToolTip("Compara todos los modelos del catálogo con los datos actuales")
+        self.boton_comparar.clicked.connect(self.comparar_modelos)
+
+        self.boton_dimensionar = QPushButton("🔆 Dimensionar FV")
+        self.boton_dimensionar.setToolTip("Busca el tamaño de la instalación FV, el modelo y el número de máquinas con mayor rentabilidad")
+        self.boton_dimensionar.clicked.connect(self.dimensionar_fv)
+
+        self.boton_ciclo_vida = QPushButton("♻️ Ciclo de vida")
+        self.boton_ciclo_vida.setToolTip("Mejor año para vender o sustituir cada modelo con el hashprice proyectado (halvings y crecimiento del hashrate)")
+        self.boton_ciclo_vida.clicked.connect(self.ciclo_vida)
+
         self.boton_cerrar_ventanas = QPushButton("🗑️ Cerrar ventanas")
         self.boton_cerrar_ventanas.clicked.connect(self.cerrar_todas_ventanas)
 
@@ -534,12 +2824,26 @@ class CalculadoraMineria(QWidget):
         hbox_boton.addStretch(1)
         hbox_boton.addWidget(self.boton)
         hbox_boton.addSpacing(10)
+        hbox_boton.addWidget(self.boton_comparar)
+        hbox_boton.addSpacing(10)
+        hbox_boton.addWidget(self.boton_dimensionar)
+        hbox_boton.addSpacing(10)
+        hbox_boton.addWidget(self.boton_ciclo_vida)
+        hbox_boton.addSpacing(10)
         hbox_boton.addWidget(self.boton_cerrar_ventanas)
         hbox_boton.addStretch(1)
         contenedor_boton = QWidget()
         contenedor_boton.setLayout(hbox_boton)
         layout.addRow(contenedor_boton)
 
+        self.barra_progreso = QProgressBar()
+        self.barra_progreso.setVisible(False)
+        self.boton_cancelar_trabajos = QPushButton("✖")
+        self.boton_cancelar_trabajos.setToolTip("Cancelar los análisis en curso")
+        self.boton_cancelar_trabajos.setVisible(False)
+        self.boton_cancelar_trabajos.clicked.connect(lambda: self.gestor_trabajos.cancelar_todos())
+        layout.addRow(self._crear_campo_con_boton(self.barra_progreso, self.boton_cancelar_trabajos))
+
         self.setLayout(layout)
 
     def calcular(self):
@@ -552,14 +2856,35 @@ class CalculadoraMineria(QWidget):
 
         # ...código eliminado: creación duplicada de botones y layouts...
 
-    def __init__(self):
+    def __init__(self, url_ws=URL_WS_MEMPOOL, url_api=URL_API_MEMPOOL):
         super().__init__()
         self.setWindowTitle("☀️ Calculadora de Minería Solar")
         self.setGeometry(100, 100, 400, 800)  # x, y, ancho, alto
         self.ventanas_resultados = []  # Lista para mantener referencias a ventanas abiertas
         self.figuras_matplotlib = []  # Lista para mantener referencias a figuras de matplotlib
         self.bloques_reales_24h = BLOQUES_POR_DIA  # Número real de bloques en 24h
+        self.precios_horarios = None  # Serie horaria de precios de red (curtailment)
+        self.feed_bloques = FeedBloques(url_ws, url_api)
+        self.feed_bloques.nuevo_bloque.connect(self.procesar_bloque_nuevo)
+        self.feed_bloques.estado_cambiado.connect(self.actualizar_estado_feed)
+        self.estadisticas_bloques = EstadisticasBloques()
+        self.modelo_hashrate = None  # ModeloCrecimientoHashrate ajustado (se actualiza con el historial nuevo)
+        self.actualizando_modelo_hashrate = False
+        self.temporizador_hashrate = QTimer(self)
+        self.temporizador_hashrate.timeout.connect(self.actualizar_modelo_hashrate)
+        self.temporizador_hashrate.start(INTERVALO_MODELO_HASHRATE_MS)
+        self.irradiancia = None  # Serie horaria de irradiancia (W/m²) para dimensionar la FV
+        self.gestor_trabajos = GestorTrabajos()
+        self.fuentes_mercado = FuentesDatos(crear_fuentes_mercado(url_api))
         self.init_ui()
+        self.gestor_trabajos.activos_cambiados.connect(self.actualizar_barra_trabajos)
+
+    def actualizar_barra_trabajos(self, activos):
+        """Muestra la barra de progreso y el botón de cancelar mientras haya trabajos"""
+        self.barra_progreso.setVisible(activos > 0)
+        self.boton_cancelar_trabajos.setVisible(activos > 0)
+        if activos == 0:
+            self.barra_progreso.setValue(0)
 
     def limpiar_ventanas_cerradas(self):
         """Elimina de la lista las ventanas que han sido cerradas"""
@@ -590,6 +2915,10 @@ class CalculadoraMineria(QWidget):
 
     def closeEvent(self, event):
         """Se ejecuta cuando se cierra la ventana principal"""
+        self.feed_bloques.detener()
+        self.temporizador_hashrate.stop()
+        self.gestor_trabajos.cancelar_todos()
+        self.fuentes_mercado.cerrar()
         self.cerrar_todas_ventanas()
         super().closeEvent(event)
 
@@ -598,6 +2927,20 @@ class CalculadoraMineria(QWidget):
         for w in self.solar_widgets:
             w.setEnabled(enabled)
 
+    def ventana_bloques_seleccionada(self):
+        """Nombre de la ventana estadística elegida o None para la teórica"""
+        return self.ventana_bloques.currentData()
+
+    def bloques_dia_hashprice(self):
+        """Bloques/día para el hashprice: teóricos o los observados en la ventana elegida"""
+        ventana = self.ventana_bloques_seleccionada()
+        if ventana is None:
+            return BLOQUES_POR_DIA
+        bloques_dia = self.estadisticas_bloques.bloques_dia(ventana)
+        if bloques_dia is None and ventana == "24h":
+            bloques_dia = self.bloques_reales_24h  # Conteo de la última actualización por REST
+        return bloques_dia or BLOQUES_POR_DIA
+
     def actualizar_hashprice_spot(self):
         try:
             precio_btc = float(self.precio_btc.text())
@@ -608,28 +2951,103 @@ class CalculadoraMineria(QWidget):
                 
             hashrate_eh = float(self.hashrate_eh.text())
 
-            # Cálculo estándar del hashprice usando 144 bloques teóricos:
-            # Ingresos por bloque (recompensa + fees) en USD
-            ingreso_usd_por_bloque = (recompensa_btc + fees_btc_bloque) * precio_btc
-            
-            # Hashrate en PH/s (1 EH = 1,000 PH)
-            hashrate_ph = hashrate_eh * 1_000
-            
-            # Hashprice = Ingresos por bloque * 144 bloques teóricos / Hashrate en PH
-            # Esto da USD por PH por día según el estándar de la industria
-            hashprice_usd_ph_dia = (ingreso_usd_por_bloque * BLOQUES_POR_DIA) / hashrate_ph
+            # Hashprice en USD/PH/día según el estándar de la industria, con los
+            # bloques/día teóricos (144) o los observados en la ventana elegida
+            hashprice_usd_ph_dia = calcular_hashprice_usd_ph_dia(
+                precio_btc, recompensa_btc, fees_btc_bloque, hashrate_eh, self.bloques_dia_hashprice()
+            )
             
             # Mostrar resultado en USD/PH/día
             self.hashprice_spot.setText(f"{hashprice_usd_ph_dia:.2f}")
         except Exception:
             self.hashprice_spot.setText("")
 
+    def aplicar_ventana_bloques(self):
+        """Refresca fees y hashprice con las estadísticas de la ventana elegida"""
+        ventana = self.ventana_bloques_seleccionada() or "24h"
+        fees_medias = self.estadisticas_bloques.media(ventana)
+        if fees_medias is not None:
+            self.fees_btc_bloque.setText(f"{fees_medias:.3f}")
+        self.fees_btc_bloque.setToolTip(self.estadisticas_bloques.resumen())
+        for i in range(1, self.ventana_bloques.count()):
+            self.ventana_bloques.setItemText(i, self.estadisticas_bloques.etiqueta(self.ventana_bloques.itemData(i)))
+        self.actualizar_hashprice_spot()
+
+    def toggle_feed_bloques(self):
+        if self.chk_en_vivo.isChecked():
+            try:
+                self.feed_bloques.iniciar()
+            except RuntimeError as e:
+                QMessageBox.warning(self, "Error", str(e))
+                self.chk_en_vivo.setChecked(False)
+        else:
+            self.feed_bloques.detener()
+            self.actualizar_estado_feed("detenido")
+
+    def actualizar_estado_feed(self, estado):
+        self.chk_en_vivo.setToolTip(f"Feed de bloques: {estado}")
+
+    def procesar_bloque_nuevo(self, bloque):
+        """Actualiza fees, bloques reales y hashprice con un bloque recibido del feed"""
+        self.estadisticas_bloques.agregar(bloque)
+        # El conteo solo es un ritmo de bloques/día cuando la historia cubre las 24h enteras
+        if self.estadisticas_bloques.cobertura("24h") >= 1:
+            self.bloques_reales_24h = self.estadisticas_bloques.ventanas["24h"].n
+        self.aplicar_ventana_bloques()
+
     def actualizar_todos_los_campos(self):
-        QTimer.singleShot(0, self.actualizar_cambio)
-        QTimer.singleShot(200, self.actualizar_precio_btc) 
-        QTimer.singleShot(400, self.actualizar_hashrate)
-        QTimer.singleShot(600, self.actualizar_fees_btc_bloque)
-        QTimer.singleShot(800, self.actualizar_hashprice_spot)  
+        # Las descargas van en un hilo del pool; cada dato se aplica al llegar
+        self.boton_actualizar_todo.setEnabled(False)
+        self.gestor_trabajos.enviar(
+            refrescar_datos_red, self.fuentes_mercado,
+            al_parcial=self.aplicar_dato_red,
+            al_progreso=self.barra_progreso.setValue,
+            al_terminar=lambda _: self.boton_actualizar_todo.setEnabled(True),
+            al_error=lambda mensaje: (self.boton_actualizar_todo.setEnabled(True), QMessageBox.warning(self, "Error", mensaje)),
+            al_cancelar=lambda: self.boton_actualizar_todo.setEnabled(True),
+        )
+
+    def toggle_crecimiento_hashrate(self):
+        if not self.chk_crecimiento_hashrate.isChecked():
+            return
+        if self.modelo_hashrate is not None:
+            self.actualizar_modelo_hashrate()
+            return
+        self.chk_crecimiento_hashrate.setEnabled(False)
+        self.actualizando_modelo_hashrate = True
+        self.gestor_trabajos.enviar(
+            ajustar_modelo_hashrate,
+            al_progreso=self.barra_progreso.setValue,
+            al_terminar=self.fijar_modelo_hashrate,
+            al_error=self.error_modelo_hashrate,
+            al_cancelar=lambda: self.error_modelo_hashrate(None),
+        )
+
+    def actualizar_modelo_hashrate(self):
+        """Añade al modelo los puntos nuevos del historial (la caché se renueva a diario)"""
+        if self.modelo_hashrate is None or self.actualizando_modelo_hashrate or not self.chk_crecimiento_hashrate.isChecked():
+            return
+        self.actualizando_modelo_hashrate = True
+        self.gestor_trabajos.enviar(
+            ajustar_modelo_hashrate, self.modelo_hashrate,
+            al_terminar=self.fijar_modelo_hashrate,
+            # Si falla se sigue con el modelo que ya había
+            al_error=lambda mensaje: setattr(self, "actualizando_modelo_hashrate", False),
+            al_cancelar=lambda: setattr(self, "actualizando_modelo_hashrate", False),
+        )
+
+    def fijar_modelo_hashrate(self, modelo):
+        self.modelo_hashrate = modelo
+        self.actualizando_modelo_hashrate = False
+        self.chk_crecimiento_hashrate.setEnabled(True)
+        self.chk_crecimiento_hashrate.setToolTip(f"Tendencia ajustada: {modelo.crecimiento_anual * 100:+.1f}% anual")
+
+    def error_modelo_hashrate(self, mensaje):
+        self.actualizando_modelo_hashrate = False
+        self.chk_crecimiento_hashrate.setEnabled(True)
+        self.chk_crecimiento_hashrate.setChecked(False)
+        if mensaje:
+            QMessageBox.warning(self, "Error", f"No se pudo obtener el historial de hashrate: {mensaje}")
 
     def toggle_red_fields(self):
         enabled = self.chk_red.isChecked()
@@ -648,38 +3066,184 @@ class CalculadoraMineria(QWidget):
             self.consumo_kw.setText("")
             self.precio_equipo.setText("")
 
-    def actualizar_cambio(self):
-        cambio = obtener_cambio_usd_eur()
-        if cambio:
-            self.cambio_usd_eur.setText(str(cambio))
-        else:
-            QMessageBox.warning(self, "Error", "No se pudo obtener el cambio USD/EUR.")
+    def cargar_precios_horarios(self):
+        ruta, _ = QFileDialog.getOpenFileName(self, "Precios horarios de red", "", "CSV (*.csv *.txt);;Todos (*)")
+        if not ruta:
+            return  # Cancelar no descarta la serie ya cargada (para eso está quitar_precios_horarios)
+        try:
+            precios = cargar_serie_horaria(ruta)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Error", f"No se pudo leer el fichero de precios: {e}")
+            return
+        if precios.size == 0:
+            QMessageBox.warning(self, "Error", "El fichero no contiene precios horarios numéricos.")
+            return
+        self.precios_horarios = precios
+        self.precios_horarios_ruta.setText(f"{ruta.split('/')[-1]} ({precios.size} h)")
+        if precios.size < HORAS_POR_ANIO:
+            QMessageBox.information(
+                self, "Precios horarios",
+                f"La serie tiene {precios.size} h ({precios.size / 24:.0f} días), menos de un año: "
+                f"los resultados anuales se extrapolan multiplicando por {HORAS_POR_ANIO / precios.size:.2f}."
+            )
 
-    def actualizar_precio_btc(self):
-        precio = obtener_precio_btc()
-        if precio:
-            self.precio_btc.setText(str(precio))
-        else:
-            QMessageBox.warning(self, "Error", "No se pudo obtener el precio de BTC.")
+    def quitar_precios_horarios(self):
+        self.precios_horarios = None
+        self.precios_horarios_ruta.setText("")
 
-    def actualizar_hashrate(self):
-        hashrate = obtener_hashrate_eh()
-        if hashrate:
-            self.hashrate_eh.setText(str(hashrate))
-        else:
-            QMessageBox.warning(self, "Error", "No se pudo obtener el hashrate de la red.")
-
-    def actualizar_fees_btc_bloque(self):
-        resultado = obtener_fees_btc_bloque_mempool()
-        if resultado and resultado[0] is not None:
-            fee, bloques_reales = resultado
-            self.bloques_reales_24h = bloques_reales  # Actualizar el número real de bloques
-            # Mostrar solo la fee sin información de bloques
-            self.fees_btc_bloque.setText(f"{fee:.3f}")
-            # Actualizar también el hashprice con los datos reales
-            self.actualizar_hashprice_spot()
-        else:
-            QMessageBox.warning(self, "Error", "No se pudo obtener la media de fees por bloque.")
+    def cargar_irradiancia(self):
+        ruta, _ = QFileDialog.getOpenFileName(self, "Irradiancia horaria", "", "CSV (*.csv *.txt);;Todos (*)")
+        if not ruta:
+            return
+        try:
+            irradiancia = cargar_serie_horaria(ruta)
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Error", f"No se pudo leer el fichero de irradiancia: {e}")
+            return
+        if irradiancia.size == 0:
+            QMessageBox.warning(self, "Error", "El fichero no contiene valores de irradiancia numéricos.")
+            return
+        self.irradiancia = irradiancia
+        self.irradiancia_ruta.setText(f"{ruta.split('/')[-1]} ({irradiancia.size} h)")
+
+    def dimensionar_fv(self):
+        """Muestra la mejor combinación kWp × máquinas para cada modelo del catálogo"""
+        self.actualizar_hashprice_spot()
+        if self.irradiancia is None:
+            QMessageBox.warning(self, "Error", "Carga primero un perfil de irradiancia horaria.")
+            return
+        try:
+            hashprice_eur_th_dia = float(self.hashprice_spot.text()) / 1000 * float(self.cambio_usd_eur.text())
+            resultado = dimensionar_fotovoltaica(
+                self.irradiancia, hashprice_eur_th_dia, float(self.comision.text()),
+                float(self.precio_venta_solar.text()), float(self.capex_fv.text()),
+                maquinas=np.arange(1, self.num_minero.count() + 1),
+            )
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", f"No se pudo dimensionar la instalación: {e}")
+            return
+
+        orden = np.argsort(-np.nan_to_num(resultado["rentabilidad"], nan=-np.inf))
+        filas = "".join(
+            f"<tr style='background:{'#e8f5e8' if i == resultado['mejor'] else 'white'};'>"
+            f"<td>{resultado['modelos'][i]}</td><td>{resultado['num_maquinas'][i]:.0f}</td><td>{resultado['kwp'][i]:.2f} kWp</td>"
+            f"<td>{resultado['inversion'][i]:.2f} €</td><td>{resultado['beneficio_anual'][i]:.2f} €</td>"
+            f"<td>{resultado['rentabilidad'][i] * 100:.1f}%</td><td>{resultado['amortizacion'][i]:.2f} años</td>"
+            f"<td>{resultado['energia_minada_kwh'][i]:.0f} / {resultado['energia_exportada_kwh'][i]:.0f} kWh</td></tr>"
+            for i in orden
+        )
+        podados = ", ".join(resultado["podados"]) or "ninguno"
+        html = (
+            f"<div style='text-align:center;'><b>🔆 DIMENSIONADO FV + FLOTA</b></div><br>"
+            f"<div style='text-align:center;'>"
+            f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+            f"<tr style='background:#f5f5f5;'><th>Modelo</th><th>Máquinas</th><th>FV</th><th>Inversión</th>"
+            f"<th>Beneficio/año</th><th>Rentabilidad</th><th>Amortización</th><th>Minada / exportada</th></tr>"
+            f"{filas}"
+            f"</table>"
+            f"</div><br>"
+            f"<div style='text-align:center;'>{resultado['evaluados']} combinaciones evaluadas · modelos descartados: {podados}</div>"
+        )
+        self.limpiar_ventanas_cerradas()
+        ventana = VentanaResultados(html, "Dimensionado FV", self, len(self.ventanas_resultados))
+        self.ventanas_resultados.append(ventana)
+        ventana.show()
+
+    def ciclo_vida(self):
+        """Muestra, para cada modelo, la política óptima de sustitución a 10 años"""
+        self.actualizar_hashprice_spot()
+        if not self.validar_datos_entrada():
+            QMessageBox.critical(self, "Error", "Por favor, revisa que todos los campos contengan valores numéricos válidos.")
+            return
+        base = self.entradas_actuales()
+        factores_hashrate = None
+        if self.chk_crecimiento_hashrate.isChecked() and self.modelo_hashrate is not None:
+            factores_hashrate = self.modelo_hashrate.factores_ingreso_anuales(base["hashrate_eh"])["media"]
+        factores = factores_hashprice_anuales(10, base["recompensa_btc"], base["fees_btc"], factores_hashrate,
+                                              altura_actual=self.feed_bloques.ultima_altura)
+        # Con precios horarios cada modelo mina solo sus horas rentables, igual que en calcular
+        precios_horarios = self.precios_horarios if self.chk_red.isChecked() else None
+        resultado = optimizar_ciclo_vida(base, factores, precios_horarios=precios_horarios)
+
+        orden = np.argsort(-resultado["valor"])
+        anios_venta = ["-" if np.isnan(anio) else f"{anio:.0f}" for anio in resultado["anio_sustitucion"]]
+        filas = "".join(
+            f"<tr><td>{resultado['modelos'][i]}</td>"
+            f"<td style='background:{'#ffcccc' if resultado['valor'][i] < 0 else '#e8f5e8'};'>{resultado['valor'][i]:.2f} €</td>"
+            f"<td>{resultado['valor_sin_sustituir'][i]:.2f} €</td>"
+            f"<td>{anios_venta[i]}</td>"
+            f"<td>{'<br>'.join(f'Año {anio}: {accion}' for anio, accion in resultado['planes'][i]) or 'Mantener hasta el final'}</td></tr>"
+            for i in orden
+        )
+        html = (
+            f"<div style='text-align:center;'><b>♻️ CICLO DE VIDA (por máquina, 10 años)</b></div><br>"
+            f"<div style='text-align:center;'>Hashprice relativo por año: {' · '.join(f'{f:.2f}' for f in factores)}</div><br>"
+            f"<div style='text-align:center;'>"
+            f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+            f"<tr style='background:#f5f5f5;'><th>Modelo</th><th>Con sustitución</th><th>Sin sustituir</th><th>Año de venta</th><th>Plan</th></tr>"
+            f"{filas}"
+            f"</table>"
+            f"</div><br>"
+            f"<div style='text-align:center;'>Valor esperado neto de la compra, con averías y reventa al final del periodo"
+            f"{' (red solo en las horas rentables de cada año)' if precios_horarios is not None else ''}</div>"
+        )
+        self.limpiar_ventanas_cerradas()
+        ventana = VentanaResultados(html, "Ciclo de vida", self, len(self.ventanas_resultados))
+        self.ventanas_resultados.append(ventana)
+        ventana.show()
+
+    def tabla_mineria_solo(self, solo, pool_eh):
+        """Sección HTML de la simulación de minería solo/pool; solo es None (en curso), un dict o un texto de estado"""
+        titulo = f"🎲 {'POOL PPLNS' if pool_eh else 'MINERÍA SOLO'} (1 año, 1.000.000 simulaciones)"
+        if not isinstance(solo, dict):
+            estado = "⏳ Simulando…" if solo is None else f"Simulación {solo}"
+            return f"<div style='text-align:center;'><b>{titulo}</b></div><br><div style='text-align:center;'>{estado}</div><br><hr><br>"
+        percentiles = solo["percentiles"]
+        return (
+            f"<div style='text-align:center;'><b>{titulo}</b></div><br>"
+            f"<div style='text-align:center;'>"
+            f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+            f"<tr><td>🎯 <b>Probabilidad de encontrar un bloque en solo</b></td><td>{solo['prob_bloque_teorica'] * 100:.4f}%</td></tr>"
+            f"<tr><td>⏳ <b>Tiempo esperado hasta el primer bloque</b></td><td>{solo['anios_primer_bloque']:,.1f} años</td></tr>"
+            f"<tr><td>💰 <b>Beneficio medio</b></td><td>{solo['beneficio_medio']:.2f} €</td></tr>"
+            f"<tr><td>📊 <b>Beneficio P5 / P50 / P95</b></td><td>{percentiles[5]:.2f} € / {percentiles[50]:.2f} € / {percentiles[95]:.2f} €</td></tr>"
+            f"<tr><td>✅ <b>Probabilidad de beneficio</b></td><td>{solo['prob_beneficio'] * 100:.4f}%</td></tr>"
+            f"<tr><td>🔄 <b>Probabilidad de amortizar en un año</b></td><td>{solo['prob_amortizar'] * 100:.4f}%</td></tr>"
+            f"</table>"
+            f"</div>"
+            f"<br>"
+            f"<hr>"
+            f"<br>"
+        )
+
+    def aplicar_dato_red(self, dato):
+        """Aplica un dato descargado por refrescar_datos_red: (campo, valor)"""
+        campo, valor = dato
+        if campo == "cambio_usd_eur":
+            if valor:
+                self.cambio_usd_eur.setText(str(valor))
+            else:
+                QMessageBox.warning(self, "Error", "No se pudo obtener el cambio USD/EUR.")
+        elif campo == "precio_btc":
+            if valor:
+                self.precio_btc.setText(str(valor))
+            else:
+                QMessageBox.warning(self, "Error", "No se pudo obtener el precio de BTC.")
+        elif campo == "hashrate_eh":
+            if valor:
+                self.hashrate_eh.setText(str(valor))
+            else:
+                QMessageBox.warning(self, "Error", "No se pudo obtener el hashrate de la red.")
+        elif campo == "fees_btc_bloque":
+            if valor and valor[0] is not None:
+                fee, bloques_reales = valor
+                self.bloques_reales_24h = bloques_reales  # Actualizar el número real de bloques
+                # Mostrar solo la fee sin información de bloques
+                self.fees_btc_bloque.setText(f"{fee:.3f}")
+                # Actualizar también el hashprice con los datos reales
+                self.actualizar_hashprice_spot()
+            else:
+                QMessageBox.warning(self, "Error", "No se pudo obtener la media de fees por bloque.")
 
     def validar_datos_entrada(self):
         """Valida que todos los campos obligatorios tengan valores válidos"""
@@ -719,6 +3283,48 @@ class CalculadoraMineria(QWidget):
         except (ValueError, TypeError):
             return False
 
+    def entradas_actuales(self):
+        """Entradas de escenario (ENTRADAS_ESCENARIO) con los valores actuales de la interfaz"""
+        solar_activado = self.chk_solar.isChecked()
+        red_activada = self.chk_red.isChecked()
+        return {
+            "precio_btc": float(self.precio_btc.text()),
+            "cambio_usd_eur": float(self.cambio_usd_eur.text()),
+            "hashrate_eh": float(self.hashrate_eh.text()),
+            "fees_btc": float(self.fees_btc_bloque.text()),
+            "recompensa_btc": float(self.recompensa_btc.text()),
+            "bloques_dia": self.bloques_dia_hashprice(),
+            "comision": float(self.comision.text()),
+            "ths_unidad": float(self.ths.text()),
+            "consumo_unidad": float(self.consumo_kw.text()),
+            "precio_unidad": float(self.precio_equipo.text()),
+            "num_maquinas": int(self.num_minero.currentText()),
+            "horas_solares_anuales": float(self.horas_solares_dia.text()) * int(self.dias_uso.text()) if solar_activado else 0,
+            "precio_venta_solar": float(self.precio_venta_solar.text()) if solar_activado else 0,
+            "horas_red_anuales": float(self.horas_red_dia.text()) * int(self.dias_red.text()) if red_activada else 0,
+            "precio_red": float(self.precio_red.text()) if red_activada else 0,
+        }
+
+    def comparar_modelos(self):
+        """Abre la comparación de todos los modelos del catálogo con los datos actuales"""
+        self.actualizar_hashprice_spot()
+        if not self.validar_datos_entrada():
+            QMessageBox.critical(self, "Error", "Por favor, revisa que todos los campos contengan valores numéricos válidos.")
+            return
+        etiquetas, entradas = crear_escenarios(self.entradas_actuales(), modelos=list(MINEROS))
+        espacio = EspacioComparacion(etiquetas, entradas)
+        if self.chk_red.isChecked() and self.precios_horarios is not None:
+            # Con precios horarios cada modelo mina sus propias horas rentables
+            hashprice_eur_th_dia = espacio.columna("hashprice_eur_th_dia")[0]
+            curtailment = optimizar_curtailment(self.precios_horarios, hashprice_eur_th_dia, entradas["ths_unidad"],
+                                                entradas["consumo_unidad"], entradas["comision"][0])
+            espacio.editar("horas_red_anuales", curtailment["horas"])
+            espacio.editar("precio_red", curtailment["precio_medio"])
+        self.limpiar_ventanas_cerradas()
+        ventana = VentanaComparacion(espacio, self)
+        self.ventanas_resultados.append(ventana)
+        ventana.show()
+
     def calcular(self):
         # Actualizar hashprice spot con los valores actuales antes de calcular
         self.actualizar_hashprice_spot()
@@ -772,9 +3378,16 @@ class CalculadoraMineria(QWidget):
                 beneficio_tabla_solar = 0
 
             red_activada = self.chk_red.isChecked()
+            curtailment_activado = red_activada and self.precios_horarios is not None
             if red_activada:
-                precio_red = float(self.precio_red.text())
-                horas_red_anuales = float(self.horas_red_dia.text()) * int(self.dias_red.text())
+                if curtailment_activado:
+                    # Minar solo en las horas cuyo precio está por debajo del equilibrio
+                    curtailment = optimizar_curtailment(self.precios_horarios, hashprice_eur_th_dia, ths, consumo_kw, comision)
+                    horas_red_anuales = float(curtailment["horas"][0])
+                    precio_red = float(curtailment["precio_medio"][0])
+                else:
+                    precio_red = float(self.precio_red.text())
+                    horas_red_anuales = float(self.horas_red_dia.text()) * int(self.dias_red.text())
                 # Ingreso red bruto y neto
                 ingreso_red_bruto_anual = hashprice_eur_th_dia * ths * (horas_red_anuales / 24)
                 ingreso_red_neto_anual = ingreso_red_bruto_anual * (1 - comision)
@@ -827,145 +3440,104 @@ class CalculadoraMineria(QWidget):
             amortizacion_total = precio_equipo / produccion_total if produccion_total > 0 else 0
             beneficio_10_anios = produccion_total * 10 - precio_equipo
 
-
-            resultado = (
-                f"<br>"
-                # DATOS DEL MINERO
-                f"<div style='text-align:center;'><b>🔨 DATOS DEL MINERO</b></div><br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr><td>💻 <b>Modelo</b></td><td><b>{self.combo_minero.currentText()}</b></td></tr>"
-                f"<tr><td>📟 <b>Máquinas</b></td><td>{num_minero}</td></tr>"
-                f"<tr><td>🚀 <b>Hashrate</b></td><td>{ths:.1f} TH/s</td></tr>"
-                f"<tr><td>🪫 <b>Potencia</b></td><td>{consumo_kw:.3f} kW</td></tr>"
-                f"<tr><td>✨ <b>Eficiencia energética</b></td><td>{eficiencia_w_th:.2f} W/TH</td></tr>"
-                f"<tr><td>💎 <b>Coste por terahash</b></td><td>{precio_equipo/ths:.2f} €/TH</td></tr>"
-                f"<tr><td>💶 <b>Inversión en equipos</b></td><td>{precio_equipo:.2f} €</td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<hr>"
-                f"<br>"
-                # AMORTIZACIÓN
-                f"<div style='text-align:center;'><b>💰 BENEFICIOS</b></div><br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr><td style='background:white;'>🌞 <b>Amortización solar</b></td><td style='background:{'white' if not solar_activado else ('#ffcccc' if amortizacion <= 0 else '#e8f5e8')};'>{'-' if solar_activado and amortizacion == 0 else ''}{amortizacion:.2f} años</td></tr>"
-                f"<tr><td style='background:white;'>🏭 <b>Amortización red</b></td><td style='background:{'white' if not red_activada else ('#ffcccc' if amortizacion_red <= 0 else '#e8f5e8')};'>{'-' if red_activada and amortizacion_red == 0 else ''}{amortizacion_red:.2f} años</td></tr>"
-                f"<tr><td style='background:white;'>🔄 <b>Amortización combinada</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('#ffcccc' if amortizacion_total <= 0 else '#e8f5e8')};'>{'-' if (solar_activado or red_activada) and amortizacion_total == 0 else ''}{amortizacion_total:.2f} años</td></tr>"
-                f"<tr><td style='background:white;'>🖐 <b>Beneficio neto en 5 años</b></td><td style='background:{'white' if (produccion_total * 5 - precio_equipo) == 0 else ('#ffcccc' if (produccion_total * 5 - precio_equipo) < 0 else '#e8f5e8')};'>{(produccion_total * 5 - precio_equipo):.2f} €</td></tr>"
-                f"<tr><td style='background:white;'>🙌 <b>Beneficio neto en 10 años</b></td><td style='background:{'white' if beneficio_10_anios == 0 else ('#ffcccc' if beneficio_10_anios < 0 else '#e8f5e8')};'>{beneficio_10_anios:.2f} €</td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<hr>"
-                f"<br>"
-                # SOLAR
-                f"<div style='text-align:center;'><b>🌞 PRODUCCIÓN SOLAR</b></div><br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
-                f"<tr><td><b>💶 Producción</b></td>"
-                f"<td>{produccion_tabla_solar/365:.2f} €</td>"
-                f"<td>{produccion_tabla_solar/12:.2f} €</td>"
-                f"<td>{produccion_tabla_solar:.2f} €</td></tr>"
-                f"<tr><td><b>💸 Excedente no vendido</b></td>"
-                f"<td>{coste_tabla_solar/365:.2f} €</td>"
-                f"<td>{coste_tabla_solar/12:.2f} €</td>"
-                f"<td>{coste_tabla_solar:.2f} €</td></tr>"
-                f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
-                f"<td>-{fees_tabla_solar/365:.3f} €</td>"
-                f"<td>-{fees_tabla_solar/12:.3f} €</td>"
-                f"<td>-{fees_tabla_solar:.3f} €</td></tr>"
-                f"<tr><td style='background:white;'><b>{'❌' if beneficio_tabla_solar < 0 else '✅'} Beneficio neto</b></td>"
-                f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar/365:.2f} €</b></td>"
-                f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar/12:.2f} €</b></td>"
-                f"<td style='background:{'white' if not solar_activado else ('white' if beneficio_tabla_solar == 0 else ('#ffcccc' if beneficio_tabla_solar < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_solar:.2f} €</b></td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr><td>🔆 <b>Potencia fotovoltaica</b></td><td>{potencia_fotovoltaica_kwp:.2f} kWp</td></tr>"
-                f"<tr><td>🪫 <b>Consumo anual</b></td><td>{energia_consumida_kwh:.1f} kWh</td></tr>"
-                f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not solar_activado else ('white' if euros_por_kwh_bruto == 0 else ('#ffcccc' if euros_por_kwh_bruto < 0 else '#e8f5e8'))};'>{euros_por_kwh_bruto:.3f} €/kWh</td></tr>"
-                f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not solar_activado else ('white' if euros_por_kwh == 0 else ('#ffcccc' if euros_por_kwh < 0 else '#e8f5e8'))};'>{euros_por_kwh:.3f} €/kWh</td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<hr>"
-                f"<br>"
-                # ELÉCTRICA
-                f"<div style='text-align:center;'><b>🏭 PRODUCCIÓN ELÉCTRICA</b></div><br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
-                f"<tr><td><b>💶 Producción</b></td>"
-                f"<td>{produccion_tabla_red/365:.2f} €</td>"
-                f"<td>{produccion_tabla_red/12:.2f} €</td>"
-                f"<td>{produccion_tabla_red:.2f} €</td></tr>"
-                f"<tr><td><b>💡 Electricidad</b></td>"
-                f"<td>{coste_tabla_red/365:.2f} €</td>"
-                f"<td>{coste_tabla_red/12:.2f} €</td>"
-                f"<td>{coste_tabla_red:.2f} €</td></tr>"
-                f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
-                f"<td>-{fees_tabla_red/365:.3f} €</td>"
-                f"<td>-{fees_tabla_red/12:.3f} €</td>"
-                f"<td>-{fees_tabla_red:.3f} €</td></tr>"
-                f"<tr><td style='background:white;'><b>{'❌' if beneficio_tabla_red < 0 else '✅'} Beneficio neto</b></td>"
-                f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red/365:.2f} €</b></td>"
-                f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red/12:.2f} €</b></td>"
-                f"<td style='background:{'white' if not red_activada else ('white' if beneficio_tabla_red == 0 else ('#ffcccc' if beneficio_tabla_red < 0 else '#e8f5e8'))};'><b>{beneficio_tabla_red:.2f} €</b></td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr><td>🪫 <b>Consumo anual</b></td><td>{consumo_red_anual:.1f} kWh</td></tr>"
-                f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not red_activada else ('white' if euros_por_kwh_red_bruto == 0 else ('#ffcccc' if euros_por_kwh_red_bruto < 0 else '#e8f5e8'))};'>{euros_por_kwh_red_bruto:.3f} €/kWh</td></tr>"
-                f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not red_activada else ('white' if euros_por_kwh_red == 0 else ('#ffcccc' if euros_por_kwh_red < 0 else '#e8f5e8'))};'>{euros_por_kwh_red:.3f} €/kWh</td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<hr>"
-                f"<br>"
-                # SOLAR Y RED
-                f"<div style='text-align:center;'><b>🌞 + 🏭 PRODUCCIÓN COMBINADA</b></div><br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr style='background:#f5f5f5;'><th></th><th>DÍA</th><th>MES</th><th>AÑO</th></tr>"
-                f"<tr><td><b>💶 Producción</b></td>"
-                f"<td>{(produccion_tabla_solar + produccion_tabla_red)/365:.2f} €</td>"
-                f"<td>{(produccion_tabla_solar + produccion_tabla_red)/12:.2f} €</td>"
-                f"<td>{(produccion_tabla_solar + produccion_tabla_red):.2f} €</td></tr>"
-                f"<tr><td><b>💡 + 💸 Gastos</b></td>"
-                f"<td>{(coste_tabla_solar + coste_tabla_red)/365:.2f} €</td>"
-                f"<td>{(coste_tabla_solar + coste_tabla_red)/12:.2f} €</td>"
-                f"<td>{(coste_tabla_solar + coste_tabla_red):.2f} €</td></tr>"
-                f"<tr><td><b>🏦 Fees pool ({comision*100:.1f}%)</b></td>"
-                f"<td>-{(fees_tabla_solar + fees_tabla_red)/365:.3f} €</td>"
-                f"<td>-{(fees_tabla_solar + fees_tabla_red)/12:.3f} €</td>"
-                f"<td>-{(fees_tabla_solar + fees_tabla_red):.3f} €</td></tr>"
-                f"<tr><td style='background:white;'><b>{'❌' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '✅'} Beneficio neto</b></td>"
-                f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red)/365:.2f} €</b></td>"
-                f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red)/12:.2f} €</b></td>"
-                f"<td style='background:{'white' if not solar_activado and not red_activada else ('white' if (beneficio_tabla_solar + beneficio_tabla_red) == 0 else ('#ffcccc' if (beneficio_tabla_solar + beneficio_tabla_red) < 0 else '#e8f5e8'))};'><b>{(beneficio_tabla_solar + beneficio_tabla_red):.2f} €</b></td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<br>"
-                f"<div style='text-align:center;'>"
-                f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
-                f"<tr><td>🪫 <b>Consumo anual total</b></td><td>{(energia_consumida_kwh + consumo_red_anual):.1f} kWh</td></tr>"
-                f"<tr><td>📈 <b>Rentabilidad bruta kWh</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('white' if rentabilidad_bruta_combinada == 0 else ('#ffcccc' if rentabilidad_bruta_combinada < 0 else '#e8f5e8'))};'>{rentabilidad_bruta_combinada:.3f} €/kWh</td></tr>"
-                f"<tr><td>📉 <b>Rentabilidad neta kWh</b></td><td style='background:{'white' if not solar_activado and not red_activada else ('white' if rentabilidad_neta_combinada == 0 else ('#ffcccc' if rentabilidad_neta_combinada < 0 else '#e8f5e8'))};'>{rentabilidad_neta_combinada:.3f} €/kWh</td></tr>"
-                f"</table>"
-                f"</div>"
-                f"<br>"
-                f"<br>"
+            # Curtailment del catálogo completo (por máquina) con la misma serie de precios
+            tabla_curtailment = ""
+            if curtailment_activado:
+                nombres_cat, ths_cat, consumo_cat, _ = catalogo_mineros()
+                cat = optimizar_curtailment(self.precios_horarios, hashprice_eur_th_dia, ths_cat, consumo_cat, comision)
+                filas = "".join(
+                    f"<tr><td>{nombre}</td><td>{cat['equilibrio'][i]:.3f} €/kWh</td><td>{cat['horas'][i]:.0f} h</td>"
+                    f"<td style='background:{'#ffcccc' if cat['beneficio'][i] < 0 else '#e8f5e8'};'>{cat['beneficio'][i]:.2f} €</td></tr>"
+                    for i, nombre in enumerate(nombres_cat)
+                )
+                tabla_curtailment = (
+                    f"<div style='text-align:center;'><b>📈 CURTAILMENT HORARIO (por máquina)</b></div><br>"
+                    f"<div style='text-align:center;'>"
+                    f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+                    f"<tr style='background:#f5f5f5;'><th>Modelo</th><th>Equilibrio</th><th>Horas/año</th><th>Beneficio/año</th></tr>"
+                    f"{filas}"
+                    f"</table>"
+                    f"</div>"
+                    f"<br>"
+                    f"<hr>"
+                    f"<br>"
+                )
+
+
+            # Proyección con crecimiento del hashrate (ingresos escalados por año, costes fijos)
+            proyeccion = None
+            tabla_proyeccion = ""
+            if self.chk_crecimiento_hashrate.isChecked() and self.modelo_hashrate is not None:
+                factores = self.modelo_hashrate.factores_ingreso_anuales(float(self.hashrate_eh.text()))
+                ingreso_neto_anual = (produccion_tabla_solar + produccion_tabla_red) * (1 - comision)
+                costes_anuales = -(coste_tabla_solar + coste_tabla_red)
+                proyeccion = {clave: beneficio_acumulado_proyectado(ingreso_neto_anual, costes_anuales, 0, f) for clave, f in factores.items()}
+                beneficios_10 = {clave: curva[-1] - precio_equipo for clave, curva in proyeccion.items()}
+                tabla_proyeccion = (
+                    f"<div style='text-align:center;'><b>📈 PROYECCIÓN CON CRECIMIENTO DEL HASHRATE</b></div><br>"
+                    f"<div style='text-align:center;'>"
+                    f"<table border='1' cellpadding='4' cellspacing='0' style='border-collapse:collapse; text-align:center; margin:0 auto;'>"
+                    f"<tr><td>📈 <b>Crecimiento anual estimado</b></td><td>{self.modelo_hashrate.crecimiento_anual * 100:+.1f}%</td></tr>"
+                    f"<tr><td>🙌 <b>Beneficio neto en 10 años</b></td><td style='background:{'#ffcccc' if beneficios_10['media'] < 0 else '#e8f5e8'};'>{beneficios_10['media']:.2f} €</td></tr>"
+                    f"<tr><td>↕️ <b>Rango (90%)</b></td><td>{beneficios_10['pesimista']:.2f} € … {beneficios_10['optimista']:.2f} €</td></tr>"
+                    f"</table>"
+                    f"</div>"
+                    f"<br>"
+                    f"<hr>"
+                    f"<br>"
+                )
+
+            # Minería solo: la simulación (1M años) va en un trabajo y su tabla se añade al terminar
+            simulacion_solo = None
+            tabla_solo = ""
+            if self.chk_solo.isChecked():
+                pool_eh = float(self.pool_eh.text()) if self.pool_eh.text().strip() else None
+                horas_mineria = horas_solares_anuales + horas_red_anuales
+                simulacion_solo = dict(
+                    ths=ths, hashrate_eh=float(self.hashrate_eh.text()), recompensa_btc=float(self.recompensa_btc.text()),
+                    fees_btc=float(self.fees_btc_bloque.text()), precio_btc_eur=precio_btc * cambio_usd_eur,
+                    coste_energia_anual=-(coste_tabla_solar + coste_tabla_red), inversion=precio_equipo,
+                    fraccion_tiempo=horas_mineria / (365 * 24), bloques_dia=self.bloques_dia_hashprice(),
+                    pool_eh=pool_eh, comision_pool=comision,
+                )
+                tabla_solo = self.tabla_mineria_solo(None, pool_eh)
+
+            datos_html = dict(
+                nombre_minero=self.combo_minero.currentText(),
+                num_minero=num_minero,
+                ths=ths,
+                consumo_kw=consumo_kw,
+                eficiencia_w_th=eficiencia_w_th,
+                precio_equipo=precio_equipo,
+                comision=comision,
+                solar_activado=solar_activado,
+                red_activada=red_activada,
+                amortizacion=amortizacion,
+                amortizacion_red=amortizacion_red,
+                amortizacion_total=amortizacion_total,
+                produccion_total=produccion_total,
+                beneficio_10_anios=beneficio_10_anios,
+                produccion_tabla_solar=produccion_tabla_solar,
+                coste_tabla_solar=coste_tabla_solar,
+                fees_tabla_solar=fees_tabla_solar,
+                beneficio_tabla_solar=beneficio_tabla_solar,
+                potencia_fotovoltaica_kwp=potencia_fotovoltaica_kwp,
+                energia_consumida_kwh=energia_consumida_kwh,
+                euros_por_kwh_bruto=euros_por_kwh_bruto,
+                euros_por_kwh=euros_por_kwh,
+                produccion_tabla_red=produccion_tabla_red,
+                coste_tabla_red=coste_tabla_red,
+                fees_tabla_red=fees_tabla_red,
+                beneficio_tabla_red=beneficio_tabla_red,
+                horas_red_anuales=horas_red_anuales,
+                consumo_red_anual=consumo_red_anual,
+                euros_por_kwh_red_bruto=euros_por_kwh_red_bruto,
+                euros_por_kwh_red=euros_por_kwh_red,
+                rentabilidad_bruta_combinada=rentabilidad_bruta_combinada,
+                rentabilidad_neta_combinada=rentabilidad_neta_combinada,
             )
+            secciones_extra = tabla_curtailment + tabla_proyeccion
+            resultado = generar_html_resultados(**datos_html, secciones_extra=secciones_extra + tabla_solo)
 
             # Crear y mostrar ventana de resultados con efecto cascada
             nombre_minero = self.combo_minero.currentText()
@@ -982,13 +3554,44 @@ class CalculadoraMineria(QWidget):
             # Beneficio neto anual combinado (solar + red)
             beneficio_anual = produccion_total
             inversion = precio_equipo
-            self.mostrar_grafica_amortizacion(beneficio_anual, inversion, nombre_minero, ventana_resultados, offset_cascada)
+            self.mostrar_grafica_amortizacion(beneficio_anual, inversion, nombre_minero, ventana_resultados, offset_cascada, proyeccion)
+
+            if simulacion_solo is not None:
+                pool_eh = simulacion_solo["pool_eh"]
+
+                def completar(solo):
+                    ventana_resultados.resultado.setText(generar_html_resultados(
+                        **datos_html, secciones_extra=secciones_extra + self.tabla_mineria_solo(solo, pool_eh)))
+
+                self.gestor_trabajos.enviar(
+                    lambda control: simular_mineria_solo(
+                        **simulacion_solo, tamano_lote=100_000, progreso=lambda hechas, total: control.progreso(hechas / total)),
+                    al_progreso=self.barra_progreso.setValue,
+                    al_terminar=completar,
+                    al_cancelar=lambda: completar("cancelada"),
+                    al_error=lambda mensaje: completar(f"error: {mensaje}"),
+                )
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Datos inválidos: {e}")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    ventana = CalculadoraMineria()
+    parser = argparse.ArgumentParser(description="Calculadora de Minería Solar")
+    parser.add_argument("--replay", metavar="FICHERO_JSON", help="Reproduce bloques guardados con un servidor local en lugar de mempool.space")
+    parser.add_argument("--replay-intervalo", type=float, default=2.0, help="Segundos entre bloques del replay")
+    args, argv_qt = parser.parse_known_args()
+
+    servidor_replay = None
+    url_ws, url_api = URL_WS_MEMPOOL, URL_API_MEMPOOL
+    if args.replay:
+        servidor_replay = ServidorReplayBloques.desde_fichero(args.replay, puerto=0, intervalo=args.replay_intervalo).iniciar()
+        url_ws, url_api = servidor_replay.url_ws, servidor_replay.url_api
+        print(f"Replay de bloques en {url_ws}")
+
+    app = QApplication(sys.argv[:1] + argv_qt)
+    ventana = CalculadoraMineria(url_ws, url_api)
     ventana.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    codigo = app.exec_()
+    if servidor_replay:
+        servidor_replay.detener()
+    sys.exit(codigo)
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Rendimiento de AlmacenEscenarios: procesa un barrido modelos × precio BTC ×
+electricidad × hashrate de unas 'filas' filas e informa de filas/s y del pico
+de memoria residente (que debe depender del tamaño de bloque, no del barrido).
+
+    python benchmarks/barrido_escenarios.py                   # ~140M filas (~2,8 GB en disco)
+    python benchmarks/barrido_escenarios.py --filas 5000000 --bloque 500000
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tests")]
+import Calculadora_mineria_solar as calc  # noqa: E402
+from conftest import BASE as BASE_PRUEBAS  # noqa: E402  Mismo escenario de referencia que las pruebas
+
+BASE = {**BASE_PRUEBAS, "num_maquinas": 1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=float, default=140e6, help="Filas aproximadas del barrido")
+    parser.add_argument("--bloque", type=int, default=1_000_000, help="Filas por bloque de procesar()")
+    parser.add_argument("--carpeta", help="Carpeta del barrido (por defecto una temporal que se borra)")
+    args = parser.parse_args()
+
+    modelos = list(calc.MINEROS)
+    puntos = max(2, round((args.filas / len(modelos)) ** (1 / 3)))
+    ejes = dict(precio_btc=np.linspace(50_000, 250_000, puntos), precio_red=np.linspace(0.0, 0.3, puntos),
+                hashrate_eh=np.linspace(500, 2_000, puntos))
+    carpeta = args.carpeta or tempfile.mkdtemp(prefix="barrido_")
+    try:
+        almacen = calc.AlmacenEscenarios.crear(carpeta, BASE, modelos=modelos, **ejes)
+        print(f"{len(almacen):,} filas ({almacen.dtype.itemsize} B/fila) en {carpeta}")
+        inicio = time.perf_counter()
+        almacen.procesar(tamano_bloque=args.bloque)
+        segundos = time.perf_counter() - inicio
+        pico_procesar_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB en Linux
+        inicio = time.perf_counter()
+        mejores = almacen.mejores("amortizacion", n=10, mayor=False)
+        segundos_mejores = time.perf_counter() - inicio
+        pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"procesar: {segundos:.1f} s ({len(almacen) / segundos / 1e6:.2f} M filas/s)")
+        print(f"mejores: {segundos_mejores:.1f} s -> {almacen.etiqueta(mejores[0])}")
+        print(f"pico de memoria residente: {pico_procesar_mb:.0f} MB tras procesar, {pico_mb:.0f} MB tras mejores")
+    finally:
+        if not args.carpeta:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
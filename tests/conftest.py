@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Sin pantalla: Qt y matplotlib en modo offscreen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Entradas de un escenario de referencia (las de la interfaz con un S21 x2), compartidas por las pruebas
+BASE = dict(
+    precio_btc=100_000, cambio_usd_eur=0.92, hashrate_eh=900, fees_btc=0.03, recompensa_btc=3.125,
+    bloques_dia=144, comision=0.02, ths_unidad=200, consumo_unidad=3.5, precio_unidad=2211, num_maquinas=2,
+    horas_solares_anuales=5.5 * 365, precio_venta_solar=0.04, horas_red_anuales=8 * 365, precio_red=0.08,
+)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """QApplication compartida (debe vivir mientras existan objetos Qt)"""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
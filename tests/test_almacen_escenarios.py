@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+EJES = dict(precio_btc=[60_000, 90_000, 120_000, 150_000, 200_000, 250_000],
+            precio_red=list(np.linspace(0.0, 0.3, 7)), hashrate_eh=[600, 900, 1200])
+MODELOS = ["S19", "S19K Pro", "S21", "S21 XP", "S23 Hyd", "S19"]  # Con un modelo repetido: 6·7·3·6 = 756 filas
+
+
+def comprobar_contra_evaluar(almacen):
+    etiquetas, entradas = calc.crear_escenarios(BASE, modelos=MODELOS, **EJES)
+    esperado = calc.evaluar_escenarios(entradas)
+    resultados = almacen.resultados()
+    assert len(resultados) == len(etiquetas)
+    for columna in almacen.meta["columnas"]:
+        np.testing.assert_allclose(resultados[columna], esperado[columna].astype(np.float32), rtol=1e-6)
+    return etiquetas
+
+
+def test_coincide_con_evaluar_escenarios(tmp_path):
+    almacen = calc.AlmacenEscenarios.crear(str(tmp_path), BASE, modelos=MODELOS, **EJES).procesar(tamano_bloque=100)
+    assert almacen.completo
+    etiquetas = comprobar_contra_evaluar(almacen)
+    assert almacen.etiqueta(0) == "precio_btc=60000 · precio_red=0 · hashrate_eh=600 · S19"
+    assert almacen.etiqueta(len(etiquetas) - 1).endswith("hashrate_eh=1200 · S19")
+    with pytest.raises(FileExistsError):
+        calc.AlmacenEscenarios.crear(str(tmp_path), BASE, **EJES)
+
+
+def test_reanuda_tras_cancelar(tmp_path):
+    class Abortado(Exception):
+        pass
+
+    def abortar(hechas, total):
+        if hechas >= 300:
+            raise Abortado()
+
+    almacen = calc.AlmacenEscenarios.crear(str(tmp_path), BASE, modelos=MODELOS, **EJES)
+    with pytest.raises(Abortado):
+        almacen.procesar(tamano_bloque=100, progreso=abortar)
+    reabierto = calc.AlmacenEscenarios.abrir(str(tmp_path))
+    assert reabierto.meta["hechas"] == 300 and not reabierto.completo
+    avances = []
+    reabierto.procesar(tamano_bloque=100, progreso=lambda hechas, total: avances.append(hechas))
+    assert avances[0] == 400 and avances[-1] == len(reabierto)
+    comprobar_contra_evaluar(reabierto)
+
+
+@pytest.mark.parametrize("columna, mayor", [("beneficio_anual", True), ("amortizacion", False), ("euros_kwh_neto", True)])
+def test_mejores_coincide_con_argsort(tmp_path, columna, mayor):
+    almacen = calc.AlmacenEscenarios.crear(str(tmp_path), BASE, modelos=MODELOS, **EJES).procesar()
+    valores = np.asarray(almacen.resultados()[columna], dtype=float)
+    orden = np.argsort(-valores if mayor else valores, kind="stable")[:15]
+    mejores = almacen.mejores(columna, n=15, mayor=mayor, tamano_bloque=64)
+    # Puede haber empates (modelo repetido): se comparan los valores y no los índices
+    np.testing.assert_array_equal(valores[mejores], valores[orden])
+
+
+def test_escenario_unico_sin_ejes(tmp_path):
+    almacen = calc.AlmacenEscenarios.crear(str(tmp_path), BASE).procesar()
+    assert len(almacen) == 1 and almacen.completo
+    assert almacen.etiqueta(0) == "Escenario"
+    esperado = calc.evaluar_escenarios({k: [v] for k, v in BASE.items()})
+    assert almacen.resultados()["beneficio_anual"][0] == pytest.approx(esperado["beneficio_anual"][0], rel=1e-6)
+    assert list(almacen.mejores("beneficio_anual", n=5)) == [0]
+
+
+@pytest.mark.parametrize("red_activada", [True, False])
+def test_barrido_de_la_ventana_usa_ejes_absolutos(qapp, tmp_path, red_activada):
+    # Con la red apagada el escenario trae precio_red 0: el eje de red no debe salir lleno de ceros
+    base = BASE if red_activada else {**BASE, "precio_red": 0.0, "horas_red_anuales": 0.0}
+    etiquetas, entradas = calc.crear_escenarios(base, modelos=["S21"])
+    ventana = calc.VentanaComparacion(calc.EspacioComparacion(etiquetas, entradas))
+    almacen = ventana.crear_barrido(str(tmp_path))
+    assert ("precio_red" in almacen.ejes) == red_activada
+    for eje, valores in almacen.ejes.items():
+        if eje != "modelo":
+            assert len(set(valores)) == calc.VentanaComparacion.PUNTOS_BARRIDO
+    ventana.close()
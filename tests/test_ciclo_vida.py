@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+# Poco después de un halving y con el siguiente a mitad del horizonte: la política óptima
+# compra, vende y vuelve a comprar modelos distintos según el año
+FACTORES = calc.factores_hashprice_anuales(8, crecimiento_hashrate=0.1, altura_actual=calc.ALTURA_HALVING_REFERENCIA + 10_000)
+BASE_CICLO = {**BASE, "precio_red": 0.05}
+
+
+def beneficio_sin_averias(base=BASE_CICLO, factores=FACTORES):
+    """Beneficio anual (T, M) de una máquina de cada modelo, apagada si pierde dinero"""
+    _, entradas = calc.crear_escenarios({**base, "num_maquinas": 1}, modelos=list(calc.MINEROS))
+    c = calc.evaluar_escenarios(entradas)
+    ingreso = (c["ingreso_bruto_solar"] + c["ingreso_bruto_red"]) * (1 - c["comision"])
+    coste = c["energia_solar_kwh"] * c["precio_venta_solar"] + c["energia_red_kwh"] * c["precio_red"]
+    return np.maximum(np.outer(factores, ingreso) - coste, 0), entradas["precio_unidad"]
+
+
+def simular(resultado, beneficio, precio, m0, caminos, rng, sustituir=True, tasa_descuento=0.0):
+    """Media y error estándar del valor de 'caminos' trayectorias con averías y reventa"""
+    reventa = np.array([m["reventa"] for m in calc.MINEROS.values()])
+    fallo = np.array([m["fallo"] for m in calc.MINEROS.values()])
+    descuento = 1 / (1 + tasa_descuento)
+    anios = len(beneficio)
+    valores = np.empty(caminos)
+    for i in range(caminos):
+        valor, modelo, edad = -precio[m0], m0, 0
+        for t in range(anios):
+            d = descuento ** t
+            if sustituir:
+                if modelo is not None and t > 0 and not resultado["conservar"][t][modelo, edad]:
+                    valor += d * precio[modelo] * reventa[modelo] ** edad
+                    modelo = None
+                if modelo is None and resultado["compra"][t] is not None:
+                    modelo, edad = resultado["compra"][t], 0
+                    valor -= d * precio[modelo]
+            if modelo is None:
+                continue
+            if rng.random() < fallo[modelo]:
+                valor += d * beneficio[t, modelo] * rng.random()  # Averiada en algún momento del año
+                modelo = None
+            else:
+                valor += d * beneficio[t, modelo]
+                edad += 1
+        if modelo is not None:
+            valor += descuento ** anios * precio[modelo] * reventa[modelo] ** edad
+        valores[i] = valor
+    return valores.mean(), valores.std() / np.sqrt(caminos)
+
+
+@pytest.mark.parametrize("tasa_descuento", [0.0, 0.08])
+def test_montecarlo_coincide_con_la_programacion_dinamica(tasa_descuento):
+    resultado = calc.optimizar_ciclo_vida(BASE_CICLO, FACTORES, tasa_descuento=tasa_descuento)
+    assert not all(conservar.all() for conservar in resultado["conservar"][1:])  # La política vende en algún caso
+    beneficio, precio = beneficio_sin_averias()
+    rng = np.random.default_rng(0)
+    for m0 in range(len(calc.MINEROS)):
+        for sustituir, esperado in ((False, resultado["valor_sin_sustituir"][m0]), (True, resultado["valor"][m0])):
+            media, error = simular(resultado, beneficio, precio, m0, 10_000, rng, sustituir, tasa_descuento)
+            # Tras una avería la política puede comprar un equipo caro: la tolerancia sale de la muestra
+            assert media == pytest.approx(esperado, abs=4 * error + 1e-6)
+
+
+def test_sustituir_nunca_empeora():
+    resultado = calc.optimizar_ciclo_vida(BASE_CICLO, FACTORES)
+    assert np.all(resultado["valor"] >= resultado["valor_sin_sustituir"] - 1e-9)
+
+
+def test_sin_beneficio_ni_averias_vale_la_reventa():
+    base = {**BASE, "precio_red": 10.0, "precio_venta_solar": 10.0}
+    mineros = {nombre: {**datos, "fallo": 0.0} for nombre, datos in calc.MINEROS.items()}
+    resultado = calc.optimizar_ciclo_vida(base, FACTORES, mineros=mineros)
+    precio = np.array([m["precio"] for m in mineros.values()])
+    reventa = np.array([m["reventa"] for m in mineros.values()])
+    # Lo mejor es vender al empezar el segundo año y no volver a comprar
+    np.testing.assert_allclose(resultado["valor"], precio * reventa - precio)
+    assert np.all(resultado["anio_sustitucion"] == 1)
+    assert all(compra is None for compra in resultado["compra"])
+
+
+def test_curtailment_horario_como_en_la_comparacion():
+    rng = np.random.default_rng(3)
+    precios = rng.uniform(0.0, 0.25, 24 * 60)  # 60 días: se anualiza igual que en calcular
+    resultado = calc.optimizar_ciclo_vida(BASE, [1.0], precios_horarios=precios)
+
+    # Año único: beneficio con las horas rentables de cada modelo (como comparar_modelos) y reventa
+    etiquetas, entradas = calc.crear_escenarios({**BASE, "num_maquinas": 1}, modelos=list(calc.MINEROS))
+    espacio = calc.EspacioComparacion(etiquetas, entradas)
+    curtailment = calc.optimizar_curtailment(precios, espacio.columna("hashprice_eur_th_dia")[0], entradas["ths_unidad"],
+                                             entradas["consumo_unidad"], BASE["comision"])
+    espacio.editar("horas_red_anuales", curtailment["horas"])
+    espacio.editar("precio_red", curtailment["precio_medio"])
+    fallo = np.array([m["fallo"] for m in calc.MINEROS.values()])
+    reventa = np.array([m["reventa"] for m in calc.MINEROS.values()])
+    precio = entradas["precio_unidad"]
+    esperado = np.maximum(espacio.columna("beneficio_anual"), 0) * (1 - fallo / 2) + (1 - fallo) * precio * reventa - precio
+    np.testing.assert_allclose(resultado["valor_sin_sustituir"], esperado)
+
+
+def test_factores_con_halving():
+    # A 10.000 bloques del halving: el primer año (a mitad) ya cobra la mitad de subvención
+    factores = calc.factores_hashprice_anuales(3, recompensa_btc=3.125, fees_btc=0.0, crecimiento_hashrate=0.0,
+                                               altura_actual=calc.ALTURA_HALVING_REFERENCIA + 200_000)
+    np.testing.assert_allclose(factores, [0.5, 0.5, 0.5])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+
+def fuerza_bruta(precios, hashprice, ths, consumo, comision):
+    equilibrio = hashprice / 24 * ths * (1 - comision) / consumo
+    minadas = precios < equilibrio
+    escala = calc.HORAS_POR_ANIO / precios.size
+    coste = consumo * precios[minadas].sum() * escala
+    ingreso = hashprice / 24 * ths * minadas.sum() * escala * (1 - comision)
+    return minadas.sum() * escala, ingreso - coste
+
+
+def test_coincide_con_fuerza_bruta():
+    precios = np.random.default_rng(0).uniform(0, 0.3, calc.HORAS_POR_ANIO)
+    nombres, ths, consumo, _ = calc.catalogo_mineros()
+    resultado = calc.optimizar_curtailment(precios, 0.05, ths, consumo, 0.02)
+    for i in range(len(nombres)):
+        horas, beneficio = fuerza_bruta(precios, 0.05, ths[i], consumo[i], 0.02)
+        assert resultado["horas"][i] == pytest.approx(horas)
+        assert resultado["beneficio"][i] == pytest.approx(beneficio)
+
+
+@pytest.mark.parametrize("dias", [30, 366])
+def test_series_de_otra_duracion_se_anualizan(dias):
+    # Mismo patrón de precios repetido: el resultado anual no depende de la duración
+    dia = np.linspace(0.02, 0.25, 24)
+    anual = calc.optimizar_curtailment(np.tile(dia, 365), 0.05, 200, 3.5, 0.02)
+    otra = calc.optimizar_curtailment(np.tile(dia, dias), 0.05, 200, 3.5, 0.02)
+    for clave in ("horas", "energia_kwh", "coste", "beneficio", "precio_medio"):
+        assert otra[clave][0] == pytest.approx(anual[clave][0])
+
+
+def test_cancelar_el_dialogo_conserva_la_serie(qapp, tmp_path, monkeypatch):
+    ruta = tmp_path / "precios.csv"
+    ruta.write_text("\n".join(f"{0.01 * (h % 24):.2f}" for h in range(8760)))
+    ventana = calc.CalculadoraMineria()
+    monkeypatch.setattr(calc.QFileDialog, "getOpenFileName", staticmethod(lambda *a: (str(ruta), "")))
+    ventana.cargar_precios_horarios()
+    assert ventana.precios_horarios.size == 8760
+
+    monkeypatch.setattr(calc.QFileDialog, "getOpenFileName", staticmethod(lambda *a: ("", "")))
+    ventana.cargar_precios_horarios()
+    assert ventana.precios_horarios is not None and ventana.precios_horarios_ruta.text()
+
+    ventana.quitar_precios_horarios()
+    assert ventana.precios_horarios is None and ventana.precios_horarios_ruta.text() == ""
+    ventana.close()
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+HASHPRICE = 0.05  # €/TH/día
+
+
+def irradiancia_sintetica(dias=30):
+    horas = np.arange(24 * dias) % 24
+    rng = np.random.default_rng(0)
+    return np.clip(np.sin((horas - 6) / 12 * np.pi), 0, None) * 1000 * rng.uniform(0.4, 1.0, horas.size)
+
+
+def fuerza_bruta(irradiancia, modelo, kwp, maquinas, precio_exportacion, capex_kwp, comision=0.02):
+    produccion = irradiancia / 1000 * calc.FACTOR_RENDIMIENTO_SOLAR
+    escala = 365.25 * 24 / produccion.size
+    datos = calc.MINEROS[modelo]
+    ingreso_kwh = HASHPRICE / 24 * datos["ths"] * (1 - comision) / datos["consumo"]
+    minada = np.minimum(kwp * produccion, maquinas * datos["consumo"]).sum() * escala
+    exportada = kwp * produccion.sum() * escala - minada
+    beneficio = minada * ingreso_kwh + exportada * precio_exportacion
+    return beneficio, beneficio / (kwp * capex_kwp + maquinas * datos["precio"])
+
+
+def test_energia_y_optimo_coinciden_con_fuerza_bruta():
+    irradiancia = irradiancia_sintetica()
+    kwp, maquinas = np.linspace(2, 40, 20), np.arange(1, 9)
+    r = calc.dimensionar_fotovoltaica(irradiancia, HASHPRICE, 0.02, 0.0, 600, kwp=kwp, maquinas=maquinas)
+    for i, modelo in enumerate(r["modelos"]):
+        beneficio, _ = fuerza_bruta(irradiancia, modelo, r["kwp"][i], r["num_maquinas"][i], 0.0, 600)
+        assert r["beneficio_anual"][i] == pytest.approx(beneficio)
+        mejor = max(fuerza_bruta(irradiancia, modelo, k, n, 0.0, 600)[1] for k in kwp for n in maquinas)
+        assert r["rentabilidad"][i] == pytest.approx(mejor)
+    assert r["evaluados"] == kwp.size * maquinas.size * len(r["modelos"])
+
+
+def test_poda_modelos_que_no_superan_la_exportacion():
+    ingreso = calc.precio_equilibrio_eur_kwh(HASHPRICE, [calc.MINEROS[m]["ths"] for m in calc.MINEROS],
+                                             [calc.MINEROS[m]["consumo"] for m in calc.MINEROS], 0.02)
+    exportacion = float(np.median(ingreso))
+    r = calc.dimensionar_fotovoltaica(irradiancia_sintetica(), HASHPRICE, 0.02, exportacion, 600)
+    for modelo, valor in zip(calc.MINEROS, ingreso):
+        if valor <= exportacion:
+            assert modelo in r["podados"] and modelo not in r["modelos"]
+    assert set(r["modelos"]).isdisjoint(r["podados"])
+
+
+def test_respeta_el_presupuesto():
+    r = calc.dimensionar_fotovoltaica(irradiancia_sintetica(), HASHPRICE, 0.02, 0.0, 600, presupuesto=5_000)
+    viables = np.isfinite(r["rentabilidad"])
+    assert viables.any()
+    assert np.all(r["inversion"][viables] <= 5_000)
+
+
+def test_con_presupuesto_encuentra_el_mejor_modelo_asequible():
+    # Con 1500 € el S23 Hyd (que domina a los Bitaxe) no cabe: la dominancia no debe descartarlos
+    irradiancia, presupuesto = irradiancia_sintetica(), 1_500
+    modelos = ["S23 Hyd", "S21 XP", "Bitaxe Gamma 601", "Bitaxe Supra Hex 701", "Avalon Nano 3S"]
+    kwp, maquinas = np.linspace(0.05, 2, 40), np.arange(1, 21)
+    r = calc.dimensionar_fotovoltaica(irradiancia, HASHPRICE, 0.02, 0.0, 600, kwp=kwp, maquinas=maquinas,
+                                      modelos=modelos, presupuesto=presupuesto)
+    assert r["mejor"] is not None
+    mejor = max(
+        (fuerza_bruta(irradiancia, modelo, k, n, 0.0, 600)[1], modelo)
+        for modelo in modelos for k in kwp for n in maquinas
+        if k * 600 + n * calc.MINEROS[modelo]["precio"] <= presupuesto
+    )
+    assert r["modelos"][r["mejor"]] == mejor[1]
+    assert r["rentabilidad"][r["mejor"]] == pytest.approx(mejor[0])
+
+
+def test_sin_produccion_es_un_error():
+    with pytest.raises(ValueError):
+        calc.dimensionar_fotovoltaica(np.zeros(48), HASHPRICE, 0.02, 0.0, 600)
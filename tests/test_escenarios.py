@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+
+def test_evaluar_escenarios_reproduce_las_formulas_de_calcular():
+    c = calc.evaluar_escenarios({k: [v] for k, v in BASE.items()})
+    hashprice_eur_th_dia = (3.125 + 0.03) * 100_000 * 144 / (900 * 1_000) / 1_000 * 0.92
+    ths, consumo, inversion = 400, 7.0, 4422
+    solar = hashprice_eur_th_dia * ths * BASE["horas_solares_anuales"] / 24 * 0.98 - consumo * BASE["horas_solares_anuales"] * 0.04
+    red = hashprice_eur_th_dia * ths * BASE["horas_red_anuales"] / 24 * 0.98 - consumo * BASE["horas_red_anuales"] * 0.08
+    assert c["hashprice_eur_th_dia"][0] == pytest.approx(hashprice_eur_th_dia)
+    assert c["beneficio_solar"][0] == pytest.approx(solar)
+    assert c["beneficio_red"][0] == pytest.approx(red)
+    assert c["amortizacion"][0] == pytest.approx(inversion / (solar + red))
+    assert c["beneficio_10_anios"][0] == pytest.approx((solar + red) * 10 - inversion)
+    assert c["euros_kwh_neto"][0] == pytest.approx((solar + red) / (consumo * (BASE["horas_solares_anuales"] + BASE["horas_red_anuales"])))
+
+
+def test_amortizacion_infinita_si_no_hay_beneficio():
+    c = calc.evaluar_escenarios({**{k: [v] for k, v in BASE.items()}, "precio_red": [5.0]})
+    assert c["beneficio_anual"][0] < 0
+    assert np.isinf(c["amortizacion"][0])
+
+
+def test_crear_escenarios_producto_cartesiano():
+    etiquetas, entradas = calc.crear_escenarios(BASE, modelos=["S19", "S21"], precio_red=[0.05, 0.1, 0.2])
+    assert len(etiquetas) == 6
+    assert etiquetas[0] == "precio_red=0.05 · S19"
+    assert list(entradas["ths_unidad"]) == [95, 200] * 3
+    assert list(entradas["precio_red"]) == [0.05, 0.05, 0.1, 0.1, 0.2, 0.2]
+
+
+def test_espacio_comparacion_solo_recalcula_dependientes():
+    etiquetas, entradas = calc.crear_escenarios(BASE, modelos=list(calc.MINEROS))
+    espacio = calc.EspacioComparacion(etiquetas, entradas)
+    espacio.columnas()
+    espacio.editar("precio_red", 0.12, [3])
+    columnas = espacio.columnas()
+    assert "hashprice_eur_th_dia" not in espacio.recalculadas
+    assert "beneficio_red" in espacio.recalculadas
+    esperado = calc.evaluar_escenarios({**entradas, "precio_red": np.where(np.arange(len(etiquetas)) == 3, 0.12, entradas["precio_red"])})
+    for nombre, valores in esperado.items():
+        np.testing.assert_allclose(columnas[nombre], valores)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+
+def test_sketch_percentiles_error_relativo_acotado():
+    valores = np.random.default_rng(1).lognormal(mean=-3, sigma=1, size=20_000)
+    sketch = calc.SketchPercentiles()
+    for valor in valores:
+        sketch.agregar(valor)
+    error_cubo = (sketch.bordes[1] / sketch.bordes[0]) - 1
+    for q in (5, 50, 90, 99):
+        assert sketch.percentil(q) == pytest.approx(np.percentile(valores, q), rel=error_cubo)
+
+
+def test_sketch_quitar_deshace_agregar():
+    sketch = calc.SketchPercentiles()
+    for valor in (0.01, 0.02, 0.5, 3.0):
+        sketch.agregar(valor)
+    for valor in (0.5, 3.0):
+        sketch.quitar(valor)
+    assert sketch.total == 2
+    assert sketch.percentil(100) < 0.03
+    sketch.quitar(0.01)
+    sketch.quitar(0.02)
+    assert sketch.percentil(50) is None
+
+
+def test_ventanas_coinciden_con_fuerza_bruta():
+    rng = np.random.default_rng(2)
+    timestamps = 1_700_000_000 + np.cumsum(rng.exponential(600, 3_000)).astype(np.int64)
+    fees = rng.uniform(0.01, 0.2, timestamps.size)
+    estadisticas = calc.EstadisticasBloques()
+    for t, f in zip(timestamps, fees):
+        estadisticas.agregar({"timestamp": int(t), "fees_btc": float(f)})
+    for nombre, duracion in calc.VENTANAS_BLOQUES.items():
+        dentro = timestamps > timestamps[-1] - duracion
+        assert estadisticas.ventanas[nombre].n == dentro.sum()
+        assert estadisticas.media(nombre) == pytest.approx(fees[dentro].mean())
+
+
+def test_cobertura_marca_ventanas_incompletas():
+    estadisticas = calc.EstadisticasBloques()
+    for i in range(calc.BLOQUES_POR_DIA):  # Un día de backfill
+        estadisticas.agregar({"timestamp": 1_700_000_000 + 600 * i, "fees_btc": 0.05})
+    assert estadisticas.cobertura("24h") == pytest.approx(1.0)
+    assert estadisticas.cobertura("7d") == pytest.approx(1 / 7)
+    assert "⚠️" in estadisticas.etiqueta("30d")
+    assert "⚠️" not in estadisticas.etiqueta("24h")
+    assert "incompleta" in estadisticas.resumen()
+
+
+def test_timestamps_no_monotonos():
+    # Los mineros pueden poner un timestamp anterior al del bloque previo (hasta ~2 h)
+    rng = np.random.default_rng(5)
+    alturas = np.arange(3_000)
+    timestamps = 1_700_000_000 + alturas * 600 + rng.integers(-7_200, 7_200, alturas.size)
+    fees = rng.uniform(0.01, 0.2, timestamps.size)
+    estadisticas = calc.EstadisticasBloques()
+    coberturas = []
+    for t, f in zip(timestamps, fees):
+        estadisticas.agregar({"timestamp": int(t), "fees_btc": float(f)})
+        coberturas.append(estadisticas.cobertura("7d"))
+    assert np.all(np.diff(coberturas) >= 0)  # Un bloque con timestamp atrasado no reduce la cobertura
+    for nombre, duracion in calc.VENTANAS_BLOQUES.items():
+        v = estadisticas.ventanas[nombre]
+        assert v.ultimo_timestamp() == timestamps.max()
+        # Los bloques salen por orden de llegada: con ±2 h de desorden por bloque, la
+        # ventana es exacta salvo en una franja de ±4 h en el borde
+        limite = timestamps.max() - duracion
+        seguros_dentro = (timestamps > limite + 14_400).sum()
+        posibles = (timestamps > limite - 14_400).sum()
+        assert seguros_dentro <= v.n <= posibles
+        assert v.primer_timestamp() > limite - 14_400
+        if duracion >= calc.SEGUNDOS_POR_DIA:  # En 1 h el ruido de ±2 h domina el ritmo
+            assert estadisticas.bloques_dia(nombre) == pytest.approx(calc.BLOQUES_POR_DIA, rel=0.1)
+
+
+def test_bloque_atrasado_fuera_de_la_ventana_se_ignora():
+    v = calc.VentanaBloques(3_600)
+    v.agregar(10_000, 0.1)
+    v.agregar(10_600, 0.2)
+    v.agregar(6_000, 5.0)  # Más de 1 h anterior al más reciente
+    assert v.n == 2 and v.media() == pytest.approx(0.15)
+    assert v.ultimo_timestamp() == 10_600 and v.primer_timestamp() == 10_000
+
+
+def test_un_bloque_en_vivo_no_cambia_el_ritmo_de_24h(qapp):
+    ventana = calc.CalculadoraMineria()
+    ventana.ventana_bloques.setCurrentIndex(ventana.ventana_bloques.findData("24h"))
+    ventana.procesar_bloque_nuevo({"height": 900_000, "timestamp": 1_700_000_000, "fees_btc": 0.03})
+    assert ventana.bloques_dia_hashprice() == calc.BLOQUES_POR_DIA
+    # Con las 24 h cubiertas el conteo observado sí se usa
+    for i in range(1, 150):
+        ventana.procesar_bloque_nuevo({"height": 900_000 + i, "timestamp": 1_700_000_000 + 580 * i, "fees_btc": 0.03})
+    assert ventana.bloques_reales_24h == ventana.estadisticas_bloques.ventanas["24h"].n
+    assert ventana.bloques_dia_hashprice() == pytest.approx(ventana.estadisticas_bloques.bloques_dia("24h"))
+    ventana.close()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+
+@pytest.fixture
+def columnas():
+    n = 2_500
+    rng = np.random.default_rng(3)
+    return {
+        "escenario": np.array([f"S21 · precio_red={i}" for i in range(n)]),
+        "beneficio_anual": rng.normal(1_000, 300, n),
+        "num_maquinas": np.arange(n, dtype=np.int64),
+    }
+
+
+def comprobar(leidas, columnas):
+    assert set(leidas) == set(columnas)
+    for nombre, valores in columnas.items():
+        if valores.dtype.kind in "OUS":
+            assert [str(v) for v in leidas[nombre]] == list(valores)
+        else:
+            np.testing.assert_allclose(np.asarray(leidas[nombre], dtype=float), valores, rtol=1e-9)
+
+
+@pytest.mark.parametrize("nombre", ["r.parquet", "r.arrow", "r.csv", "r_npy"])
+def test_ida_y_vuelta_con_pyarrow(tmp_path, columnas, nombre):
+    pytest.importorskip("pyarrow")
+    formato = "npy" if nombre.endswith("_npy") else None
+    ruta = str(tmp_path / nombre)
+    calc.exportar_columnas(columnas, ruta, formato, filas_por_bloque=1_000)
+    comprobar(calc.leer_columnas(ruta, formato), columnas)
+
+
+@pytest.mark.parametrize("nombre", ["r.csv", "r_npy"])
+def test_ida_y_vuelta_sin_pyarrow(tmp_path, columnas, nombre, monkeypatch):
+    monkeypatch.setattr(calc, "pa", None)
+    formato = "npy" if nombre.endswith("_npy") else None
+    ruta = str(tmp_path / nombre)
+    calc.exportar_columnas(columnas, ruta, formato, filas_por_bloque=1_000)
+    comprobar(calc.leer_columnas(ruta, formato), columnas)
+
+
+def test_sin_pyarrow_parquet_da_error_claro(tmp_path, columnas, monkeypatch):
+    monkeypatch.setattr(calc, "pa", None)
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        calc.exportar_columnas(columnas, str(tmp_path / "r.parquet"))
+
+
+def test_npy_se_lee_con_memoria_mapeada(tmp_path, columnas):
+    ruta = str(tmp_path / "r_npy")
+    calc.exportar_columnas(columnas, ruta, "npy")
+    assert isinstance(calc.leer_columnas(ruta, "npy")["beneficio_anual"], np.memmap)
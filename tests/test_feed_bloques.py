@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+pytest.importorskip("websocket")
+
+
+@pytest.fixture
+def servidor():
+    bloques = [{"height": 900_000 + i, "timestamp": 1_700_000_000 + 600 * i, "extras": {"totalFees": 2_000_000}}
+               for i in range(400)]
+    srv = calc.ServidorReplayBloques(bloques, puerto=0, intervalo=0.1, bloques_iniciales=10).iniciar()
+    yield srv
+    srv.detener()
+
+
+def esperar(app, condicion, segundos=5):
+    # Las señales del hilo del feed llegan por la cola de eventos de Qt
+    limite = time.time() + segundos
+    while time.time() < limite:
+        app.processEvents()
+        if condicion():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_reiniciar_rapido_no_deja_el_feed_parado(qapp, servidor):
+    feed = calc.FeedBloques(servidor.url_ws, servidor.url_api, espera_maxima=1)
+    vistos = []
+    feed.nuevo_bloque.connect(lambda bloque: vistos.append(bloque["height"]))
+    feed.iniciar()
+    assert esperar(qapp, lambda: len(vistos) >= 12)
+
+    # Desmarcar y volver a marcar enseguida: el hilo anterior aún está saliendo
+    feed.detener()
+    feed.iniciar()
+    n = len(vistos)
+    try:
+        assert esperar(qapp, lambda: len(vistos) >= n + 5), "el feed no siguió recibiendo bloques tras reiniciar"
+    finally:
+        feed.detener()
+    assert vistos == sorted(set(vistos))
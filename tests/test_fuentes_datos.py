@@ -0,0 +1,109 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+
+class Falso:
+    """Proveedor de pruebas: responde 'valor' cuando se libera 'paso' (o al momento) o lanza un error"""
+
+    def __init__(self, valor=None, error=None, bloquear=False):
+        self.valor, self.error = valor, error
+        self.paso = threading.Event()
+        if not bloquear:
+            self.paso.set()
+        self.llamadas = []
+
+    def __call__(self):
+        self.llamadas.append(time.monotonic())
+        self.paso.wait(5)
+        if self.error:
+            raise self.error
+        return self.valor
+
+
+@pytest.fixture
+def fuentes():
+    creadas = []
+
+    def crear(proveedores, **kwargs):
+        f = calc.FuentesDatos({"precio_btc": proveedores}, **kwargs)
+        creadas.append(f)
+        return f
+    yield crear
+    for f in creadas:
+        f.cerrar()
+
+
+def test_respaldo_tras_el_percentil_de_latencia(fuentes):
+    lento, rapido = Falso(100.0, bloquear=True), Falso(101.0)
+    f = fuentes([calc.Proveedor("lento", lento, latencia_inicial_s=0.2),
+                 calc.Proveedor("rapido", rapido, latencia_inicial_s=0.5)])
+    inicio = time.monotonic()
+    assert f.obtener("precio_btc") == 101.0
+    lento.paso.set()
+    assert f.ultimas_fuentes["precio_btc"] == ["rapido"]
+    # La petición de respaldo sale al cumplirse la latencia del primero, no antes
+    assert 0.2 <= rapido.llamadas[0] - inicio < 1.0
+
+
+def test_sin_respaldo_si_el_primero_responde_a_tiempo(fuentes):
+    primero, segundo = Falso(100.0), Falso(101.0)
+    f = fuentes([calc.Proveedor("a", primero, latencia_inicial_s=0.5),
+                 calc.Proveedor("b", segundo, latencia_inicial_s=1.0)])
+    assert f.obtener("precio_btc") == 100.0
+    assert segundo.llamadas == []
+
+
+def test_un_fallo_lanza_el_siguiente_sin_esperar(fuentes):
+    roto, bueno = Falso(error=ConnectionError("caído")), Falso(99.0)
+    f = fuentes([calc.Proveedor("roto", roto, latencia_inicial_s=0.1),
+                 calc.Proveedor("bueno", bueno, latencia_inicial_s=5.0)])
+    inicio = time.monotonic()
+    assert f.obtener("precio_btc") == 99.0
+    assert bueno.llamadas[0] - inicio < 0.1 + 0.5
+    # Una respuesta vacía cuenta como fallo
+    assert fuentes([calc.Proveedor("vacío", Falso(None))], espera_maxima_s=1).obtener("precio_btc") is None
+
+
+def test_cuorum_descarta_valores_atipicos(fuentes):
+    f = fuentes([calc.Proveedor(n, Falso(v)) for n, v in (("a", 100.0), ("b", 101.0), ("c", 150.0))], cuorum=3)
+    assert f.obtener("precio_btc") == pytest.approx(100.5)
+
+
+def test_disyuntor_abierto_semiabierto_y_cerrado(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(calc, "time", SimpleNamespace(monotonic=lambda: ahora[0]))
+    falso = Falso(error=ConnectionError("caído"))
+    p = calc.Proveedor("p", falso, fallos_apertura=2, enfriamiento_s=60.0)
+
+    for _ in range(2):
+        assert p.disponible()
+        with pytest.raises(ConnectionError):
+            p.consultar()
+    assert not p.disponible()  # Abierto
+    ahora[0] += 59.0
+    assert not p.disponible()
+    ahora[0] += 1.0
+    assert p.disponible()  # Semiabierto: se permite un intento
+    with pytest.raises(ConnectionError):
+        p.consultar()
+    assert not p.disponible()  # El intento falla: se vuelve a abrir sin esperar a otros dos fallos
+
+    ahora[0] += 60.0
+    falso.error, falso.valor = None, 7.0
+    assert p.consultar() == 7.0
+    assert p.disponible() and p.fallos_seguidos == 0  # Cerrado
+
+
+def test_se_omiten_los_proveedores_con_el_disyuntor_abierto(fuentes):
+    caido, bueno = Falso(error=ConnectionError("caído")), Falso(5.0)
+    p = calc.Proveedor("caido", caido, latencia_inicial_s=0.01, fallos_apertura=1)
+    with pytest.raises(ConnectionError):
+        p.consultar()
+    f = fuentes([p, calc.Proveedor("bueno", bueno, latencia_inicial_s=1.0)])
+    assert f.obtener("precio_btc") == 5.0
+    assert len(caido.llamadas) == 1
@@ -0,0 +1,62 @@
+import base64
+import re
+
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+
+def valores(**cambios):
+    etiquetas, entradas = calc.crear_escenarios({**BASE, **cambios}, modelos=["S21"])
+    return calc.valores_informe_escenario(calc.evaluar_escenarios(entradas), 0, etiquetas[0])
+
+
+def test_renderizador_marca_la_amortizacion():
+    renderizador = calc.RenderizadorAmortizacion()
+    lineas = renderizador.ejes.get_lines()
+    renderizador.dibujar(1_000.0, 4_000.0, "S21")
+    np.testing.assert_allclose(renderizador.linea_beneficio.get_ydata(), 1_000.0 * np.arange(11))
+    assert renderizador.linea_amortizacion.get_visible()
+    assert renderizador.linea_amortizacion.get_xdata()[0] == pytest.approx(4.0)
+    assert renderizador.ejes.get_title() == "Punto de amortización - S21"
+
+    renderizador.dibujar(-50.0, 4_000.0, "S19")  # Sin beneficio no hay punto de amortización
+    assert not renderizador.linea_amortizacion.get_visible()
+    assert renderizador.ejes.get_lines() == lineas  # Se reutilizan los mismos artistas
+
+
+def test_png_de_la_grafica(tmp_path):
+    renderizador = calc.RenderizadorAmortizacion()
+    renderizador.dibujar(1_000.0, 4_000.0, "S21")
+    renderizador.guardar(str(tmp_path / "g.png"), "png")
+    assert (tmp_path / "g.png").read_bytes()[:8] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_valores_informe_coinciden_con_las_columnas():
+    v = valores()
+    c = calc.evaluar_escenarios({k: [x] for k, x in {**BASE, "ths_unidad": 200, "consumo_unidad": 3.5, "precio_unidad": 2211}.items()})
+    assert v["produccion_total"] == pytest.approx(c["beneficio_anual"][0])
+    assert v["precio_equipo"] == pytest.approx(c["inversion"][0])
+    assert v["amortizacion_total"] == pytest.approx(c["amortizacion"][0])
+    assert v["beneficio_tabla_solar"] + v["beneficio_tabla_red"] == pytest.approx(v["produccion_total"])
+
+
+def test_informe_completo_en_html_pdf_y_png(qapp, tmp_path):
+    hechos = calc._generar_bloque_informes([(0, valores()), (1, valores(precio_red=0.2))], str(tmp_path), ("html", "pdf", "png"))
+    assert hechos == 2
+    nombres = sorted(p.name for p in tmp_path.iterdir())
+    assert nombres == ["00000_S21.html", "00000_S21.pdf", "00000_S21.png", "00001_S21.html", "00001_S21.pdf", "00001_S21.png"]
+
+    html = (tmp_path / "00000_S21.html").read_text(encoding="utf-8")
+    for seccion in ("DATOS DEL MINERO", "BENEFICIOS", "PRODUCCIÓN SOLAR", "PRODUCCIÓN ELÉCTRICA"):
+        assert seccion in html
+    imagen = re.search(r"data:image/png;base64,([A-Za-z0-9+/=]+)", html).group(1)
+    assert base64.b64decode(imagen) == (tmp_path / "00000_S21.png").read_bytes()
+
+    # El PDF lleva el informe entero (tablas con texto + gráfica), no solo la gráfica
+    pdf = (tmp_path / "00000_S21.pdf").read_bytes()
+    assert pdf.startswith(b"%PDF")
+    assert b"/Image" in pdf and b"/Font" in pdf
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf)) >= 2
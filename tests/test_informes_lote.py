@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+
+def escenarios(n):
+    etiquetas, entradas = calc.crear_escenarios(BASE, precio_red=[0.05 + 0.01 * i for i in range(n)])
+    return calc.evaluar_escenarios(entradas), etiquetas
+
+
+def test_genera_un_informe_por_escenario(tmp_path):
+    columnas, etiquetas = escenarios(3)
+    avances = []
+    resultado = calc.generar_informes_lote(columnas, etiquetas, str(tmp_path), formatos=("html",), procesos=1,
+                                           tamano_bloque=2, progreso=lambda hechos, total: avances.append((hechos, total)))
+    assert resultado["informes"] == 3
+    assert avances[-1] == (3, 3)
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".html")]) == 3
+
+
+def test_cancelar_descarta_los_bloques_pendientes(tmp_path):
+    columnas, etiquetas = escenarios(12)
+
+    def progreso(hechos, total):
+        raise calc.TrabajoCancelado()
+
+    with pytest.raises(calc.TrabajoCancelado):
+        calc.generar_informes_lote(columnas, etiquetas, str(tmp_path), formatos=("html",), procesos=1,
+                                   tamano_bloque=1, progreso=progreso)
+    # Con un solo proceso solo llegan a empezar el bloque en curso y el que ya estaba en cola
+    assert len([f for f in os.listdir(tmp_path) if f.endswith(".html")]) < 12
@@ -0,0 +1,36 @@
+import math
+
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+
+def test_progreso_por_lotes_y_media_teorica():
+    avances = []
+    solo = calc.simular_mineria_solo(
+        ths=5_000, hashrate_eh=1.0, recompensa_btc=3.125, fees_btc=0.0, precio_btc_eur=1.0,
+        simulaciones=200_000, tamano_lote=50_000, semilla=1, progreso=lambda hechas, total: avances.append((hechas, total)),
+    )
+    assert avances == [(50_000 * i, 200_000) for i in range(1, 5)]
+    assert solo["beneficio_medio"] == pytest.approx(solo["beneficio_esperado_teorico"], rel=0.02)
+    assert solo["prob_bloque"] == pytest.approx(solo["prob_bloque_teorica"], abs=0.005)
+
+
+def test_progreso_cancelable_desde_un_trabajo():
+    class Cancelado(Exception):
+        pass
+
+    def progreso(hechas, total):
+        if hechas >= total // 2:
+            raise Cancelado()
+
+    with pytest.raises(Cancelado):
+        calc.simular_mineria_solo(5_000, 1.0, 3.125, 0.0, 1.0, simulaciones=100_000, tamano_lote=10_000, progreso=progreso)
+
+
+def test_pool_reparte_la_misma_esperanza_menos_comision():
+    solo = calc.simular_mineria_solo(100, 900.0, 3.125, 0.0, 1.0, pool_eh=200.0, comision_pool=0.02,
+                                     simulaciones=100_000, semilla=2)
+    assert solo["prob_bloque"] is None
+    assert solo["beneficio_medio"] == pytest.approx(solo["beneficio_esperado_teorico"], rel=0.01)
+    assert math.isfinite(solo["anios_primer_bloque"])
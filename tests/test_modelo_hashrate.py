@@ -0,0 +1,162 @@
+import time
+
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+
+T0 = 1_600_000_000
+
+
+def serie(dias, crecimiento=0.4, ruido=0.03, semilla=4):
+    rng = np.random.default_rng(semilla)
+    timestamps = T0 + np.arange(dias) * calc.SEGUNDOS_POR_DIA
+    t = (timestamps - T0) / calc.SEGUNDOS_POR_ANIO
+    log_ehs = np.log(200) + np.log1p(crecimiento) * t + 0.05 * np.sin(2 * np.pi * t) + rng.normal(0, ruido, dias)
+    return timestamps, np.exp(log_ehs)
+
+
+def test_recupera_el_crecimiento_anual():
+    timestamps, ehs = serie(3 * 365)
+    modelo = calc.ModeloCrecimientoHashrate().ajustar(timestamps, ehs)
+    assert modelo.crecimiento_anual == pytest.approx(0.4, abs=0.02)
+
+
+def test_actualizacion_incremental_igual_a_reajuste():
+    timestamps, ehs = serie(6 * 365)
+    incremental = calc.ModeloCrecimientoHashrate(anios_ventana=2).ajustar(timestamps[:900], ehs[:900])
+    for inicio in range(900, len(timestamps), 100):
+        incremental.actualizar(timestamps[inicio:inicio + 100], ehs[inicio:inicio + 100])
+    completo = calc.ModeloCrecimientoHashrate(anios_ventana=2)
+    completo.t0 = incremental.t0
+    completo.actualizar(timestamps, ehs)
+    np.testing.assert_allclose(incremental.coeficientes, completo.coeficientes, rtol=1e-6, atol=1e-9)
+    np.testing.assert_array_equal(incremental.timestamps, completo.timestamps)
+
+
+def test_bandas_contienen_la_media_y_se_ensanchan():
+    timestamps, ehs = serie(3 * 365)
+    modelo = calc.ModeloCrecimientoHashrate().ajustar(timestamps, ehs)
+    futuro = timestamps[-1] + np.array([30, 365, 3 * 365]) * calc.SEGUNDOS_POR_DIA
+    pronostico = modelo.pronosticar(futuro)
+    assert np.all(pronostico["inferior"] < pronostico["media"])
+    assert np.all(pronostico["media"] < pronostico["superior"])
+    ancho = np.log(pronostico["superior"] / pronostico["inferior"])
+    assert np.all(np.diff(ancho) > 0)
+
+
+def test_factores_anuales_decrecen_con_hashrate_creciente():
+    timestamps, ehs = serie(3 * 365)
+    modelo = calc.ModeloCrecimientoHashrate().ajustar(timestamps, ehs)
+    factores = modelo.factores_ingreso_anuales(ehs[-1], anios=5, desde=int(timestamps[-1]))
+    assert np.all(np.diff(factores["media"]) < 0)
+    assert np.all(factores["pesimista"] <= factores["media"])
+    assert np.all(factores["media"] <= factores["optimista"])
+
+
+def test_historial_insuficiente():
+    timestamps, ehs = serie(4)
+    with pytest.raises(ValueError):
+        calc.ModeloCrecimientoHashrate().ajustar(timestamps, ehs)
+
+
+class Descargas:
+    """Sustituto de obtener_historial_hashrate: sirve una serie fija o falla sin conexión"""
+
+    def __init__(self, timestamps, ehs, sin_conexion=False):
+        self.timestamps, self.ehs, self.sin_conexion = timestamps, ehs, sin_conexion
+        self.periodos = []
+
+    def __call__(self, periodo="all", url_api=None):
+        self.periodos.append(periodo)
+        if self.sin_conexion:
+            raise calc.requests.ConnectionError("sin conexión")
+        dias = dict(calc.PERIODOS_HISTORIAL_HASHRATE).get(periodo)
+        if dias is None:
+            return self.timestamps, self.ehs
+        reciente = self.timestamps >= time.time() - dias * calc.SEGUNDOS_POR_DIA
+        return self.timestamps[reciente], self.ehs[reciente]
+
+
+def serie_hasta_hoy(dias):
+    timestamps, ehs = serie(dias)
+    return timestamps - timestamps[-1] + int(time.time()), ehs
+
+
+@pytest.mark.parametrize("dias_sin_actualizar, periodo", [(10, "1m"), (100, "6m"), (3_000, "all")])
+def test_cache_primera_descarga_fresca_y_fusion(tmp_path, monkeypatch, dias_sin_actualizar, periodo):
+    ruta = str(tmp_path / "cache" / "hashrate.json")
+    timestamps, ehs = serie_hasta_hoy(3_500)
+    descargas = Descargas(timestamps[:-dias_sin_actualizar], ehs[:-dias_sin_actualizar])
+    monkeypatch.setattr(calc, "obtener_historial_hashrate", descargas)
+
+    t, e = calc.cargar_historial_hashrate(ruta)
+    assert descargas.periodos == ["all"]
+    np.testing.assert_array_equal(t, timestamps[:-dias_sin_actualizar])
+
+    calc.cargar_historial_hashrate(ruta)  # Caché fresca: no se descarga nada
+    assert descargas.periodos == ["all"]
+
+    # Caché caducada: el periodo más corto que cubre el hueco, fusionado sin duplicar días
+    descargas.timestamps, descargas.ehs = timestamps, ehs
+    t, e = calc.cargar_historial_hashrate(ruta, max_antiguedad_s=0)
+    assert descargas.periodos == ["all", periodo]
+    np.testing.assert_array_equal(t, timestamps)
+    np.testing.assert_allclose(e, ehs)
+
+
+def test_cache_caducada_sin_conexion(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "hashrate.json")
+    timestamps, ehs = serie_hasta_hoy(200)
+    monkeypatch.setattr(calc, "obtener_historial_hashrate", Descargas(timestamps, ehs))
+    calc.cargar_historial_hashrate(ruta)
+
+    monkeypatch.setattr(calc, "obtener_historial_hashrate", Descargas(timestamps, ehs, sin_conexion=True))
+    t, _ = calc.cargar_historial_hashrate(ruta, max_antiguedad_s=0)
+    np.testing.assert_array_equal(t, timestamps)
+    with pytest.raises(calc.requests.RequestException):  # Sin caché ni conexión no hay nada que usar
+        calc.cargar_historial_hashrate(str(tmp_path / "otra.json"))
+
+
+def test_trabajo_actualiza_una_copia_del_modelo(tmp_path, monkeypatch):
+    class Control:
+        def progreso(self, fraccion, parcial=None):
+            pass
+
+    ruta = str(tmp_path / "hashrate.json")
+    timestamps, ehs = serie_hasta_hoy(3 * 365)
+    descargas = Descargas(timestamps[:-60], ehs[:-60])
+    monkeypatch.setattr(calc, "obtener_historial_hashrate", descargas)
+    modelo = calc.ajustar_modelo_hashrate(Control(), ruta=ruta)
+
+    descargas.timestamps, descargas.ehs = timestamps, ehs
+    actualizado = calc.ajustar_modelo_hashrate(Control(), modelo, ruta=ruta, max_antiguedad_s=0)
+    assert actualizado is not modelo
+    assert modelo.timestamps.max() == timestamps[-61]  # El de la interfaz no se toca en el hilo
+    assert actualizado.timestamps.max() == timestamps[-1]
+    completo = calc.ModeloCrecimientoHashrate()
+    completo.t0 = actualizado.t0
+    completo.actualizar(timestamps, ehs)
+    np.testing.assert_allclose(actualizado.coeficientes, completo.coeficientes, rtol=1e-6, atol=1e-9)
+
+
+def test_la_interfaz_actualiza_el_modelo_con_el_historial_nuevo(qapp, monkeypatch):
+    timestamps, ehs = serie_hasta_hoy(3 * 365)
+    historial = {"datos": (timestamps[:-30], ehs[:-30])}
+    monkeypatch.setattr(calc, "cargar_historial_hashrate", lambda **kwargs: historial["datos"])
+    ventana = calc.CalculadoraMineria()
+    ventana.chk_crecimiento_hashrate.setChecked(True)  # Primer ajuste
+    limite = time.time() + 5
+    while (ventana.modelo_hashrate is None or ventana.actualizando_modelo_hashrate) and time.time() < limite:
+        qapp.processEvents()
+    primero = ventana.modelo_hashrate
+    assert primero.timestamps.max() == timestamps[-31]
+
+    historial["datos"] = (timestamps, ehs)
+    ventana.temporizador_hashrate.timeout.emit()  # Lo que hace el temporizador cada hora
+    limite = time.time() + 5
+    while ventana.modelo_hashrate is primero and time.time() < limite:
+        qapp.processEvents()
+    assert ventana.modelo_hashrate.timestamps.max() == timestamps[-1]
+    assert not ventana.actualizando_modelo_hashrate
+    ventana.close()
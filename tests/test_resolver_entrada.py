@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import Calculadora_mineria_solar as calc
+from conftest import BASE
+
+
+def test_precio_btc_que_amortiza_en_tres_anios():
+    _, entradas = calc.crear_escenarios(BASE, modelos=["S19", "S21", "S21 XP"], precio_red=[0.05, 0.12])
+    precio = calc.resolver_entrada(entradas, "precio_btc", "amortizacion", 3.0)
+    assert np.all(np.isfinite(precio))
+    columnas = calc.evaluar_escenarios({**entradas, "precio_btc": precio})
+    np.testing.assert_allclose(columnas["amortizacion"], 3.0, rtol=1e-6)
+
+
+def test_precio_red_de_equilibrio_coincide_con_la_formula():
+    _, entradas = calc.crear_escenarios(BASE, horas_solares_anuales=[0.0], horas_red_anuales=[1000.0, 4000.0])
+    precio_red = calc.resolver_entrada(entradas, "precio_red", "beneficio_anual", 0.0)
+    columnas = calc.evaluar_escenarios(entradas)
+    # Sin solar, el beneficio se anula cuando el kWh cuesta lo que el equipo genera por kWh
+    esperado = columnas["hashprice_eur_th_dia"] * BASE["ths_unidad"] / 24 * (1 - BASE["comision"]) / BASE["consumo_unidad"]
+    np.testing.assert_allclose(precio_red, esperado, rtol=1e-6)
+
+
+@pytest.mark.parametrize("apagada", ["horas_solares_anuales", "horas_red_anuales"])
+def test_hashrate_que_amortiza_con_una_sola_fuente(apagada):
+    # Con hashrate 0 el hashprice es infinito y la fuente apagada da inf * 0 = NaN en el extremo inferior
+    _, entradas = calc.crear_escenarios({**BASE, apagada: 0.0}, modelos=["S19", "S21"])
+    for objetivo, valor in (("amortizacion", 3.0), ("beneficio_anual", 0.0)):
+        hashrate = calc.resolver_entrada(entradas, "hashrate_eh", objetivo, valor)
+        assert np.all(np.isfinite(hashrate)) and np.all(hashrate > 0)
+        columnas = calc.evaluar_escenarios({**entradas, "hashrate_eh": hashrate})
+        np.testing.assert_allclose(columnas[objetivo], valor, rtol=1e-6, atol=1e-5)
+
+
+def test_nan_donde_no_hay_solucion():
+    _, entradas = calc.crear_escenarios(BASE, precio_red=[0.05, 0.08])
+    maximo = calc.evaluar_escenarios({**entradas, "precio_red": np.zeros(2)})["beneficio_anual"]
+    objetivo = np.array([maximo[0] / 2, maximo[1] * 2])
+    precio_red = calc.resolver_entrada(entradas, "precio_red", "beneficio_anual", objetivo)
+    assert np.isfinite(precio_red[0]) and np.isnan(precio_red[1])
+
+
+def test_rechaza_nombres_desconocidos():
+    _, entradas = calc.crear_escenarios(BASE)
+    with pytest.raises(KeyError):
+        calc.resolver_entrada(entradas, "amortizacion", "beneficio_anual", 0.0)
+    with pytest.raises(KeyError):
+        calc.resolver_entrada(entradas, "precio_btc", "precio_red", 0.0)